@@ -1,35 +1,45 @@
 from __future__ import annotations
 
 import collections
+import concurrent.futures
+import contextlib
 import datetime
 import functools
 import importlib
 import importlib.metadata
+import json
 import logging
 import pathlib
 import typing as t
 
 import jinja2
-import jinja2.ext
 import xleapp.artifact.service as artifact_service
 
 from xleapp import artifact, plugins, report, templating
 from xleapp._version import __project__, __version__
+from xleapp.artifact import stream
+from xleapp.artifact.cache import DEFAULT_CACHE_SIZE, ResultCache
+from xleapp.artifact.checkpoint import CHECKPOINT_FOLDER, Checkpoint
+from xleapp.helpers import memory
 from xleapp.helpers.descriptors import Validator
+from xleapp.helpers.profiler import PROFILE_FOLDER, Profiler
+from xleapp.helpers.resources import DEFAULT_RESOURCE_CACHE_SIZE, ResourceCache
 from xleapp.helpers.search import FileSeekerBase, search_providers
 from xleapp.helpers.strings import split_camel_case
-from xleapp.helpers.utils import is_list
 from xleapp.report import db
-from xleapp.templating.ext import IncludeLogFileExtension
+from xleapp.report.store import STORE_FILE, CaseStore
 
 
 __ARTIFACT_PLUGINS__ = artifact_service.Artifacts()
 
 logger_log = logging.getLogger("xleapp.logfile")
 
+RUN_SUMMARY_FILE = "run_summary.json"
+
 if t.TYPE_CHECKING:
     import PySimpleGUI as PySG
 
+    from xleapp.artifact.abstract import Artifact
     from xleapp.gui.utils import ProcessThread
 
     BaseUserDict = collections.UserDict[str, t.Any]
@@ -79,6 +89,10 @@ class Application:
     """Main application
 
     Attributes:
+        case_store (CaseStore): Holds the results of each artifact once it finishes
+            instead of keeping them in memory. Disabled when `None`.
+        checkpoint (Checkpoint): Saves artifacts to the report folder as they finish.
+            Disabled when `None`.
         debug (bool): debugging enabled. Default is False
         project (str): Name of the project
         version (str): Version of the project
@@ -93,7 +107,12 @@ class Application:
             HTML reports.
         processing_type (float): Total about of time to run application after initial
             setup.
+        resource_cache (ResourceCache): Parsed plists, JSON files and blobs shared
+            between the artifacts of a run.
+        result_cache (ResultCache): Cache of artifact results shared between runs.
+            Disabled when `None`.
         input_path (pathlib.Path): File or Folder of the extraction.
+        installed_plugins (set[Plugin]): Plugins found by :meth:`discover_plugins`.
         output_path (pathlib.Path): Parent folder of the report where the report folder is
             created.
 
@@ -101,17 +120,21 @@ class Application:
         ArtifactError: Error if an artifacts fails for some reason
     """
 
+    case_store: t.Optional[CaseStore] = None
+    checkpoint: t.Optional[Checkpoint] = None
     debug: bool = False
     default_configs: dict[str, t.Any]
     device: Device = Device()
     extraction_type: str
     input_path: pathlib.Path
+    installed_plugins: set[plugins.Plugin] = set()
     jinja_environment = jinja2.Environment
     log_folder: pathlib.Path
     output_path = OutputFolder()
     processing_time: float
     project: str
     report_folder: pathlib.Path
+    result_cache: t.Optional[ResultCache] = None
     seeker: FileSeekerBase
     version: str
     dbservice: db.DBService
@@ -121,6 +144,24 @@ def __init__(self) -> None:
             "thumbnail_root": "**/Media/PhotoData/Thumbnails/**",
             "media_root": "**/Media",
             "thumbnail_size": (256, 256),
+            "result_cache_size": DEFAULT_CACHE_SIZE,
+            "stream_batch_size": stream.DEFAULT_BATCH_SIZE,
+            "stream_preview_rows": stream.DEFAULT_PREVIEW_ROWS,
+            "compact_data": False,
+            "track_memory": None,
+            "profile": None,
+            "resource_cache_size": DEFAULT_RESOURCE_CACHE_SIZE,
+            "kmz": False,
+            "tsv_compression": None,
+            "tsv_versioned": False,
+            "case_db": False,
+            "sorted_timeline": None,
+            "render_workers": templating.render.DEFAULT_RENDER_WORKERS,
+            "render_pool": None,
+            "lazy_tables": False,
+            "table_chunk_rows": templating.tables.TABLE_CHUNK_ROWS,
+            "template_cache": True,
+            "export_queue_size": db.DEFAULT_EXPORT_QUEUE_SIZE,
         }
         self.project = __project__
         self.version = __version__
@@ -136,7 +177,17 @@ def __call__(
         output_folder: pathlib.Path,
         input_path: pathlib.Path,
     ) -> Application:
-        self.dbservice = db.DBService(self.report_folder)
+        self.dbservice = db.DBService(
+            self.report_folder,
+            kmz=self.default_configs.get("kmz", False),
+            tsv_compression=self.default_configs.get("tsv_compression"),
+            tsv_versioned=self.default_configs.get("tsv_versioned", False),
+            case_db=self.default_configs.get("case_db", False),
+            sorted_timeline=self.default_configs.get("sorted_timeline"),
+            max_pending=self.default_configs.get(
+                "export_queue_size", db.DEFAULT_EXPORT_QUEUE_SIZE
+            ),
+        )
 
         sorted_plugins = sorted(
             search_providers.data.items(),
@@ -168,13 +219,19 @@ def discover_plugins() -> set[plugins.Plugin]:
         if len(found) == 0:
             raise plugins.PluginMissingError("No plugins installed! Exiting!")
 
+        installed = set()
         for _, extension in found.items():
             for plugin in extension.__PLUGINS__:
                 xleapp_plugin: plugins.Plugin = getattr(
                     plugin,
                     f"{plugin.__name__.rpartition('.')[-1].capitalize()}Plugin",
                 )
-                xleapp_plugin()
+                installed.add(xleapp_plugin())
+        return installed
+
+    @functools.cached_property
+    def resource_cache(self) -> ResourceCache:
+        return ResourceCache(self.default_configs["resource_cache_size"])
 
     @functools.cached_property
     def jinja_env(self) -> jinja2.Environment:
@@ -200,26 +257,84 @@ def create_output_folder(self, output_path: pathlib.Path) -> None:
         lf.mkdir(parents=True, exist_ok=True)
         tf.mkdir(parents=True, exist_ok=True)
 
-    def create_jinja_environment(self) -> jinja2.Environment:
-        template_loader = jinja2.PackageLoader("xleapp.templating", "templates")
-        log_file_loader = jinja2.FileSystemLoader(self.log_folder)
-
-        options: dict[str, t.Any] = {
-            "loader": jinja2.ChoiceLoader([template_loader, log_file_loader]),
-            "autoescape": jinja2.select_autoescape(["html", "xml"]),
-            "extensions": [jinja2.ext.do, IncludeLogFileExtension],
-            "trim_blocks": True,
-            "lstrip_blocks": True,
-        }
-        rv = self.jinja_environment(**options)
-        rv.filters.update(
-            {
-                "is_list": is_list,
-            },
+    def resume_output_folder(self, report_folder: pathlib.Path) -> None:
+        """Uses an existing report folder instead of creating a new one
+
+        Artifacts completed in the folder's checkpoint are restored instead of
+        processed again.
+
+        Args:
+            report_folder: report folder from an earlier run
+
+        Raises:
+            FileNotFoundError: if the folder has no checkpoint to resume from
+        """
+        rf = self.report_folder = pathlib.Path(report_folder)
+        if not (rf / CHECKPOINT_FOLDER).exists():
+            raise FileNotFoundError(f"{repr(str(rf))} has no checkpoint to resume!")
+
+        self.output_path = rf.parent
+        tf = self.temp_folder = rf / "temp"
+        lf = self.log_folder = rf / "Script Logs"
+        lf.mkdir(parents=True, exist_ok=True)
+        tf.mkdir(parents=True, exist_ok=True)
+
+        self.checkpoint = Checkpoint(rf)
+        self.device.update(self.checkpoint.device)
+
+    def enable_checkpoint(self) -> Checkpoint:
+        """Saves each artifact to the report folder as it finishes
+
+        Returns:
+            Checkpoint: the checkpoint for the report folder
+        """
+        self.checkpoint = Checkpoint(self.report_folder)
+        return self.checkpoint
+
+    def enable_case_store(self) -> CaseStore:
+        """Moves the results of each artifact to disk once it finishes
+
+        Returns:
+            CaseStore: the case store in the report folder
+        """
+        self.case_store = CaseStore(self.report_folder / STORE_FILE)
+        return self.case_store
+
+    def enable_result_cache(
+        self,
+        folder: t.Optional[pathlib.Path] = None,
+        hash_files: bool = False,
+    ) -> ResultCache:
+        """Enables caching of artifact results between runs
+
+        Must be called after :meth:`create_output_folder` so files extracted from
+        archives are recognized.
+
+        Args:
+            folder: folder to save the cache. Defaults to the user cache folder.
+            hash_files: hash the contents of each found file for the cache key.
+
+        Returns:
+            ResultCache: the enabled cache
+        """
+        self.result_cache = ResultCache(
+            folder=folder,
+            max_size=self.default_configs["result_cache_size"],
+            hash_files=hash_files,
+            temp_folder=getattr(self, "temp_folder", None),
         )
-        rv.globals.update(g=self)
+        return self.result_cache
 
-        return rv
+    def create_jinja_environment(self) -> jinja2.Environment:
+        bytecode_cache = None
+        if self.default_configs.get("template_cache", True):
+            bytecode_cache = templating.create_template_cache(self.version)
+        return templating.create_environment(
+            self.log_folder,
+            self,
+            environment=self.jinja_environment,
+            bytecode_cache=bytecode_cache,
+        )
 
     @property
     def artifacts(self):
@@ -230,8 +345,72 @@ def run(
         window: t.Optional[PySG.Window] = None,
         thread: t.Optional[ProcessThread] = None,
     ) -> None:
-        self.artifacts.create_queue()
-        self.artifacts.run_queue(window=window, thread=thread)
+        profiler = None
+        if self.default_configs.get("profile"):
+            profiler = Profiler(
+                self.default_configs["profile"], self.log_folder / PROFILE_FOLDER
+            )
+
+        with profiler or contextlib.nullcontext():
+            self.artifacts.create_queue(
+                memory=self.default_configs.get("track_memory"),
+                profiler=profiler,
+            )
+            self.artifacts.run_queue(
+                window=window,
+                thread=thread,
+                checkpoint=self.checkpoint,
+                device=self.device,
+                store=self.case_store,
+            )
+        # Parsed resources are only shared while the artifacts run
+        self.resource_cache.clear()
+        logger_log.debug(f"Resource cache: {self.resource_cache.stats.asdict()}")
+
+    def run_summary(self) -> dict[str, t.Any]:
+        """Summarizes the time, rows and memory used by each processed artifact
+
+        Returns:
+            dict: JSON serializable summary of the run
+        """
+        artifacts = []
+        for selected_artifact in self.artifacts.selected():
+            usage = getattr(selected_artifact, "memory_usage", None)
+            artifacts.append(
+                {
+                    "name": selected_artifact.name,
+                    "cls_name": selected_artifact.cls_name,
+                    "category": selected_artifact.category,
+                    "processed": selected_artifact.processed,
+                    "process_time": selected_artifact.process_time,
+                    "rows": selected_artifact.row_count,
+                    "memory": usage.asdict() if usage else None,
+                }
+            )
+
+        return {
+            "project": self.project,
+            "version": self.version,
+            "device_type": self.device.get("Type"),
+            "processing_time": getattr(self, "processing_time", None),
+            "track_memory": self.default_configs.get("track_memory"),
+            "peak_rss": memory.peak_rss(),
+            "resource_cache": self.resource_cache.stats.asdict(),
+            "artifacts": artifacts,
+        }
+
+    def write_run_summary(self) -> pathlib.Path:
+        """Saves the run summary as `run_summary.json` in the log folder
+
+        Returns:
+            Path: location of the summary
+        """
+        summary_file = self.log_folder / RUN_SUMMARY_FILE
+        summary_file.write_text(
+            json.dumps(self.run_summary(), indent=2, default=str),
+            encoding="utf-8",
+        )
+        return summary_file
 
     def generate_artifact_table(self) -> None:
         artifact.generate_artifact_table(self.artifacts)
@@ -239,6 +418,14 @@ def generate_artifact_table(self) -> None:
     def generate_artifact_path_list(self) -> None:
         artifact.generate_artifact_path_list(self.artifacts)
 
+    def generate_plugin_manifests(self) -> list[pathlib.Path]:
+        """Writes the manifest of every installed plugin
+
+        Returns:
+            list[Path]: location of each manifest
+        """
+        return [plugin.write_manifest() for plugin in self.installed_plugins]
+
     def generate_reports(self) -> None:
         logger_log.info("\nGenerating artifact report files...")
         report.copy_static_files(self.report_folder)
@@ -246,60 +433,140 @@ def generate_reports(self) -> None:
             report_folder=self.report_folder,
             artifacts=self.artifacts,
         )
-
-        for selected_artifact in self.artifacts.selected():
-            msg_artifact = (
-                f"-> {selected_artifact.category} [{selected_artifact.cls_name}]"
-            )
-
-            if selected_artifact.report and selected_artifact.select:
-                html_report = templating.ArtifactHtmlReport(
-                    report_folder=self.report_folder,
-                    log_folder=self.log_folder,
-                    extraction_type=self.extraction_type,
-                    navigation=nav,
+        navigation_changed = True
+        if self.checkpoint:
+            navigation_changed = self.checkpoint.update_navigation(nav)
+
+        # Pages are finished in the order they were submitted, so the log does not
+        # depend on the number of render workers
+        pages: collections.deque[
+            tuple[Artifact, int, str, concurrent.futures.Future | None, bool]
+        ] = collections.deque()
+        # Artifacts are marked reported once their exports are written too
+        finished: list[Artifact] = []
+
+        def finish_page() -> None:
+            selected_artifact, level, message, page, mark = pages.popleft()
+            if page is None or page.result():
+                logger_log.log(level, message)
+                if mark:
+                    finished.append(selected_artifact)
+
+        renderer = templating.RenderPool(
+            self,
+            workers=self.default_configs.get(
+                "render_workers", templating.render.DEFAULT_RENDER_WORKERS
+            ),
+            pool=self.default_configs.get("render_pool"),
+        )
+        with renderer:
+            for selected_artifact in self.artifacts.selected():
+                msg_artifact = (
+                    f"-> {selected_artifact.category} [{selected_artifact.cls_name}]"
                 )
-
-                if html_report(selected_artifact).report:
-                    logger_log.info(f"{msg_artifact}")
-            else:
-                logger_log.warning(
-                    f"{msg_artifact}: "
-                    "Report not generated! Artifact "
-                    "marked for no report generation. Check "
-                    "artifact's 'report' attribute.",
+                reported = bool(
+                    self.checkpoint and self.checkpoint.is_reported(selected_artifact)
                 )
 
-            if selected_artifact.processed and hasattr(selected_artifact, "data"):
-                artifact_name = selected_artifact.name
-                data_list = selected_artifact.data
-                data_headers = selected_artifact.report_headers
-
-                self.dbservice.save(
-                    db_type="tsv",
-                    name=artifact_name,
-                    data_list=data_list,
-                    data_headers=data_headers,
-                )
+                if reported and not navigation_changed:
+                    pages.append(
+                        (
+                            selected_artifact,
+                            logging.INFO,
+                            f"{msg_artifact}: Report unchanged",
+                            None,
+                            False,
+                        )
+                    )
+                    continue
 
-                if selected_artifact.kml:
-                    self.dbservice.save(
-                        db_type="kml",
-                        name=artifact_name,
-                        data_list=data_list,
-                        data_headers=data_headers,
+                if selected_artifact.report and selected_artifact.select:
+                    page = renderer.submit(selected_artifact, nav)
+                    pages.append(
+                        (selected_artifact, logging.INFO, msg_artifact, page, True)
+                    )
+                else:
+                    pages.append(
+                        (
+                            selected_artifact,
+                            logging.WARNING,
+                            f"{msg_artifact}: "
+                            "Report not generated! Artifact "
+                            "marked for no report generation. Check "
+                            "artifact's 'report' attribute.",
+                            None,
+                            True,
+                        )
                     )
 
-                if selected_artifact.timeline:
+                # Streamed artifacts were exported while they were processed
+                if (
+                    selected_artifact.processed
+                    and hasattr(selected_artifact, "data")
+                    and not reported
+                    and not selected_artifact.streamed
+                ):
+                    artifact_name = selected_artifact.name
+                    data_list = selected_artifact.data
+                    data_headers = selected_artifact.report_headers
+
                     self.dbservice.save(
-                        db_type="timeline",
+                        db_type="tsv",
                         name=artifact_name,
                         data_list=data_list,
                         data_headers=data_headers,
                     )
+
+                    if selected_artifact.kml:
+                        self.dbservice.save(
+                            db_type="kml",
+                            name=artifact_name,
+                            data_list=data_list,
+                            data_headers=data_headers,
+                        )
+
+                    if selected_artifact.timeline:
+                        self.dbservice.save(
+                            db_type="timeline",
+                            name=artifact_name,
+                            data_list=data_list,
+                            data_headers=data_headers,
+                        )
+
+                if selected_artifact.processed and not reported:
+                    self.dbservice.save_artifact(selected_artifact)
+
+                # Bounds the snapshots waiting for a worker
+                while len(pages) > 2 * renderer.workers:
+                    finish_page()
+
+            while pages:
+                finish_page()
+        try:
+            self.dbservice.finalize()
+        except db.DatabaseError:
+            # Only some exports failed, the other artifacts are complete
+            self._mark_reported(finished)
+            raise
+        self._mark_reported(finished)
+        if self.case_store:
+            self.case_store.close()
         logger_log.info("Report files generated!")
         logger_log.info(f"Report location: {self.output_path}")
 
+    def _mark_reported(self, artifacts: list[Artifact]) -> None:
+        if not self.checkpoint:
+            return
+        failed = self.dbservice.failed
+        for selected_artifact in artifacts:
+            if selected_artifact.name in failed:
+                logger_log.warning(
+                    f"-> {selected_artifact.cls_name}: Exports failed, the artifact "
+                    "is reported again on --resume"
+                )
+            else:
+                self.checkpoint.mark_reported(selected_artifact)
+
     @property
     def num_to_process(self) -> int:
         return len(self.artifacts.selected())
@@ -15,7 +15,9 @@
 from .decorators import Search as Search
 from .decorators import core_artifact as core_artifact
 from .decorators import long_running_process as long_running_process
+from .lazy import LazyArtifact as LazyArtifact
 from .service import Artifacts as Artifacts
+from .table import ResultTable as ResultTable
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -39,8 +41,8 @@ def generate_artifact_path_list(artifacts) -> None:
 
     with open("path_list.txt", "w") as paths:
         regex_list: set[str] = set()
-        for artifact in artifacts.data:
-            regex_list = regex_list | artifact.regex
+        for artifact in artifacts:
+            regex_list = regex_list | {str(regex) for regex in artifact.regex}
         # Create a single list removing duplications
         ordered_regex_list = "\n".join(regex_list)
         logger_log.info(ordered_regex_list)
@@ -52,6 +54,9 @@ def generate_artifact_path_list(artifacts) -> None:
 def generate_artifact_table(artifacts) -> None:
     """Generates artifact list table.
 
+    Search patterns are recorded when each artifact is defined (or read from the
+    plugin manifest) so no artifact is processed.
+
     Args:
         artifacts: List of artifacts to get regex from.
     """
@@ -66,7 +71,6 @@ def generate_artifact_table(artifacts) -> None:
     with open(output_file, "w") as paths:
         artifact: Artifact
         for artifact in artifacts:
-            artifact.process()
             device = artifact.device_type
             category = artifact.category
             short_name: str = artifact.cls_name
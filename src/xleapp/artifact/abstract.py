@@ -31,11 +31,14 @@
 import xleapp.globals as g
 
 from xleapp import app, artifact
+from xleapp.helpers import tracing
 
 from .descriptors import FoundFiles, Icon, ReportHeaders, SearchRegex
 
 
 if t.TYPE_CHECKING:
+    from xleapp.helpers.memory import MemoryUsage
+
     from .regex import Regex
 
 
@@ -64,6 +67,12 @@ class AbstractArtifactDefaults:
 
     Attributes core, long_running_process, and selected are used
     to track artifacts internally for certain actions.
+
+    Attribute row_count is the number of rows saved by the artifact. Attribute
+    streamed is set when `process()` yields its rows instead of saving them to
+    `data`. See :mod:`xleapp.artifact.stream`.
+
+    Attribute memory_usage is only set when memory tracking is enabled.
     """
 
     category: str = field(init=False, default="Unknown")
@@ -76,12 +85,20 @@ class AbstractArtifactDefaults:
     )
     found: FoundFiles = field(init=False, default=FoundFiles(), compare=False)
     long_running_process: bool = field(init=False, default=False, compare=False)
+    memory_usage: t.Optional[MemoryUsage] = field(
+        init=False,
+        repr=False,
+        compare=False,
+        default=None,
+    )
     processed: bool = field(init=False, default=False, compare=False)
     process_time: float = field(init=False, default=float(), compare=False)
     report: bool = field(init=False, default=True, compare=False)
     report_title: str = field(init=False, default="")
     report_headers: ReportHeaders = field(init=False, default=ReportHeaders())
+    row_count: int = field(init=False, default=0, compare=False)
     select: bool = field(init=False, default=False, compare=False)
+    streamed: bool = field(init=False, default=False, compare=False)
     timeline: bool = field(init=False, default=False, compare=False)
     web_icon: Icon = field(init=False, default=Icon(), compare=False)
 
@@ -109,6 +126,9 @@ def __init_subclass__(cls, *, category, label):
             cls.device = g.app.device
 
             artifact = dataclass(cls, eq=False)()
+            # Patterns recorded by `Search` when the class was defined
+            for search in getattr(cls.process, "searches", ()):
+                artifact.regex = search
             app.__ARTIFACT_PLUGINS__[label] = artifact
 
     def __eq__(self, __o: t.Union[str, Artifact]) -> bool:
@@ -160,13 +180,17 @@ def context(self) -> t.Iterator[Artifact]:
                 if artifact_regex.processed:
                     handles = files[regex]
                 else:
-                    try:
-                        if artifact_regex.return_on_first_hit:
-                            results = {next(seeker.search(regex))}
-                        else:
-                            results = set(seeker.search(regex))
-                    except StopIteration:
-                        results = None
+                    with tracing.span(
+                        "search", artifact=self.cls_name, pattern=regex
+                    ) as span:
+                        try:
+                            if artifact_regex.return_on_first_hit:
+                                results = {next(seeker.search(regex))}
+                            else:
+                                results = set(seeker.search(regex))
+                        except StopIteration:
+                            results = None
+                        span.set(files=len(results or ()))
 
                     if results:
                         files.add(artifact_regex, results, artifact_regex.file_names_only)
@@ -0,0 +1,345 @@
+"""Content keyed cache for artifact results.
+
+Results are keyed by the artifact class, the version of the plugin providing it and a
+digest of every file the artifact found. Re-running the same extraction with a
+different artifact selection or report template can then reuse the parsed data
+instead of calling the artifact's parser again.
+"""
+from __future__ import annotations
+
+import functools
+import hashlib
+import importlib.metadata
+import inspect
+import logging
+import os
+import pathlib
+import pickle
+import typing as t
+import zlib
+
+from dataclasses import dataclass, field
+
+from xleapp._version import __version__
+from xleapp.helpers.utils import user_cache_dir
+
+
+if t.TYPE_CHECKING:
+    from .abstract import Artifact
+
+logger_log = logging.getLogger("xleapp.logfile")
+
+# 2 GiB shared between every case using the same cache folder
+DEFAULT_CACHE_SIZE = 2 * 1024**3
+CACHE_FILE_SUFFIX = ".xlc"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class ArtifactResult:
+    """Snapshot of the results of a processed artifact.
+
+    Attributes:
+        data: rows of data for the report
+        report_headers: column headers for the data
+        report_title: title of the report
+        description: description of the artifact
+        processed: status of the artifact after it ran
+        process_time: time it took to originally process the artifact
+        streamed: rows were streamed to the exports and `data` is a preview. Only
+            checkpoints save streamed results, the result cache does not.
+        row_count: number of rows streamed to the exports
+        version: version of xLEAPP that created the snapshot
+    """
+
+    data: t.Any = field(default_factory=list)
+    report_headers: t.Any = ()
+    report_title: str = ""
+    description: str = ""
+    processed: bool = False
+    process_time: float = 0.0
+    streamed: bool = False
+    row_count: int = 0
+    version: str = __version__
+
+    @classmethod
+    def from_artifact(cls, artifact: Artifact) -> ArtifactResult:
+        """Creates a snapshot from an artifact
+
+        Args:
+            artifact: artifact to take the results from
+
+        Returns:
+            ArtifactResult: snapshot of the results
+        """
+        return cls(
+            data=artifact.data,
+            report_headers=artifact.report_headers,
+            report_title=artifact.report_title,
+            description=getattr(artifact, "description", ""),
+            processed=artifact.processed,
+            process_time=artifact.process_time,
+            streamed=getattr(artifact, "streamed", False),
+            row_count=getattr(artifact, "row_count", len(artifact.data)),
+        )
+
+    def apply(self, artifact: Artifact) -> None:
+        """Restores the snapshot onto an artifact
+
+        Args:
+            artifact: artifact to restore the results to
+        """
+        artifact.data = self.data
+        artifact.report_headers = self.report_headers
+        artifact.report_title = self.report_title
+        artifact.description = self.description
+        artifact.streamed = self.streamed
+        artifact.row_count = self.row_count
+
+    def dumps(self) -> bytes:
+        """Returns the snapshot as compressed bytes"""
+        return zlib.compress(pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL))
+
+    @staticmethod
+    def loads(payload: bytes) -> ArtifactResult:
+        """Creates a snapshot from bytes created with :meth:`dumps`
+
+        Args:
+            payload: compressed snapshot
+
+        Returns:
+            ArtifactResult: the snapshot
+        """
+        return pickle.loads(zlib.decompress(payload))
+
+
+@functools.cache
+def _distributions() -> t.Mapping[str, list[str]]:
+    return importlib.metadata.packages_distributions()
+
+
+def plugin_version(artifact: Artifact) -> str:
+    """Returns the version of the plugin(s) providing an artifact
+
+    The source file of the artifact is also stamped into the version so changes to
+    an artifact during development invalidate the cache without a version bump.
+
+    Args:
+        artifact: artifact to check
+
+    Returns:
+        str: version string of the plugin
+    """
+    module = type(artifact).__module__
+    versions = []
+    for dist in sorted(set(_distributions().get(module.split(".")[0], []))):
+        try:
+            versions.append(f"{dist}={importlib.metadata.version(dist)}")
+        except importlib.metadata.PackageNotFoundError:
+            continue
+
+    try:
+        source = pathlib.Path(inspect.getfile(type(artifact))).stat()
+        versions.append(f"{source.st_size}:{source.st_mtime_ns}")
+    except (OSError, TypeError):
+        pass
+
+    return ";".join(versions) or __version__
+
+
+class ResultCache:
+    """On-disk cache for artifact results
+
+    Each cached result is saved as a single compressed file. The modification time
+    of the file is updated on every hit so the least recently used results are
+    removed first when the cache grows past :attr:`max_size`.
+
+    Args:
+        folder: folder to save results. Defaults to the user cache folder.
+        max_size: maximum size of the cache in bytes.
+        hash_files: include a SHA256 hash of each found file in the key. Slower but
+            catches files changed without a new size or modification time.
+        temp_folder: folder files are extracted to from archives. Extracted files are
+            keyed by their path inside the folder and always hashed since their
+            modification time changes on every run.
+
+    Attributes:
+        hits: number of results loaded from the cache
+        misses: number of results not found in the cache
+    """
+
+    def __init__(
+        self,
+        folder: pathlib.Path | None = None,
+        max_size: int = DEFAULT_CACHE_SIZE,
+        hash_files: bool = False,
+        temp_folder: pathlib.Path | None = None,
+    ) -> None:
+        self.folder = pathlib.Path(folder or user_cache_dir() / "results")
+        self.max_size = max_size
+        self.hash_files = hash_files
+        self.temp_folder = temp_folder
+        self.hits = 0
+        self.misses = 0
+        # Size of the cache folder, counted on the first save
+        self._size: int | None = None
+
+    def __repr__(self) -> str:
+        return (
+            f"<ResultCache folder={repr(self.folder)}, max_size={repr(self.max_size)}, "
+            f"hash_files={repr(self.hash_files)}>"
+        )
+
+    def __str__(self) -> str:
+        return (
+            f"Result cache located at {self.folder} with {self.hits} hits and "
+            f"{self.misses} misses"
+        )
+
+    def key(self, artifact: Artifact) -> str:
+        """Creates the cache key for an artifact
+
+        Args:
+            artifact: artifact to create the key for
+
+        Returns:
+            str: hex digest of the key
+        """
+        digest = hashlib.sha256()
+        cls = type(artifact)
+        for part in (
+            __version__,
+            f"{cls.__module__}.{cls.__qualname__}",
+            plugin_version(artifact),
+            *sorted(str(regex) for regex in artifact.regex),
+        ):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+
+        for path in sorted(str(found.path) for found in artifact.found):
+            digest.update(self._file_digest(pathlib.Path(path)))
+        return digest.hexdigest()
+
+    def _file_digest(self, path: pathlib.Path) -> bytes:
+        try:
+            stat = path.stat()
+        except OSError:
+            return f"{path}|missing".encode()
+
+        if self.temp_folder and path.is_relative_to(self.temp_folder):
+            extracted = path.relative_to(self.temp_folder).as_posix()
+            entry = f"{extracted}|{stat.st_size}".encode()
+        else:
+            extracted = None
+            entry = f"{path}|{stat.st_size}|{stat.st_mtime_ns}".encode()
+
+        if (self.hash_files or extracted) and path.is_file():
+            file_hash = hashlib.sha256()
+            with open(path, "rb") as file:
+                for chunk in iter(functools.partial(file.read, HASH_CHUNK_SIZE), b""):
+                    file_hash.update(chunk)
+            entry += file_hash.digest()
+        return entry
+
+    def _cache_file(self, key: str) -> pathlib.Path:
+        return self.folder / key[:2] / f"{key}{CACHE_FILE_SUFFIX}"
+
+    def load(self, artifact: Artifact) -> bool:
+        """Restores cached results onto an artifact
+
+        Args:
+            artifact: artifact to restore
+
+        Returns:
+            bool: True if the results were found in the cache
+        """
+        cache_file = self._cache_file(self.key(artifact))
+        try:
+            result = ArtifactResult.loads(cache_file.read_bytes())
+        except FileNotFoundError:
+            self.misses += 1
+            return False
+        except (OSError, zlib.error, pickle.UnpicklingError, EOFError, AttributeError):
+            logger_log.debug(f"Removing unreadable cache file {cache_file}")
+            cache_file.unlink(missing_ok=True)
+            self.misses += 1
+            return False
+
+        result.apply(artifact)
+        os.utime(cache_file)
+        self.hits += 1
+        return True
+
+    def save(self, artifact: Artifact) -> None:
+        """Saves the results of an artifact to the cache
+
+        Artifacts which saved files to their export folder are not cached, as a cache
+        hit would not create the files again.
+
+        Args:
+            artifact: artifact to save
+        """
+        export_folder = getattr(artifact, "data_save_folder", None)
+        if export_folder is not None and any(pathlib.Path(export_folder).glob("*")):
+            logger_log.debug(
+                f"-> Results of {artifact.cls_name} not cached: files were exported"
+            )
+            return
+
+        cache_file = self._cache_file(self.key(artifact))
+        try:
+            payload = ArtifactResult.from_artifact(artifact).dumps()
+        except (pickle.PicklingError, TypeError, AttributeError) as err:
+            logger_log.debug(f"-> Results of {artifact.cls_name} not cached: {err}")
+            return
+
+        if self._size is None:
+            self._size = self._folder_size()
+        try:
+            self._size -= cache_file.stat().st_size
+        except OSError:
+            pass
+
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = cache_file.with_suffix(".tmp")
+        temp_file.write_bytes(payload)
+        temp_file.replace(cache_file)
+        self._size += len(payload)
+        if self._size > self.max_size:
+            self.evict()
+
+    def _folder_size(self) -> int:
+        return sum(
+            cache_file.stat().st_size
+            for cache_file in self.folder.glob(f"*/*{CACHE_FILE_SUFFIX}")
+        )
+
+    def evict(self) -> None:
+        """Removes the least recently used results until under :attr:`max_size`.
+
+        :meth:`save` calls it once the results saved by this run grow the cache past
+        :attr:`max_size`.
+        """
+        if not self.folder.exists():
+            self._size = 0
+            return
+
+        entries = []
+        total = 0
+        for cache_file in self.folder.glob(f"*/*{CACHE_FILE_SUFFIX}"):
+            stat = cache_file.stat()
+            entries.append((stat.st_mtime_ns, stat.st_size, cache_file))
+            total += stat.st_size
+
+        for _, size, cache_file in sorted(entries):
+            if total <= self.max_size:
+                break
+            cache_file.unlink(missing_ok=True)
+            total -= size
+        self._size = total
+
+    def clear(self) -> None:
+        """Removes every result from the cache."""
+        for cache_file in self.folder.glob(f"*/*{CACHE_FILE_SUFFIX}"):
+            cache_file.unlink(missing_ok=True)
+        self._size = 0
@@ -0,0 +1,200 @@
+"""Checkpoints artifact results to the report folder.
+
+Each artifact is saved as soon as it finishes processing. When a run is resumed
+into the same report folder, finished artifacts are restored from the checkpoint
+instead of being processed again and only their missing report pages and exports
+are generated.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import pathlib
+import pickle
+import typing as t
+import zlib
+
+from .cache import ArtifactResult
+
+
+if t.TYPE_CHECKING:
+    from xleapp.templating.html import NavigationItem
+
+    from .abstract import Artifact
+
+logger_log = logging.getLogger("xleapp.logfile")
+
+CHECKPOINT_FOLDER = "_Checkpoint"
+STATUS_FILE = "status.json"
+
+
+class Checkpoint:
+    """Status and results of each artifact processed into a report folder
+
+    Args:
+        report_folder: report folder to save the checkpoint in
+
+    Attributes:
+        folder: folder holding the checkpoint files
+        status: status of each artifact keyed by class name
+        device: device information collected by the core artifacts
+    """
+
+    def __init__(self, report_folder: pathlib.Path) -> None:
+        self.folder = pathlib.Path(report_folder) / CHECKPOINT_FOLDER
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.status: dict[str, dict[str, t.Any]] = {}
+        self.device: dict[str, t.Any] = {}
+        self.navigation = ""
+        self._previous_navigation = ""
+
+        status_file = self.folder / STATUS_FILE
+        if status_file.exists():
+            saved = json.loads(status_file.read_text(encoding="utf-8"))
+            self.status = saved.get("artifacts", {})
+            self.device = saved.get("device", {})
+            self.navigation = self._previous_navigation = saved.get("navigation", "")
+
+    def __repr__(self) -> str:
+        return f"<Checkpoint folder={repr(self.folder)}>"
+
+    def __str__(self) -> str:
+        return (
+            f"Checkpoint at {self.folder} with {len(self.completed())} completed "
+            "artifacts"
+        )
+
+    def _write_status(self) -> None:
+        status_file = self.folder / STATUS_FILE
+        temp_file = status_file.with_suffix(".tmp")
+        temp_file.write_text(
+            json.dumps(
+                {
+                    "artifacts": self.status,
+                    "device": self.device,
+                    "navigation": self.navigation,
+                },
+                indent=2,
+                default=str,
+            ),
+            encoding="utf-8",
+        )
+        temp_file.replace(status_file)
+
+    def _result_file(self, artifact: Artifact) -> pathlib.Path:
+        return self.folder / f"{artifact.cls_name}.xlc"
+
+    def completed(self) -> set[str]:
+        """Returns the class names of every artifact processed successfully
+
+        Returns:
+            set[str]: class names of the completed artifacts
+        """
+        return {name for name, status in self.status.items() if status["processed"]}
+
+    def is_completed(self, artifact: Artifact) -> bool:
+        """Checks if an artifact was processed successfully
+
+        Args:
+            artifact: artifact to check
+
+        Returns:
+            bool: True if the artifact was already processed
+        """
+        return artifact.cls_name in self.completed()
+
+    def is_reported(self, artifact: Artifact) -> bool:
+        """Checks if the report files of an artifact were generated
+
+        Args:
+            artifact: artifact to check
+
+        Returns:
+            bool: True if the HTML page and exports were generated
+        """
+        return self.status.get(artifact.cls_name, {}).get("reported", False)
+
+    def save(self, artifact: Artifact, device: t.Mapping | None = None) -> None:
+        """Saves the results and status of a processed artifact
+
+        Args:
+            artifact: artifact that finished processing
+            device: device information to save with the checkpoint
+        """
+        if artifact.processed:
+            try:
+                self._result_file(artifact).write_bytes(
+                    ArtifactResult.from_artifact(artifact).dumps()
+                )
+            except (pickle.PicklingError, TypeError, AttributeError) as err:
+                logger_log.warning(f"-> Checkpoint failed for {artifact.cls_name}: {err}")
+                return
+
+        self.status[artifact.cls_name] = {
+            "name": artifact.name,
+            "category": artifact.category,
+            "device_type": artifact.device_type,
+            "processed": artifact.processed,
+            "process_time": artifact.process_time,
+            "reported": False,
+        }
+        if device is not None:
+            self.device = dict(device)
+        self._write_status()
+
+    def restore(self, artifact: Artifact) -> bool:
+        """Restores the results of a completed artifact
+
+        Args:
+            artifact: artifact to restore
+
+        Returns:
+            bool: True if the artifact was restored
+        """
+        if not self.is_completed(artifact):
+            return False
+
+        try:
+            result = ArtifactResult.loads(self._result_file(artifact).read_bytes())
+        except (OSError, zlib.error, pickle.UnpicklingError, EOFError) as err:
+            logger_log.warning(f"-> Checkpoint for {artifact.cls_name} unusable: {err}")
+            del self.status[artifact.cls_name]
+            self._write_status()
+            return False
+
+        result.apply(artifact)
+        artifact.processed = True
+        artifact.process_time = self.status[artifact.cls_name]["process_time"]
+        return True
+
+    def mark_reported(self, artifact: Artifact) -> None:
+        """Marks the report files of an artifact as generated
+
+        Args:
+            artifact: artifact that was reported
+        """
+        if artifact.cls_name in self.status:
+            self.status[artifact.cls_name]["reported"] = True
+            self._write_status()
+
+    def update_navigation(self, navigation: dict[str, set[NavigationItem]]) -> bool:
+        """Records the report navigation
+
+        Pages rendered with an older navigation need to be rendered again so every
+        page links to every artifact.
+
+        Args:
+            navigation: navigation of the report
+
+        Returns:
+            bool: True if the navigation changed since the last run
+        """
+        items = sorted(
+            f"{category}/{item.name}"
+            for category, nav_items in navigation.items()
+            for item in nav_items
+        )
+        self.navigation = hashlib.sha256("\n".join(items).encode("utf-8")).hexdigest()
+        self._write_status()
+        return self.navigation != self._previous_navigation
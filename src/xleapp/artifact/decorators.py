@@ -1,17 +1,27 @@
 from __future__ import annotations
 
 import functools
+import inspect
 import logging
 import sqlite3
 import typing as t
 
+import xleapp.globals as g
+
 from xleapp.helpers.types import DecoratedFunc
 
 from .abstract import Artifact
+from .regex import Regex
+from .stream import stream_rows
+from .table import ResultTable
 
 
 logger_log = logging.getLogger("xleapp.logfile")
 
+# Search patterns of each artifact keyed by "<module>.<class name>". Filled in when
+# the artifact class is defined so patterns are known without processing.
+search_registry: dict[str, list[tuple[str, bool, bool]]] = {}
+
 
 def core_artifact(cls: DecoratedFunc) -> DecoratedFunc:
     """Decorator to mark an artifact as 'core'
@@ -65,6 +75,22 @@ def lrp_wrapper(cls):
     return t.cast(DecoratedFunc, lrp_wrapper(cls))
 
 
+def search_patterns(artifact_cls: type) -> set[Regex]:
+    """Returns the search patterns of an artifact without processing it
+
+    Args:
+        artifact_cls: class of the artifact
+
+    Returns:
+        set[Regex]: search patterns recorded by :obj:`Search`
+    """
+    artifact_name = f"{artifact_cls.__module__}.{artifact_cls.__qualname__}"
+    searches = search_registry.get(artifact_name) or getattr(
+        getattr(artifact_cls, "process", None), "searches", ()
+    )
+    return {Regex(*search) for search in searches}
+
+
 def artifact_process(cls: DecoratedFunc) -> DecoratedFunc:
     @functools.wraps(cls)
     def process_wrapper(cls) -> None:
@@ -81,6 +107,9 @@ def process_wrapper(cls) -> None:
 class Search:
     """Decorator for searching files for an artifact.
 
+    The search is recorded in :data:`search_registry` and on the decorated function's
+    `searches` attribute when the artifact class is defined.
+
     Args:
        file_names_only: Returns only file names (:obj:`Path` objects).
            Defaults to False.
@@ -97,18 +126,37 @@ def __init__(
         self.search = (search, file_names_only, return_on_first_hit)
 
     def __call__(self, func):
+        artifact_name = f"{func.__module__}.{func.__qualname__.rpartition('.')[0]}"
+        search_registry.setdefault(artifact_name, []).append(self.search)
+
         def search_wrapper(cls: Artifact) -> bool:
             try:
                 cls.regex = self.search
                 with cls.context() as artifact:
                     if artifact.found:
-                        func(artifact)
+                        result_cache = getattr(g.app, "result_cache", None)
+                        if result_cache and result_cache.load(artifact):
+                            logger_log.info("-> Results loaded from cache")
+                        else:
+                            rows = func(artifact)
+                            if inspect.isgenerator(rows):
+                                # Not cached: a cache hit would skip the exports
+                                # the rows were streamed to
+                                stream_rows(artifact, rows)
+                            else:
+                                if g.app.default_configs.get("compact_data"):
+                                    artifact.data = ResultTable.from_data(
+                                        artifact.data, artifact.report_headers
+                                    )
+                                if result_cache:
+                                    result_cache.save(artifact)
                     cls.processed = True
             except sqlite3.OperationalError as ex:
                 logger_log.error(f"-> Error {ex}")
             return cls.processed
 
         functools.update_wrapper(search_wrapper, func)
+        search_wrapper.searches = (*getattr(func, "searches", ()), self.search)
         return search_wrapper
 
     def __get__(self, obj, objtype):
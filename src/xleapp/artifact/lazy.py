@@ -0,0 +1,123 @@
+"""Placeholders for artifacts listed in a plugin manifest.
+
+A :obj:`LazyArtifact` carries everything needed to list and select an artifact
+without importing the module defining it. The module is only imported when the
+artifact is about to be processed, which replaces the placeholder in the artifact
+service with the real :obj:`Artifact`.
+"""
+from __future__ import annotations
+
+import importlib
+import typing as t
+
+from dataclasses import dataclass, field
+
+from .regex import Regex
+
+
+if t.TYPE_CHECKING:
+    from .abstract import Artifact
+
+
+@dataclass(eq=False)
+class LazyArtifact:
+    """Artifact listed in a plugin manifest but not imported yet.
+
+    Attributes:
+        name: name (label) of the artifact
+        category: category of the artifact
+        device_type: device type of the artifact
+        cls_name: class name of the artifact
+        module: module defining the artifact
+        regex: search patterns used by the artifact
+        core: artifact is a core artifact
+        long_running_process: artifact is a long running process
+        select: artifact is selected for processing
+    """
+
+    name: str
+    category: str
+    device_type: str
+    cls_name: str
+    module: str
+    regex: set[Regex] = field(default_factory=set)
+    core: bool = False
+    long_running_process: bool = False
+    select: bool = False
+    processed: bool = field(init=False, default=False)
+    report: bool = field(init=False, default=True)
+
+    def __eq__(self, __o: object) -> bool:
+        if isinstance(__o, str):
+            return self.name == __o
+        if hasattr(__o, "cls_name"):
+            return (self.category, self.name, self.device_type) == (
+                __o.category,
+                __o.name,
+                __o.device_type,
+            )
+        return False
+
+    def __lt__(self, __o: t.Any) -> bool:
+        return (self.device_type, self.category, self.name) < (
+            __o.device_type,
+            __o.category,
+            __o.name,
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.category, self.name, self.device_type))
+
+    @classmethod
+    def from_manifest(cls, entry: dict[str, t.Any]) -> LazyArtifact:
+        """Creates the placeholder from a manifest entry
+
+        Args:
+            entry: manifest entry created by :meth:`manifest_entry`
+
+        Returns:
+            LazyArtifact: placeholder for the artifact
+        """
+        entry = dict(entry)
+        entry["regex"] = {Regex(*search) for search in entry.get("regex", [])}
+        return cls(**entry)
+
+    @staticmethod
+    def manifest_entry(artifact: Artifact | LazyArtifact) -> dict[str, t.Any]:
+        """Creates a manifest entry for an artifact
+
+        Args:
+            artifact: artifact to describe
+
+        Returns:
+            dict: JSON serializable manifest entry
+        """
+        return {
+            "name": artifact.name,
+            "category": artifact.category,
+            "device_type": artifact.device_type,
+            "cls_name": artifact.cls_name,
+            "module": type(artifact).__module__
+            if not isinstance(artifact, LazyArtifact)
+            else artifact.module,
+            "regex": sorted(
+                [search.regex, search.file_names_only, search.return_on_first_hit]
+                for search in artifact.regex
+            ),
+            "core": artifact.core,
+            "long_running_process": artifact.long_running_process,
+        }
+
+    def load(self) -> Artifact:
+        """Imports the module defining the artifact
+
+        Importing the module registers the real artifact which replaces this
+        placeholder in the artifact service.
+
+        Returns:
+            Artifact: the imported artifact
+        """
+        from xleapp import app
+
+        importlib.import_module(self.module)
+        return app.__ARTIFACT_PLUGINS__[self.cls_name]
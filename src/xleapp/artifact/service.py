@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import contextlib
 import functools
 import logging
 import queue
@@ -7,33 +8,94 @@
 
 from plistlib import InvalidFileException
 
+from xleapp.helpers import tracing
+from xleapp.helpers.db import clear_schema_cache
 from xleapp.helpers.decorators import timed
+from xleapp.helpers.memory import MemoryMonitor
 from xleapp.helpers.types import DecoratedFunc
 
+from .lazy import LazyArtifact
+
 
 if t.TYPE_CHECKING:
     import PySimpleGUI as PySG
 
     from xleapp import Artifact
     from xleapp.gui import ProcessThread
+    from xleapp.helpers.profiler import Profiler
     from xleapp.plugins import Plugin
 
+    from xleapp.report.store import CaseStore
+
+    from .checkpoint import Checkpoint
+
 logger_log = logging.getLogger("xleapp.logfile")
 
 
-def artifact_process(cls: DecoratedFunc) -> DecoratedFunc:
+def count_rows(artifact: Artifact) -> int:
+    """Counts the rows an artifact saved for its report
+
+    Args:
+        artifact: processed artifact
+
+    Returns:
+        int: number of rows across every table of the artifact
+    """
+    if artifact.streamed:
+        return artifact.row_count
+    try:
+        if isinstance(artifact.report_headers, list):
+            return sum(len(table) for table in artifact.data)
+        return len(artifact.data)
+    except TypeError:
+        return 0
+
+
+def artifact_process(
+    cls: DecoratedFunc, memory: str = None, profiler: Profiler = None
+) -> DecoratedFunc:
+    """Wraps the `process()` function of an artifact for the process queue
+
+    Args:
+        cls: artifact to process
+        memory: measures the memory used by the artifact. Either "rss" or
+            "tracemalloc". See :class:`~xleapp.helpers.memory.MemoryMonitor`.
+            Defaults to None.
+        profiler: profiles the artifact while it is processed. Defaults to None.
+
+    Returns:
+        DecoratedFunc: the wrapped function
+    """
+
     @functools.wraps(cls)
     def process_wrapper() -> None:
         msg_artifact = f"{cls.category} [{cls.cls_name}] artifact"
         logger_log.info(f"\n{msg_artifact} processing...")
-        try:
-            cls.process_time, _ = process_wrapper.orig_func()
-        except InvalidFileException as err:
-            logger_log.warning(f"-> {err}")
-            cls.processed = False
-
-        if not cls.processed:
-            logger_log.warning("-> Failed to processed!")
+        monitor = MemoryMonitor(memory) if memory else contextlib.nullcontext()
+        with tracing.span("process", artifact=cls.cls_name) as span, monitor:
+            try:
+                if profiler:
+                    cls.process_time, _ = profiler.profile(
+                        cls.cls_name, process_wrapper.orig_func
+                    )
+                else:
+                    cls.process_time, _ = process_wrapper.orig_func()
+            except InvalidFileException as err:
+                logger_log.warning(f"-> {err}")
+                cls.processed = False
+            finally:
+                # Schemas are shared while the artifact runs. Dropping them releases
+                # the connections they reference.
+                clear_schema_cache()
+
+            if not cls.processed:
+                logger_log.warning("-> Failed to processed!")
+            else:
+                cls.row_count = count_rows(cls)
+            span.set(processed=cls.processed, rows=cls.row_count)
+        if memory:
+            cls.memory_usage = monitor.usage
+            logger_log.info(f"-> {cls.row_count} rows; memory: {monitor.usage}")
         logger_log.info(f"{msg_artifact} finished in {cls.process_time:.2f}s")
 
     process_wrapper.orig_func = timed(cls.process)
@@ -58,11 +120,25 @@ def __getitem__(self, __key: str) -> Artifact:
                 return artifact
         raise ValueError(f"Artifact '{__key}' not found in artifact service!")
 
-    def __setitem__(self, __key: str, __value: Artifact) -> None:
+    def __setitem__(self, __key: str, __value: Artifact | LazyArtifact) -> None:
         if __key in self:
             raise ValueError(f"Artifact '{__key}' already registered!")
+
+        # Importing an artifact listed in a plugin manifest replaces its placeholder
+        for idx, artifact in enumerate(self._store):
+            if isinstance(artifact, LazyArtifact) and artifact == __key:
+                __value.select = artifact.select
+                self._store[idx] = __value
+                return
         self._store.append(__value)
 
+    def __contains__(self, __key: object) -> bool:
+        return any(
+            artifact == __key
+            for artifact in self._store
+            if not isinstance(artifact, LazyArtifact)
+        )
+
     def __delitem__(self, __key: str) -> None:
         for artifact in self._store:
             if artifact.cls_name.lower() == __key:
@@ -72,7 +148,7 @@ def __iter__(self) -> t.Iterator[str, Artifact]:
         return iter(self._store)
 
     def __len__(self) -> int:
-        return len(self)
+        return len(self._store)
 
     def __repr__(self) -> str:
         return "Artifacts()"
@@ -98,27 +174,83 @@ def processing_device_type(self, device_type: str):
             if artifact.core and artifact.device_type == device_type:
                 artifact.select = True
 
-    def create_queue(self):
+    def load(self, selected_only: bool = True) -> None:
+        """Imports artifacts listed only in a plugin manifest
+
+        Args:
+            selected_only: import only the artifacts selected for processing.
+                Defaults to True.
+        """
+        lazy_artifacts = [
+            artifact
+            for artifact in (self.selected() if selected_only else self)
+            if isinstance(artifact, LazyArtifact)
+        ]
+        for artifact in lazy_artifacts:
+            artifact.load()
+
+    def search_plan(self, selected_only: bool = True) -> dict[str, list[str]]:
+        """Returns which artifacts use each search pattern
+
+        Patterns are known without processing any artifact so the searches can be
+        planned (or shared) before processing starts.
+
+        Args:
+            selected_only: only include artifacts selected for processing.
+                Defaults to True.
+
+        Returns:
+            dict: search patterns mapped to the class names of the artifacts
+        """
+        plan: dict[str, list[str]] = {}
+        for artifact in self.selected() if selected_only else self:
+            for regex in artifact.regex:
+                plan.setdefault(str(regex), []).append(artifact.cls_name)
+        return dict(sorted(plan.items()))
+
+    def create_queue(self, memory: str = None, profiler: Profiler = None):
+        """Queues the selected artifacts for processing
+
+        Args:
+            memory: measures the memory used by each artifact. Either "rss" or
+                "tracemalloc". Defaults to None.
+            profiler: profiles each artifact while it is processed. Defaults to None.
+        """
+        self.load()
         for artifact in self:
+            if isinstance(artifact, LazyArtifact):
+                continue
+
             priority = 10
             if artifact.core:
                 priority = 1
 
             priority = getattr(artifact, "priority", None) or priority
 
-            artifact.process = artifact_process(artifact)
+            artifact.process = artifact_process(
+                artifact, memory=memory, profiler=profiler
+            )
             self.process_queue.put((priority, artifact))
 
     def run_queue(
         self,
         window: PySG.Window = None,
         thread: ProcessThread = None,
+        checkpoint: Checkpoint = None,
+        device: t.Mapping = None,
+        store: CaseStore = None,
     ) -> None:
         """Processes all the selected artifacts
 
         Args:
             window: :mod:`PySimpleGUI` window when running the GUI. Defaults to None.
             thread: :mod:`threading` instance for processing artifacts. Defaults to None.
+            checkpoint: saves each artifact as it finishes. Artifacts already
+                completed in the checkpoint are restored instead of processed.
+                Defaults to None.
+            device: device information saved with the checkpoint. Defaults to None.
+            store: moves the data of each artifact to the case store once it
+                finishes. Defaults to None.
         """
         num_processed = 0
         plugins: Plugin = self.selected()
@@ -139,7 +271,17 @@ def run_queue(
                 self.process_queue.task_done()
                 continue
 
-            artifact.process()
+            if checkpoint and checkpoint.restore(artifact):
+                logger_log.info(
+                    f"\n{artifact.category} [{artifact.cls_name}] artifact restored "
+                    "from checkpoint"
+                )
+            else:
+                artifact.process()
+                if checkpoint:
+                    checkpoint.save(artifact, device=device)
+            if store:
+                store.spill(artifact)
             num_processed += 1
             if window:
                 window.write_event_value("<THREAD>", num_processed)
@@ -0,0 +1,122 @@
+"""Streams rows produced by an artifact into the report exports.
+
+An artifact's `process()` can be a generator yielding single rows or lists of rows
+(batches) instead of filling `self.data`::
+
+    @Search("**/knowledgeC.db")
+    def process(self):
+        for fp in self.found:
+            cursor = fp().cursor()
+            cursor.execute(query)
+            while rows := cursor.fetchmany(5000):
+                yield rows
+
+Rows are written to the TSV, KML and timeline exports as each batch arrives. Only
+the first :data:`DEFAULT_PREVIEW_ROWS` rows are kept in `self.data` for the HTML
+report, so memory use depends on the batch size rather than the number of rows.
+"""
+from __future__ import annotations
+
+import itertools
+import logging
+import typing as t
+
+import xleapp.globals as g
+
+
+if t.TYPE_CHECKING:
+    from .abstract import Artifact
+
+logger_log = logging.getLogger("xleapp.logfile")
+
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_PREVIEW_ROWS = 10000
+
+
+def is_batch(item: t.Any) -> bool:
+    """Checks if a produced item is a batch of rows instead of a single row
+
+    Args:
+        item: item yielded by an artifact
+
+    Returns:
+        bool: True if the item is a list of rows
+    """
+    return isinstance(item, list) and bool(item) and isinstance(item[0], (list, tuple))
+
+
+def iter_batches(
+    producer: t.Iterable[t.Any], batch_size: int = DEFAULT_BATCH_SIZE
+) -> t.Iterator[list[t.Sequence[t.Any]]]:
+    """Groups rows yielded by a producer into batches
+
+    Batches yielded by the producer are passed through as they are. Single rows are
+    collected until `batch_size` rows are waiting.
+
+    Args:
+        producer: iterable yielding rows or batches of rows
+        batch_size: number of single rows per batch
+
+    Yields:
+        list: batch of rows
+    """
+    pending: list[t.Sequence[t.Any]] = []
+    for item in producer:
+        if is_batch(item):
+            if pending:
+                yield pending
+                pending = []
+            yield item
+        elif isinstance(item, list) and not item:
+            continue
+        else:
+            pending.append(item)
+            if len(pending) >= batch_size:
+                yield pending
+                pending = []
+    if pending:
+        yield pending
+
+
+def stream_rows(artifact: Artifact, producer: t.Iterable[t.Any]) -> int:
+    """Writes the rows of a producer to the exports of an artifact
+
+    Args:
+        artifact: artifact producing the rows
+        producer: iterable yielding rows or batches of rows
+
+    Raises:
+        TypeError: if the artifact has more than one table
+
+    Returns:
+        int: number of rows written
+    """
+    if isinstance(artifact.report_headers, list):
+        raise TypeError(
+            f"{artifact.cls_name} has more than one table. Only artifacts with a "
+            "single table can stream rows!"
+        )
+
+    configs = g.app.default_configs
+    batch_size = configs.get("stream_batch_size", DEFAULT_BATCH_SIZE)
+    preview_rows = configs.get("stream_preview_rows", DEFAULT_PREVIEW_ROWS)
+
+    artifact.data = []
+    artifact.row_count = 0
+    artifact.streamed = True
+
+    with g.app.dbservice.open_stream(
+        name=artifact.name,
+        data_headers=artifact.report_headers,
+        kml=artifact.kml,
+        timeline=artifact.timeline,
+    ) as export:
+        for batch in iter_batches(producer, batch_size):
+            export.write(batch)
+            missing = preview_rows - len(artifact.data)
+            if missing > 0:
+                artifact.data.extend(itertools.islice(batch, missing))
+            artifact.row_count += len(batch)
+
+    logger_log.info(f"-> Streamed {artifact.row_count} rows to the exports")
+    return artifact.row_count
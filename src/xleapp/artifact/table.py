@@ -0,0 +1,357 @@
+"""Compact, column based storage for artifact results.
+
+A :obj:`ResultTable` behaves like the list of rows artifacts usually save in
+`self.data`, but keeps each column in a typed :mod:`array` instead of one Python
+object per value. Columns of repeated strings (bundle IDs, contact names, ...) are
+dictionary encoded so each distinct string is stored only once.
+
+Example:
+
+    >>> table = ResultTable(("Timestamp", "Bundle ID", "Count"))
+    >>> table.append(("2022-01-01 10:00:00", "com.apple.mobilesafari", 3))
+    >>> table[0]
+    ('2022-01-01 10:00:00', 'com.apple.mobilesafari', 3)
+    >>> table.column("Bundle ID")
+    ['com.apple.mobilesafari']
+"""
+from __future__ import annotations
+
+import array
+import collections.abc
+import typing as t
+
+
+# Strings columns stop being dictionary encoded once more than half their values are
+# distinct. The ratio is only checked after enough rows to be meaningful.
+DICTIONARY_RATIO = 0.5
+MIN_ROWS_FOR_RATIO = 1024
+
+
+class Column:
+    """Single column of a :obj:`ResultTable`
+
+    The storage is chosen from the first value which is not `None`:
+
+    * `int` values use a signed 64-bit array
+    * `float` values use a double array
+    * `str` values use a dictionary: an array of codes and a list of distinct values
+    * anything else (or a mix of types) uses a plain list
+
+    `int` and `float` columns track `None` values in a separate mask.
+    """
+
+    __slots__ = ("kind", "_values", "_nulls", "_codes", "_lookup", "_length")
+
+    def __init__(self) -> None:
+        self.kind: str | None = None
+        self._values: t.Any = None
+        self._nulls: bytearray | None = None
+        self._codes: array.array | None = None
+        self._lookup: dict[t.Any, int] | None = None
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __repr__(self) -> str:
+        return f"<Column kind={repr(self.kind)}, length={self._length}>"
+
+    def _start(self, value: t.Any) -> None:
+        value_type = type(value)
+        if value_type is int:
+            self.kind = "int"
+            self._values = array.array("q", bytes(8 * self._length))
+        elif value_type is float:
+            self.kind = "float"
+            self._values = array.array("d", bytes(8 * self._length))
+        elif value_type is str:
+            self.kind = "str"
+            self._values = [None]
+            self._lookup = {None: 0}
+            self._codes = array.array("L", bytes(self._codes_itemsize() * self._length))
+            return
+        else:
+            self.kind = "object"
+            self._values = [None] * self._length
+            return
+        self._nulls = bytearray(b"\x01" * self._length)
+
+    @staticmethod
+    def _codes_itemsize() -> int:
+        return array.array("L").itemsize
+
+    def _to_object(self) -> None:
+        self._values = list(self)
+        self.kind = "object"
+        self._nulls = self._codes = self._lookup = None
+
+    def append(self, value: t.Any) -> None:
+        """Appends a value to the column
+
+        Args:
+            value: value to append
+        """
+        if self.kind is None:
+            if value is None:
+                self._length += 1
+                return
+            self._start(value)
+
+        if self.kind == "str":
+            if value is None or type(value) is str:
+                code = self._lookup.get(value)
+                if code is None:
+                    code = self._lookup[value] = len(self._values)
+                    self._values.append(value)
+                self._codes.append(code)
+                self._length += 1
+                if (
+                    self._length >= MIN_ROWS_FOR_RATIO
+                    and len(self._values) > self._length * DICTIONARY_RATIO
+                ):
+                    self._to_object()
+                return
+            self._to_object()
+        elif self.kind in ("int", "float"):
+            if value is None:
+                self._values.append(0)
+                self._nulls.append(1)
+                self._length += 1
+                return
+            if type(value) is (int if self.kind == "int" else float):
+                try:
+                    self._values.append(value)
+                except OverflowError:
+                    self._to_object()
+                else:
+                    self._nulls.append(0)
+                    self._length += 1
+                    return
+            else:
+                self._to_object()
+
+        self._values.append(value)
+        self._length += 1
+
+    def __getitem__(self, index: int) -> t.Any:
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("column index out of range")
+
+        if self.kind is None:
+            return None
+        if self.kind == "str":
+            return self._values[self._codes[index]]
+        if self.kind in ("int", "float"):
+            return None if self._nulls[index] else self._values[index]
+        return self._values[index]
+
+    def __iter__(self) -> t.Iterator[t.Any]:
+        if self.kind is None:
+            return iter([None] * self._length)
+        if self.kind == "str":
+            values = self._values
+            return (values[code] for code in self._codes)
+        if self.kind in ("int", "float"):
+            return (
+                None if null else value
+                for value, null in zip(self._values, self._nulls)
+            )
+        return iter(self._values)
+
+    @property
+    def dictionary(self) -> list[t.Any] | None:
+        """Distinct values of a dictionary encoded column, `None` otherwise"""
+        return self._values if self.kind == "str" else None
+
+    @property
+    def codes(self) -> array.array | None:
+        """Codes into :attr:`dictionary` for each row, `None` if not encoded"""
+        return self._codes if self.kind == "str" else None
+
+    @property
+    def array(self) -> array.array | None:
+        """Typed array of an `int` or `float` column, `None` otherwise
+
+        Rows holding `None` are stored as 0 in the array.
+        """
+        return self._values if self.kind in ("int", "float") else None
+
+    def nbytes(self) -> int:
+        """Approximate memory used by the column's storage in bytes"""
+        if self.kind in ("int", "float"):
+            return self._values.itemsize * len(self._values) + len(self._nulls)
+        if self.kind == "str":
+            return self._codes.itemsize * len(self._codes) + sum(
+                len(value) for value in self._values if value is not None
+            )
+        return 0
+
+
+class ResultTable(collections.abc.Sequence):
+    """Compact table of rows for an artifact report
+
+    Rows are returned as tuples so the table can be used anywhere a list of rows is
+    expected (report templates, :obj:`DBService`, ...).
+
+    Args:
+        headers: column headers of the table
+        rows: rows to add to the table. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        headers: t.Sequence[str],
+        rows: t.Iterable[t.Sequence[t.Any]] | None = None,
+    ) -> None:
+        self.headers = tuple(headers)
+        self._columns = [Column() for _ in self.headers]
+        self._length = 0
+        if rows is not None:
+            self.extend(rows)
+
+    def __repr__(self) -> str:
+        return f"<ResultTable headers={repr(self.headers)}, rows={self._length}>"
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("table index out of range")
+        return tuple(column[index] for column in self._columns)
+
+    def __iter__(self) -> t.Iterator[tuple[t.Any, ...]]:
+        if not self._columns:
+            return iter([()] * self._length)
+        return zip(*self._columns)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, collections.abc.Sequence):
+            return len(self) == len(other) and all(
+                tuple(row) == tuple(other_row)
+                for row, other_row in zip(self, other)
+            )
+        return NotImplemented
+
+    def append(self, row: t.Sequence[t.Any]) -> None:
+        """Appends a row to the table
+
+        Args:
+            row: values for each column
+
+        Raises:
+            ValueError: if the row does not have a value for each column
+        """
+        if len(row) != len(self._columns):
+            raise ValueError(
+                f"Expected {len(self._columns)} values in row but got {len(row)}!"
+            )
+        for column, value in zip(self._columns, row):
+            column.append(value)
+        self._length += 1
+
+    def extend(self, rows: t.Iterable[t.Sequence[t.Any]]) -> None:
+        """Appends rows to the table
+
+        Args:
+            rows: rows to append
+        """
+        for row in rows:
+            self.append(row)
+
+    def _index(self, key: int | str) -> int:
+        if isinstance(key, str):
+            try:
+                return self.headers.index(key)
+            except ValueError as err:
+                raise KeyError(f"Column {repr(key)} not in table!") from err
+        return key
+
+    def get_column(self, key: int | str) -> Column:
+        """Returns the storage of a column
+
+        Args:
+            key: index or header of the column
+
+        Returns:
+            Column: the column's storage
+        """
+        return self._columns[self._index(key)]
+
+    def column(self, key: int | str) -> list[t.Any]:
+        """Returns the values of a column
+
+        Args:
+            key: index or header of the column
+
+        Returns:
+            list: values of the column
+        """
+        return list(self.get_column(key))
+
+    def replace_column(self, key: int | str, values: t.Iterable[t.Any]) -> None:
+        """Replaces the values of a column, for example to format timestamps
+
+        Args:
+            key: index or header of the column
+            values: new value for each row
+
+        Raises:
+            ValueError: if there is not a value for each row
+        """
+        column = Column()
+        for value in values:
+            column.append(value)
+        if len(column) != self._length:
+            raise ValueError(f"Expected {self._length} values but got {len(column)}!")
+        self._columns[self._index(key)] = column
+
+    def columns(self) -> dict[str, list[t.Any]]:
+        """Returns the values of every column keyed by header
+
+        Returns:
+            dict: values of each column
+        """
+        return {
+            header: list(column) for header, column in zip(self.headers, self._columns)
+        }
+
+    def nbytes(self) -> int:
+        """Approximate memory used by the table's storage in bytes"""
+        return sum(column.nbytes() for column in self._columns)
+
+    @classmethod
+    def from_data(cls, data: t.Any, headers: t.Any) -> t.Any:
+        """Converts artifact data to result tables
+
+        Handles both a single table (`headers` is a tuple) and several tables
+        (`headers` is a list of tuples). Data that does not match the headers is
+        returned unchanged.
+
+        Args:
+            data: artifact data
+            headers: artifact report headers
+
+        Returns:
+            ResultTable, a list of ResultTables or the unchanged data
+        """
+        if isinstance(data, ResultTable) or not headers:
+            return data
+
+        try:
+            if isinstance(headers, list):
+                if len(data) != len(headers):
+                    return data
+                return [
+                    table if isinstance(table, ResultTable) else cls(table_headers, table)
+                    for table, table_headers in zip(data, headers)
+                ]
+            return cls(headers, data)
+        except (TypeError, ValueError):
+            return data
@@ -0,0 +1,8 @@
+"""
+Benchmarks on synthetic extractions
+"""
+from .generator import SCALES as SCALES
+from .generator import ExtractionSpec as ExtractionSpec
+from .generator import generate as generate
+from .suite import compare as compare
+from .suite import run as run
@@ -0,0 +1,199 @@
+"""Generates synthetic extractions for benchmarks.
+
+The same :obj:`ExtractionSpec` always produces the same files, so results can be
+compared between versions and machines. Each extraction contains filler files spread
+over nested folders and SQLite databases (`Bench<N>.sqlite`) read by the benchmark
+artifact in :mod:`xleapp.bench.plugin`.
+"""
+from __future__ import annotations
+
+import os
+import pathlib
+import random
+import shutil
+import sqlite3
+import tarfile
+import typing as t
+import zipfile
+
+from dataclasses import asdict, dataclass
+
+
+# Bump when the generated files change so old extractions are not reused
+GENERATOR_VERSION = 1
+EXTRACTION_KINDS = ("dir", "zip", "tar")
+BUNDLE_IDS = (
+    "com.apple.mobilesafari",
+    "com.apple.Maps",
+    "com.apple.MobileSMS",
+    "com.apple.mobilenotes",
+    "com.apple.camera",
+    "com.burbn.instagram",
+    "net.whatsapp.WhatsApp",
+    "com.google.chrome.ios",
+)
+FOLDER_NAMES = ("Library", "Caches", "Containers", "Data", "Application", "Media")
+
+
+@dataclass(frozen=True)
+class ExtractionSpec:
+    """Size and shape of a synthetic extraction
+
+    Attributes:
+        files: number of filler files
+        depth: deepest level of nested folders
+        databases: number of SQLite databases
+        rows: number of rows in each database
+        seed: seed of the random generator
+    """
+
+    files: int = 200
+    depth: int = 3
+    databases: int = 2
+    rows: int = 1_000
+    seed: int = 0
+
+    @property
+    def slug(self) -> str:
+        """Unique name of the extraction"""
+        return (
+            f"bench-v{GENERATOR_VERSION}-f{self.files}-d{self.depth}-"
+            f"db{self.databases}-r{self.rows}-s{self.seed}"
+        )
+
+    def asdict(self) -> dict[str, t.Any]:
+        return asdict(self)
+
+
+SCALES = {
+    "small": ExtractionSpec(files=200, depth=3, databases=2, rows=1_000),
+    "medium": ExtractionSpec(files=2_000, depth=5, databases=4, rows=50_000),
+    "large": ExtractionSpec(files=20_000, depth=8, databases=8, rows=500_000),
+}
+
+
+def _random_folder(rng: random.Random, depth: int) -> pathlib.Path:
+    parts = [
+        f"{rng.choice(FOLDER_NAMES)}{rng.randrange(4)}"
+        for _ in range(rng.randint(1, max(depth, 1)))
+    ]
+    return pathlib.Path("private", "var", "mobile", *parts)
+
+
+def _create_database(db_file: pathlib.Path, rows: int, rng: random.Random) -> None:
+    db = sqlite3.connect(db_file)
+    db.execute(
+        """
+        CREATE TABLE events(
+            id INTEGER PRIMARY KEY,
+            timestamp REAL,
+            bundle_id TEXT,
+            latitude REAL,
+            longitude REAL,
+            value INTEGER
+        )
+        """
+    )
+    start = 600_000_000.0  # 2020-01-06 in Mac absolute time
+    batch = []
+    for row in range(rows):
+        batch.append(
+            (
+                start + row * 60 + rng.random(),
+                rng.choice(BUNDLE_IDS),
+                round(rng.uniform(-90, 90), 6),
+                round(rng.uniform(-180, 180), 6),
+                rng.randrange(1_000_000),
+            )
+        )
+        if len(batch) == 10_000:
+            db.executemany("INSERT INTO events VALUES(NULL, ?, ?, ?, ?, ?)", batch)
+            batch = []
+    db.executemany("INSERT INTO events VALUES(NULL, ?, ?, ?, ?, ?)", batch)
+    db.commit()
+    db.close()
+
+
+def generate_folder(folder: pathlib.Path, spec: ExtractionSpec) -> pathlib.Path:
+    """Creates the files of an extraction in a folder
+
+    Args:
+        folder: folder to create the files in
+        spec: size and shape of the extraction
+
+    Returns:
+        Path: the folder
+    """
+    rng = random.Random(spec.seed)
+    folder = pathlib.Path(folder)
+
+    for num in range(spec.files):
+        file_path = folder / _random_folder(rng, spec.depth) / f"file{num}.dat"
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_bytes(rng.randbytes(rng.randint(64, 4096)))
+
+    for num in range(spec.databases):
+        db_file = folder / _random_folder(rng, spec.depth) / f"Bench{num}.sqlite"
+        db_file.parent.mkdir(parents=True, exist_ok=True)
+        _create_database(db_file, spec.rows, rng)
+
+    return folder
+
+
+def _sorted_files(folder: pathlib.Path) -> list[pathlib.Path]:
+    files = []
+    for root, folders, names in os.walk(folder):
+        folders.sort()
+        files.extend(pathlib.Path(root) / name for name in sorted(names))
+    return files
+
+
+def generate(
+    folder: pathlib.Path, spec: ExtractionSpec, kind: str = "dir"
+) -> pathlib.Path:
+    """Creates a synthetic extraction unless it already exists
+
+    Args:
+        folder: folder to save the extraction in
+        spec: size and shape of the extraction
+        kind: "dir", "zip" or "tar"
+
+    Raises:
+        ValueError: if the kind is unknown
+
+    Returns:
+        Path: folder or archive of the extraction
+    """
+    if kind not in EXTRACTION_KINDS:
+        raise ValueError(f"Extraction kind must be one of {EXTRACTION_KINDS}!")
+
+    folder = pathlib.Path(folder)
+    source = folder / spec.slug
+    if not source.exists():
+        partial = folder / f"{spec.slug}.partial"
+        shutil.rmtree(partial, ignore_errors=True)
+        generate_folder(partial, spec)
+        partial.rename(source)
+
+    if kind == "dir":
+        return source
+
+    archive = folder / f"{spec.slug}.{kind}"
+    if archive.exists():
+        return archive
+
+    partial_archive = archive.with_name(f"{archive.name}.partial")
+    if kind == "zip":
+        with zipfile.ZipFile(partial_archive, "w", zipfile.ZIP_DEFLATED) as output:
+            for file_path in _sorted_files(source):
+                output.write(file_path, file_path.relative_to(source).as_posix())
+    else:
+        with tarfile.open(partial_archive, "w") as output:
+            for file_path in _sorted_files(source):
+                output.add(
+                    file_path,
+                    file_path.relative_to(source).as_posix(),
+                    recursive=False,
+                )
+    partial_archive.rename(archive)
+    return archive
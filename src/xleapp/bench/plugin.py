@@ -0,0 +1,48 @@
+"""Artifact used by the benchmarks.
+
+Importing this module registers the artifact for the "bench" device type. It reads
+every `Bench<N>.sqlite` database created by :mod:`xleapp.bench.generator`.
+"""
+from __future__ import annotations
+
+import pathlib
+import sqlite3
+
+from xleapp import Artifact, Search, WebIcon
+
+
+class BenchEvents(Artifact, category="Benchmark", label="Benchmark Events"):
+    def __post_init__(self) -> None:
+        self.name = "Benchmark Events"
+        self.category = "Benchmark"
+        self.web_icon = WebIcon.ACTIVITY
+        self.report_headers = (
+            "Timestamp",
+            "Bundle ID",
+            "Latitude",
+            "Longitude",
+            "Value",
+        )
+        self.timeline = True
+
+    @Search("**/Bench*.sqlite", return_on_first_hit=False)
+    def process(self) -> None:
+        for fp in self.found:
+            db = fp()
+            if isinstance(db, pathlib.Path):
+                db = sqlite3.connect(f"file:{db}?mode=ro", uri=True)
+            cursor = db.cursor()
+            cursor.execute(
+                """
+                SELECT
+                datetime(timestamp + 978307200, 'unixepoch'),
+                bundle_id,
+                latitude,
+                longitude,
+                value
+                FROM events
+                ORDER BY id
+                """
+            )
+            for row in cursor:
+                self.data.append(tuple(row))
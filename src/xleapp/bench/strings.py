@@ -0,0 +1,218 @@
+"""Microbenchmarks of :mod:`xleapp.helpers.strings`.
+
+Compares the helpers with the character by character implementations they replaced,
+which are kept here as references. Both produce the same output, so the references
+are also used by the tests.
+
+Run it with ``python -m xleapp.bench.strings --size 256``.
+"""
+from __future__ import annotations
+
+import argparse
+import pathlib
+import random
+import string
+import tempfile
+import time
+import typing as t
+
+from xleapp.helpers import strings
+
+
+WRAP_REFERENCE_SIZE = 256 * 1024
+
+
+def reference_raw(data: t.ByteString) -> str:
+    return "".join(
+        [
+            chr(byte) if strings.BYTE_SPACE <= byte < strings.BYTE_DEL else "."
+            for byte in data
+        ],
+    )
+
+
+def reference_wrap_text(
+    source_text: str,
+    separator_chars: str,
+    width: int = 70,
+    keep_separators: bool = True,
+) -> str:
+    current_length = 0
+    latest_separator = -1
+    current_chunk_start = 0
+    output = ""
+    char_index = 0
+    while char_index < len(source_text):
+        if source_text[char_index] in separator_chars:
+            latest_separator = char_index
+        output += source_text[char_index]
+        current_length += 1
+        if current_length == width:
+            if latest_separator >= current_chunk_start:
+                cutting_length = char_index - latest_separator
+                if not keep_separators:
+                    cutting_length += 1
+                if cutting_length:
+                    output = output[:-cutting_length]
+                output += "\n"
+                current_chunk_start = latest_separator + 1
+                char_index = current_chunk_start
+            else:
+                output += "\n"
+                current_chunk_start = char_index + 1
+                latest_separator = current_chunk_start - 1
+                char_index += 1
+            current_length = 0
+        else:
+            char_index += 1
+    return output
+
+
+def reference_filter_strings_in_file(
+    filename: pathlib.Path, min_chars: int = 4
+) -> t.Iterator[str]:
+    with open(filename, errors="ignore") as file:
+        result = ""
+        printable = set(string.printable)
+        for char in file.read():
+            if char in printable:
+                result += char
+                continue
+            if len(result) >= min_chars:
+                yield result
+            result = ""
+        if len(result) >= min_chars:
+            yield result
+
+
+def generate_data(size: int, seed: int = 0) -> bytes:
+    """Creates binary data with embedded ASCII and UTF-16LE strings
+
+    Args:
+        size: number of bytes
+        seed: seed of the random generator. Defaults to 0.
+
+    Returns:
+        bytes: the data
+    """
+    rng = random.Random(seed)
+    words = [
+        "".join(rng.choices(string.ascii_letters + string.digits, k=rng.randint(2, 24)))
+        for _ in range(256)
+    ]
+    block = bytearray()
+    while len(block) < min(size, 1 << 20):
+        block += rng.randbytes(rng.randint(1, 64))
+        word = rng.choice(words)
+        block += word.encode("utf-16le") if rng.random() < 0.3 else word.encode()
+    block = bytes(block)
+    return (block * (size // len(block) + 1))[:size]
+
+
+def _timed(func: t.Callable[[], t.Any]) -> tuple[float, t.Any]:
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def run(size: int = 256 * 1024 * 1024, reference_size: int | None = None) -> list:
+    """Times the helpers and the reference implementations
+
+    The references are much slower, so they run on a smaller sample and their time
+    is scaled linearly to `size`. The reference `wrap_text` is quadratic and runs on
+    at most :data:`WRAP_REFERENCE_SIZE` characters, so its scaled time is a lower
+    bound.
+
+    Args:
+        size: number of bytes processed by the helpers. Defaults to 256 MB.
+        reference_size: number of bytes processed by the references. Defaults to
+            a 32nd of `size`.
+
+    Returns:
+        list: name, seconds, scaled reference seconds and speedup of each helper
+    """
+    reference_size = reference_size or max(size // 32, 1)
+    data = generate_data(size)
+    sample = data[:reference_size]
+    text = strings.raw(data)
+    text_sample = text[:WRAP_REFERENCE_SIZE]
+
+    results = []
+    with tempfile.TemporaryDirectory() as temp_folder:
+        data_file = pathlib.Path(temp_folder) / "data.bin"
+        data_file.write_bytes(data)
+        sample_file = pathlib.Path(temp_folder) / "sample.bin"
+        sample_file.write_bytes(sample)
+
+        cases = [
+            (
+                "raw",
+                lambda: strings.raw(data),
+                lambda: reference_raw(sample),
+                len(sample),
+            ),
+            (
+                "wrap_text",
+                lambda: strings.wrap_text(text, " ./"),
+                lambda: reference_wrap_text(text_sample, " ./"),
+                len(text_sample),
+            ),
+            (
+                "filter_strings_in_file",
+                lambda: sum(1 for _ in strings.filter_strings_in_file(data_file)),
+                lambda: sum(1 for _ in reference_filter_strings_in_file(sample_file)),
+                len(sample),
+            ),
+            (
+                "strings_in_file",
+                lambda: sum(1 for _ in strings.strings_in_file(data_file)),
+                lambda: sum(1 for _ in reference_filter_strings_in_file(sample_file)),
+                len(sample),
+            ),
+            (
+                "strings_in_file (utf-16le)",
+                lambda: sum(
+                    1 for _ in strings.strings_in_file(data_file, encoding="utf-16le")
+                ),
+                None,
+                0,
+            ),
+        ]
+        for name, func, reference, reference_bytes in cases:
+            seconds, _ = _timed(func)
+            reference_seconds = None
+            if reference:
+                reference_seconds = _timed(reference)[0] * size / reference_bytes
+            results.append(
+                [
+                    name,
+                    seconds,
+                    reference_seconds,
+                    reference_seconds / seconds if reference_seconds else None,
+                ]
+            )
+    return results
+
+
+def main(argv: t.Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=256, help="size of the input in MB")
+    parser.add_argument(
+        "--reference-size",
+        type=int,
+        help="size of the reference input in MB. Defaults to a 32nd of --size.",
+    )
+    args = parser.parse_args(argv)
+
+    reference_size = args.reference_size * 1024 * 1024 if args.reference_size else None
+    print(f"{'helper':<28}{'seconds':>10}{'reference':>12}{'speedup':>10}")
+    for name, seconds, reference_seconds, speedup in run(
+        args.size * 1024 * 1024, reference_size
+    ):
+        reference = f"{reference_seconds:.3f}" if reference_seconds else "-"
+        ratio = f"{speedup:.1f}x" if speedup else "-"
+        print(f"{name:<28}{seconds:>10.3f}{reference:>12}{ratio:>10}")
+
+
+if __name__ == "__main__":
+    main()
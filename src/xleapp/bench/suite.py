@@ -0,0 +1,195 @@
+"""End-to-end benchmarks on synthetic extractions.
+
+Every case (scale and extraction kind) runs in a new Python process so cached seekers,
+registered artifacts and open file handles never leak between cases. The time spent
+in each phase is taken from the spans recorded by :mod:`xleapp.helpers.tracing`:
+
+* listing: building the list of files of the extraction
+* search: matching the artifact's search patterns (and extracting from archives)
+* open: opening the found files
+* process: running the artifact
+* render: writing the HTML report
+* export: saving the TSV, KML and timeline exports
+
+Run it with ``xleapp bench``.
+"""
+from __future__ import annotations
+
+import collections
+import datetime
+import json
+import pathlib
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import typing as t
+
+from .generator import EXTRACTION_KINDS, SCALES, generate
+
+
+PHASES = ("listing", "search", "open", "process", "render", "export")
+
+
+def run_case(input_path: pathlib.Path, output_folder: pathlib.Path) -> dict[str, t.Any]:
+    """Processes one extraction with the benchmark artifact
+
+    Must run in its own process. See :func:`run`.
+
+    Args:
+        input_path: folder or archive of the extraction
+        output_folder: folder to create the report in
+
+    Returns:
+        dict: seconds spent in each phase, rows processed and peak memory
+    """
+    import importlib
+
+    import xleapp.globals as g
+
+    from xleapp.app import Application
+    from xleapp.helpers import memory, tracing
+
+    application = Application()
+    g.app = application
+    importlib.import_module("xleapp.bench.plugin")
+    application.set_device_type("bench")
+    application.artifacts.toggle_artifact("BenchEvents")
+    application.create_output_folder(output_folder)
+
+    trace_file = tracing.enable(application.log_folder / tracing.TRACE_FILE).trace_file
+    phases: dict[str, float] = collections.defaultdict(float)
+
+    start = time.perf_counter()
+    application(output_folder, input_path)
+    if application.extraction_type != "FS":
+        application.seeker.build_files_list()
+    phases["listing"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    application.run()
+    application.processing_time = time.perf_counter() - start
+    application.generate_reports()
+    phases["total"] = time.perf_counter() - start
+    tracing.disable()
+
+    with open(trace_file, encoding="utf-8") as trace:
+        for line in trace:
+            record = json.loads(line)
+            if record["name"] in PHASES:
+                phases[record["name"]] += record["dur"] / 1_000_000
+    # Searching and opening files happens while the artifact is processed
+    phases["process"] -= phases["search"] + phases["open"]
+
+    selected = application.artifacts.selected()
+    return {
+        "phases": {phase: round(phases[phase], 6) for phase in (*PHASES, "total")},
+        "rows": sum(artifact.row_count for artifact in selected),
+        "peak_rss": memory.peak_rss(),
+    }
+
+
+def _run_in_process(
+    input_path: pathlib.Path, output_folder: pathlib.Path
+) -> dict[str, t.Any]:
+    with tempfile.TemporaryDirectory() as temp_folder:
+        result_file = pathlib.Path(temp_folder) / "result.json"
+        subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "xleapp.bench.suite",
+                str(input_path),
+                str(output_folder),
+                str(result_file),
+            ],
+            check=True,
+        )
+        return json.loads(result_file.read_text(encoding="utf-8"))
+
+
+def run(
+    scales: t.Sequence[str] = ("small",),
+    kinds: t.Sequence[str] = EXTRACTION_KINDS,
+    data_folder: pathlib.Path | None = None,
+    repeat: int = 1,
+) -> dict[str, t.Any]:
+    """Runs the benchmark cases
+
+    Args:
+        scales: names of the scales to run. See :data:`SCALES`.
+        kinds: extraction kinds to run
+        data_folder: folder keeping the generated extractions between runs.
+            Defaults to a temporary folder.
+        repeat: number of times each case runs
+
+    Returns:
+        dict: results of every case with information about the machine
+    """
+    from xleapp._version import __version__
+
+    results = []
+    with tempfile.TemporaryDirectory() as temp_folder:
+        data_folder = pathlib.Path(data_folder or temp_folder)
+        data_folder.mkdir(parents=True, exist_ok=True)
+
+        for scale in scales:
+            spec = SCALES[scale]
+            for kind in kinds:
+                input_path = generate(data_folder, spec, kind)
+                for num in range(repeat):
+                    output_folder = pathlib.Path(temp_folder) / f"{scale}-{kind}-{num}"
+                    output_folder.mkdir()
+                    result = _run_in_process(input_path, output_folder)
+                    results.append(
+                        {"scale": scale, "kind": kind, "run": num, **result}
+                    )
+
+    return {
+        "version": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "specs": {scale: SCALES[scale].asdict() for scale in scales},
+        "results": results,
+    }
+
+
+def compare(
+    current: dict[str, t.Any], previous: dict[str, t.Any] | None = None
+) -> list[list[t.Any]]:
+    """Creates a table of the phase times of each case
+
+    Args:
+        current: results returned by :func:`run`
+        previous: earlier results to compare against. Defaults to None.
+
+    Returns:
+        list: a row for each case and phase with the change from `previous`
+    """
+
+    def best(results: dict[str, t.Any]) -> dict[tuple[str, str, str], float]:
+        times: dict[tuple[str, str, str], float] = {}
+        for result in results["results"]:
+            for phase, seconds in result["phases"].items():
+                key = (result["scale"], result["kind"], phase)
+                times[key] = min(seconds, times.get(key, seconds))
+        return times
+
+    current_times = best(current)
+    previous_times = best(previous) if previous else {}
+
+    rows = []
+    for key, seconds in current_times.items():
+        before = previous_times.get(key)
+        change = ""
+        if before:
+            change = f"{(seconds - before) / before:+.1%}"
+        rows.append([*key, f"{seconds:.3f}", change])
+    return rows
+
+
+if __name__ == "__main__":
+    case_input, case_output, case_result = map(pathlib.Path, sys.argv[1:4])
+    case_result.write_text(json.dumps(run_case(case_input, case_output)))
@@ -1,12 +1,15 @@
+import json
 import logging
+import pathlib
 import time
 
 import click
+import prettytable
 import xleapp._version as version
 import xleapp.globals as g
 
-from xleapp import app, log, templating
-from xleapp.helpers import decorators, utils
+from xleapp import app, bench, log, templating
+from xleapp.helpers import decorators, tracing, utils
 
 
 logger_log = logging.getLogger("xleapp.logfile")
@@ -33,6 +36,121 @@
     type=click.Path(exists=True, dir_okay=True, resolve_path=True, writable=True),
     help="input file/folder path",
 )
+@click.option(
+    "--cache/--no-cache",
+    default=False,
+    help="reuse artifact results cached from earlier runs",
+)
+@click.option(
+    "--cache-folder",
+    type=click.Path(file_okay=False, resolve_path=True, writable=True),
+    help="folder for the result cache. Default: user cache folder",
+)
+@click.option(
+    "--cache-hash/--no-cache-hash",
+    default=False,
+    help="hash file contents for the result cache instead of size and modified time",
+)
+@click.option(
+    "--checkpoint/--no-checkpoint",
+    default=False,
+    help="save each artifact to the report folder as it finishes, for --resume",
+)
+@click.option(
+    "--resume",
+    type=click.Path(exists=True, file_okay=False, resolve_path=True, writable=True),
+    help="report folder of an earlier run to resume into",
+)
+@click.option(
+    "--compact-data/--no-compact-data",
+    default=False,
+    help="store artifact results in compact columns to lower memory use",
+)
+@click.option(
+    "--spill/--no-spill",
+    default=False,
+    help="move artifact results to a database in the report folder as they finish",
+)
+@click.option(
+    "--track-memory/--no-track-memory",
+    default=False,
+    help="measure the memory used by each artifact",
+)
+@click.option(
+    "--memory-mode",
+    type=click.Choice(["rss", "tracemalloc"], case_sensitive=False),
+    default="rss",
+    show_default=True,
+    help="how --track-memory measures memory. 'tracemalloc' is exact but slow",
+)
+@click.option(
+    "--profile",
+    type=click.Choice(["cprofile", "sample"], case_sensitive=False),
+    default=None,
+    help="profile each artifact. Profiles are saved in 'Script Logs/profiles'",
+)
+@click.option(
+    "--kmz/--no-kmz",
+    default=False,
+    help="compress the KML exports to KMZ files",
+)
+@click.option(
+    "--tsv-compression",
+    type=click.Choice(["gzip", "bz2", "xz"], case_sensitive=False),
+    default=None,
+    help="compress the TSV exports",
+)
+@click.option(
+    "--tsv-versioned/--no-tsv-versioned",
+    default=False,
+    help="keep TSV exports of earlier runs instead of overwriting them",
+)
+@click.option(
+    "--case-db/--no-case-db",
+    default=False,
+    help="save the tables of every artifact to '_Case/case.db'",
+)
+@click.option(
+    "--sorted-timeline",
+    type=click.Choice(["jsonl", "tsv", "sqlite"], case_sensitive=False),
+    default=None,
+    help="write the events of every artifact in time order to one file in '_Timeline'",
+)
+@click.option(
+    "--render-workers",
+    type=click.IntRange(min=1),
+    default=templating.render.DEFAULT_RENDER_WORKERS,
+    show_default=True,
+    help="number of HTML pages rendered at the same time",
+)
+@click.option(
+    "--render-pool",
+    type=click.Choice(["process", "thread"], case_sensitive=False),
+    default=None,
+    help="render HTML pages in processes or threads. Default: threads with --spill",
+)
+@click.option(
+    "--lazy-tables/--no-lazy-tables",
+    default=False,
+    help="write the rows of HTML pages to data files in '_TableData' loaded by the page",
+)
+@click.option(
+    "--table-chunk-rows",
+    type=click.IntRange(min=1),
+    default=templating.tables.TABLE_CHUNK_ROWS,
+    show_default=True,
+    help="rows per data file with --lazy-tables",
+)
+@click.option(
+    "--template-cache/--no-template-cache",
+    default=True,
+    help="keep the compiled HTML templates in the user cache folder",
+)
+@click.option(
+    "--trace/--no-trace",
+    default=False,
+    help="save timed spans of each phase to 'Script Logs/trace.jsonl'",
+)
 @click.argument("artifacts", required=False, nargs=-1)
 @pass_application
 def device(
@@ -40,6 +158,27 @@ def device(
     device_type: str,
     input_path: click.Path,
     output_folder: click.Path,
+    cache: bool,
+    cache_folder: click.Path,
+    cache_hash: bool,
+    checkpoint: bool,
+    resume: click.Path,
+    compact_data: bool,
+    spill: bool,
+    track_memory: bool,
+    memory_mode: str,
+    profile: str,
+    kmz: bool,
+    tsv_compression: str,
+    tsv_versioned: bool,
+    case_db: bool,
+    sorted_timeline: str,
+    render_workers: int,
+    render_pool: str,
+    lazy_tables: bool,
+    table_chunk_rows: int,
+    template_cache: bool,
+    trace: bool,
     artifacts: list,
 ):
     """Parses the selected device
@@ -49,15 +188,62 @@ def device(
         device_type (str): device to parse
         input_path (click.Path): path to the input folder/file
         output_folder (click.Path): path to the output folder to create the report
+        cache (bool): reuse cached artifact results
+        cache_folder (click.Path): folder for the result cache
+        cache_hash (bool): hash file contents for the result cache
+        checkpoint (bool): save each artifact to the report folder as it finishes
+        resume (click.Path): report folder of an earlier run to resume into
+        compact_data (bool): store artifact results in compact columns
+        spill (bool): move artifact results to the case store as they finish
+        track_memory (bool): measure the memory used by each artifact
+        memory_mode (str): "rss" or "tracemalloc"
+        profile (str): profile each artifact with cProfile or by sampling
+        kmz (bool): compress the KML exports to KMZ files
+        tsv_compression (str): compress the TSV exports with gzip, bz2 or xz
+        tsv_versioned (bool): keep TSV exports of earlier runs
+        case_db (bool): save the tables of every artifact to one SQLite database
+        sorted_timeline (str): format of the combined timeline in time order
+        render_workers (int): number of HTML pages rendered at the same time
+        render_pool (str): render HTML pages in processes or threads
+        lazy_tables (bool): write the rows of HTML pages to data files
+        table_chunk_rows (int): rows per data file of lazily loaded tables
+        template_cache (bool): keep the compiled HTML templates in the user cache
+        trace (bool): save timed spans of each phase to a trace file
         artifacts (list): list of artifacts to parse. Default: All
     """
 
     start_time = time.perf_counter()
 
     application.set_device_type(device_type)
-    application.create_output_folder(output_folder)
+    if resume:
+        application.resume_output_folder(resume)
+        output_folder = application.output_path
+    else:
+        application.create_output_folder(output_folder)
+        if checkpoint:
+            application.enable_checkpoint()
     log.init()
 
+    application.default_configs["compact_data"] = compact_data
+    application.default_configs["track_memory"] = memory_mode if track_memory else None
+    application.default_configs["profile"] = profile
+    application.default_configs["kmz"] = kmz
+    application.default_configs["tsv_compression"] = tsv_compression
+    application.default_configs["tsv_versioned"] = tsv_versioned
+    application.default_configs["case_db"] = case_db
+    application.default_configs["sorted_timeline"] = sorted_timeline
+    application.default_configs["render_workers"] = render_workers
+    application.default_configs["render_pool"] = render_pool
+    application.default_configs["lazy_tables"] = lazy_tables
+    application.default_configs["table_chunk_rows"] = table_chunk_rows
+    application.default_configs["template_cache"] = template_cache
+    if trace:
+        tracing.enable(application.log_folder / tracing.TRACE_FILE)
+    if spill:
+        application.enable_case_store()
+    if cache:
+        application.enable_result_cache(folder=cache_folder, hash_files=cache_hash)
+
     if len(artifacts) == 0:
         for artifact in application.artifacts:
             if artifact.device_type == device_type:
@@ -85,15 +271,24 @@ def process():
 
     run_time, _ = process()
     logger_log.info(f"\nCompleted processing artifacts in {run_time:.2f}s")
+    if application.result_cache:
+        logger_log.info(f"-> {application.result_cache}")
     end_time = time.perf_counter()
 
     application.processing_time = end_time - start_time
+    summary_file = application.write_run_summary()
+    logger_log.info(f"-> Run summary saved to {summary_file}")
+
+    application.generate_reports()
 
+    # After generate_reports(), which finishes the exports
     logger_log.info("\nGenerating index file...")
     templating.generate_index(application)
     logger_log.info("-> Index file generated!")
 
-    application.generate_reports()
+    trace_file = tracing.disable()
+    if trace_file:
+        logger_log.info(f"Trace saved to {trace_file}")
 
 
 @click.command
@@ -133,6 +328,111 @@ def artifact_path_lists(application: app.Application):
     click.echo("Saved artifact path list for Autopsy!")
 
 
+@click.command
+@pass_application
+def artifact_manifest(application: app.Application):
+    """Regenerates the manifest of each installed plugin
+
+    Args:
+        application (app.Application): Application object
+    """
+    for manifest in application.generate_plugin_manifests():
+        click.echo(f"Saved plugin manifest to {manifest}")
+
+
+@click.command
+@click.argument(
+    "trace_file",
+    type=click.Path(exists=True, dir_okay=False, resolve_path=True),
+)
+@click.argument(
+    "output_file",
+    required=False,
+    type=click.Path(dir_okay=False, resolve_path=True, writable=True),
+)
+def chrome_trace(trace_file: click.Path, output_file: click.Path):
+    """Converts a trace file to the Chrome trace format
+
+    Args:
+        trace_file (click.Path): trace file saved with `--trace`
+        output_file (click.Path): converted file. Default: trace file with `.json`
+    """
+    converted = tracing.to_chrome_trace(trace_file, output_file)
+    click.echo(f"Saved Chrome trace to {converted}")
+
+
+@click.command
+@click.option(
+    "--scale",
+    "scales",
+    multiple=True,
+    default=["small"],
+    show_default=True,
+    type=click.Choice(list(bench.SCALES), case_sensitive=False),
+    help="size of the synthetic extractions. Can be repeated",
+)
+@click.option(
+    "--kind",
+    "kinds",
+    multiple=True,
+    default=["dir", "zip", "tar"],
+    show_default=True,
+    type=click.Choice(["dir", "zip", "tar"], case_sensitive=False),
+    help="kind of the synthetic extractions. Can be repeated",
+)
+@click.option(
+    "--data-folder",
+    type=click.Path(file_okay=False, resolve_path=True, writable=True),
+    help="folder keeping the generated extractions between runs",
+)
+@click.option("--repeat", default=1, show_default=True, help="runs of each case")
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(dir_okay=False, resolve_path=True, writable=True),
+    help="JSON file for the results. Default: bench-<version>.json",
+)
+@click.option(
+    "--compare",
+    "previous_file",
+    type=click.Path(exists=True, dir_okay=False, resolve_path=True),
+    help="results of an earlier run to compare against",
+)
+def bench_command(
+    scales: list[str],
+    kinds: list[str],
+    data_folder: click.Path,
+    repeat: int,
+    output: click.Path,
+    previous_file: click.Path,
+):
+    """Benchmarks xLEAPP on synthetic extractions
+
+    Args:
+        scales (list): size of the synthetic extractions
+        kinds (list): kind of the synthetic extractions
+        data_folder (click.Path): folder keeping the generated extractions
+        repeat (int): runs of each case
+        output (click.Path): JSON file for the results
+        previous_file (click.Path): results of an earlier run to compare against
+    """
+    results = bench.run(scales, kinds, data_folder=data_folder, repeat=repeat)
+
+    output_file = pathlib.Path(output or f"bench-{version.__version__}.json")
+    output_file.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    previous = None
+    if previous_file:
+        previous = json.loads(pathlib.Path(previous_file).read_text(encoding="utf-8"))
+
+    output_table = prettytable.PrettyTable(
+        ["Scale", "Kind", "Phase", "Seconds", "Change"], align="l"
+    )
+    output_table.add_rows(bench.compare(results, previous))
+    click.echo(output_table)
+    click.echo(f"Saved benchmark results to {output_file}")
+
+
 @click.group
 @click.version_option(
     package_name=version.__project__.lower(),
@@ -142,17 +442,21 @@ def artifact_path_lists(application: app.Application):
 @pass_application
 def cli(application: app.Application):
     g.app = application
-    g.app.discover_plugins()
-
     current_ctx = click.get_current_context()
 
+    # These commands do not use the installed plugins
+    if current_ctx.invoked_subcommand in ["chrome-trace", "bench"]:
+        return
+
+    g.app.installed_plugins = g.app.discover_plugins() or set()
+
     if current_ctx.invoked_subcommand in ["artifact-table", "artifact-path-lists"]:
         num_of_installed_or_process = len(application.artifacts.installed())
         num_of_installed_or_process_categories = len(
             application.artifacts.installed_categories()
         )
 
-    if current_ctx.invoked_subcommand not in ["device"]:
+    if current_ctx.invoked_subcommand not in ["device", "artifact-manifest"]:
         num_of_installed_or_process = application.num_to_process
         num_of_installed_or_process_categories = application.num_of_categories
 
@@ -167,8 +471,11 @@ def cli(application: app.Application):
         )
 
 
+cli.add_command(artifact_manifest)
 cli.add_command(artifact_table)
 cli.add_command(artifact_path_lists)
+cli.add_command(bench_command, name="bench")
+cli.add_command(chrome_trace)
 cli.add_command(device)
 cli.add_command(gui)
 
@@ -120,13 +120,15 @@ def main(app: Application) -> None:
 
             end_time = time.perf_counter()
             app.processing_time = end_time - start_time
+            app.write_run_summary()
 
+            app.generate_reports()
+
+            # After generate_reports(), which finishes the exports
             logger.info("\nGenerating index file...")
             templating.generate_index(app)
             logger.info("-> Index file generated!")
 
-            app.generate_reports()
-
             report_path = Path(app.report_folder / "index.html").resolve()
             str_report_path = str(report_path).replace("\\\\", "\\")
             str_report_path = wrap_text(str_report_path, "\\")
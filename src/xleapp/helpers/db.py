@@ -1,13 +1,24 @@
+from __future__ import annotations
+
+import collections.abc
 import logging
 import pathlib
 import sqlite3
+import threading
 import typing as t
 
+from dataclasses import dataclass, field
+
 from .utils import is_platform_windows
 
 
 logger_log = logging.getLogger("xleapp.logfile")
 
+DEFAULT_BATCH_SIZE = 5000
+
+# Converts the values of one column in a batch and returns the converted values
+Converter = t.Callable[[t.Sequence[t.Any]], t.Sequence[t.Any]]
+
 
 def open_sqlite_db_readonly(path: t.Union[pathlib.Path, str]) -> sqlite3.Connection:
     """Opens an sqlite db in read-only mode, so original db (and -wal/journal are intact)
@@ -44,6 +55,259 @@ def open_sqlite_db_readonly(path: t.Union[pathlib.Path, str]) -> sqlite3.Connect
     return db
 
 
+def quote_identifier(name: str) -> str:
+    """Quotes a table or column name for SQLite
+
+    Args:
+        name: name to quote
+
+    Returns:
+        str: the quoted name
+    """
+    return '"{}"'.format(str(name).replace('"', '""'))
+
+
+@dataclass(frozen=True)
+class TableSchema:
+    """Columns and indexes of a table or view
+
+    Attributes:
+        name: name of the table
+        type: "table" or "view"
+        columns: names of the columns in order
+        indexes: names of the indexes on the table
+    """
+
+    name: str
+    type: str = "table"
+    columns: tuple[str, ...] = ()
+    indexes: tuple[str, ...] = ()
+    _lookup: dict[str, str] = field(
+        init=False, repr=False, compare=False, default_factory=dict
+    )
+
+    def __post_init__(self) -> None:
+        self._lookup.update((column.lower(), column) for column in self.columns)
+
+    def column(self, name: str) -> str | None:
+        """Returns the name of a column as declared in the database
+
+        Args:
+            name: name of the column in any case
+
+        Returns:
+            str: the declared name or `None` if the column does not exist
+        """
+        return self._lookup.get(name.lower())
+
+    def has_column(self, name: str) -> bool:
+        return name.lower() in self._lookup
+
+
+@dataclass
+class Schema:
+    """Tables, views, columns and indexes of a database
+
+    Names are matched case insensitive like SQLite does. Create it with
+    :func:`schema` so it is loaded once per connection.
+
+    Attributes:
+        tables: :obj:`TableSchema` of each table and view by lower case name
+    """
+
+    tables: dict[str, TableSchema] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, db: sqlite3.Connection) -> Schema:
+        """Reads the schema of a database
+
+        The columns are read table by table, so a view or virtual table which can
+        not be read only loses its own columns.
+
+        Args:
+            db: :obj:`sqlite3.Connection` object of the database
+
+        Returns:
+            Schema: the schema of the database
+        """
+        # Set on the cursor so the row factory of the connection is left alone
+        cursor = db.cursor()
+        cursor.row_factory = None
+        cursor.execute(
+            """
+            SELECT type, name, tbl_name
+            FROM sqlite_master
+            WHERE type IN ('table', 'view', 'index')
+            """
+        )
+        types: dict[str, str] = {}
+        indexes: dict[str, list[str]] = {}
+        for kind, name, table_name in cursor.fetchall():
+            if kind == "index":
+                indexes.setdefault(table_name.lower(), []).append(name)
+            else:
+                types[name] = kind
+
+        columns: dict[str, tuple[str, ...]] = {}
+        for table_name in types:
+            try:
+                cursor.execute(
+                    "SELECT name FROM pragma_table_info(?) ORDER BY cid", (table_name,)
+                )
+                columns[table_name] = tuple(column for (column,) in cursor.fetchall())
+            except sqlite3.Error as ex:
+                logger_log.debug(f"Schema error, table={table_name} Error={str(ex)}")
+                columns[table_name] = ()
+        cursor.close()
+
+        return cls(
+            {
+                name.lower(): TableSchema(
+                    name,
+                    kind,
+                    columns[name],
+                    tuple(indexes.get(name.lower(), ())),
+                )
+                for name, kind in types.items()
+            }
+        )
+
+    def table(self, name: str) -> TableSchema | None:
+        """Returns the schema of a table or view
+
+        Args:
+            name: name of the table in any case
+
+        Returns:
+            TableSchema: the table or `None` if it does not exist
+        """
+        return self.tables.get(name.lower())
+
+    def has_table(self, name: str) -> bool:
+        return name.lower() in self.tables
+
+    def has_column(self, table_name: str, column: str) -> bool:
+        table = self.table(table_name)
+        return table is not None and table.has_column(column)
+
+    def existing_columns(
+        self, table_name: str, columns: t.Iterable[str]
+    ) -> list[str]:
+        """Returns which of the columns exist in a table
+
+        Args:
+            table_name: name of the table
+            columns: names of the columns to check
+
+        Returns:
+            list[str]: the existing columns in the order given
+        """
+        table = self.table(table_name)
+        if table is None:
+            return []
+        return [column for column in columns if table.has_column(column)]
+
+    def missing_columns(self, table_name: str, columns: t.Iterable[str]) -> list[str]:
+        """Returns which of the columns do not exist in a table
+
+        Args:
+            table_name: name of the table
+            columns: names of the columns to check
+
+        Returns:
+            list[str]: the missing columns in the order given
+        """
+        table = self.table(table_name)
+        if table is None:
+            return list(columns)
+        return [column for column in columns if not table.has_column(column)]
+
+    def select_list(
+        self,
+        table_name: str,
+        columns: t.Iterable[str] | t.Mapping[str, str],
+        default: str = "NULL",
+        prefix: str = "",
+    ) -> str:
+        """Builds the column list of a SELECT that works with every schema version
+
+        Columns missing from the table are replaced with a default value so the
+        query returns the same columns on every version of the database::
+
+            columns = db.schema(conn).select_list(
+                "ZSFAVORITE", {"ZTITLE": "''", "ZURL": "NULL", "ZDATE": "0"}
+            )
+            cursor.execute(f"SELECT {columns} FROM ZSFAVORITE")
+
+        Args:
+            table_name: name of the table
+            columns: names of the columns or a mapping of column names to the SQL
+                expression used if the column is missing
+            default: SQL expression used for missing columns. Defaults to "NULL".
+            prefix: table name or alias added in front of existing columns.
+                Defaults to "".
+
+        Returns:
+            str: comma separated list of columns
+        """
+        if not isinstance(columns, collections.abc.Mapping):
+            columns = dict.fromkeys(columns, default)
+
+        table = self.table(table_name)
+        expressions = []
+        for column, fallback in columns.items():
+            declared = table.column(column) if table else None
+            if declared is None:
+                expressions.append(f"{fallback} AS {quote_identifier(column)}")
+            elif prefix:
+                expressions.append(f"{prefix}.{quote_identifier(declared)}")
+            else:
+                expressions.append(quote_identifier(declared))
+        return ", ".join(expressions)
+
+
+# Connections do not support weak references. The cache keeps a reference to each
+# connection so its id is not reused while the entry exists.
+_schemas: dict[int, tuple[sqlite3.Connection, Schema]] = {}
+_schemas_lock = threading.Lock()
+
+
+def schema(db: sqlite3.Connection, refresh: bool = False) -> Schema:
+    """Returns the cached schema of a database
+
+    The schema is loaded on the first call for a connection. Evidence databases are
+    opened read-only, so the schema does not change afterwards.
+
+    Args:
+        db: :obj:`sqlite3.Connection` object of the database
+        refresh: load the schema again. Defaults to False.
+
+    Returns:
+        Schema: the schema of the database
+
+    Raises:
+        sqlite3.Error: if the schema could not be read
+    """
+    with _schemas_lock:
+        cached = _schemas.get(id(db))
+        if cached is None or cached[0] is not db or refresh:
+            cached = _schemas[id(db)] = (db, Schema.load(db))
+        return cached[1]
+
+
+def clear_schema_cache(db: sqlite3.Connection | None = None) -> None:
+    """Forgets the cached schema of a connection or of all connections
+
+    Args:
+        db: connection to forget. Defaults to all connections.
+    """
+    with _schemas_lock:
+        if db is None:
+            _schemas.clear()
+        else:
+            _schemas.pop(id(db), None)
+
+
 def does_column_exist_in_db(
     db: sqlite3.Connection,
     table_name: str,
@@ -59,18 +323,10 @@ def does_column_exist_in_db(
     Returns:
         True if exists. False otherwise.
     """
-    col_name = col_name.lower()
     try:
-        db.row_factory = sqlite3.Row  # For fetching columns by name
-        query = f"pragma table_info('{table_name}');"
-        cursor = db.cursor()
-        cursor.execute(query)
-        all_rows = cursor.fetchall()
-        for row in all_rows:
-            if row["name"].lower() == col_name:
-                return True
+        return schema(db).has_column(table_name, col_name)
     except sqlite3.Error as ex:
-        logger_log.error(f"Query error, query={query} Error={str(ex)}")
+        logger_log.error(f"Schema error, table={table_name} Error={str(ex)}")
     return False
 
 
@@ -85,18 +341,88 @@ def does_table_exist(db: sqlite3.Connection, table_name: str) -> bool:
         True if exists. False otherwise.
     """
     try:
-        query = (
-            "SELECT name FROM sqlite_master WHERE type='table' AND name= %(table_name)s"
+        table = schema(db).table(table_name)
+        return table is not None and table.type == "table"
+    except sqlite3.Error as ex:
+        logger_log.error(f"Schema error, table={table_name} Error={str(ex)}")
+    return False
+
+
+def map_values(func: t.Callable[[t.Any], t.Any]) -> Converter:
+    """Turns a function converting one value into a column converter
+
+    `None` values are passed through without calling `func`.
+
+    Args:
+        func: function converting a single value
+
+    Returns:
+        Converter: function converting the values of a column
+    """
+
+    def converter(values: t.Sequence[t.Any]) -> list[t.Any]:
+        return [None if value is None else func(value) for value in values]
+
+    return converter
+
+
+def iter_query(
+    db: sqlite3.Connection,
+    query: str,
+    params: t.Sequence[t.Any] | t.Mapping[str, t.Any] = (),
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    converters: t.Mapping[int | str, Converter] | None = None,
+) -> t.Iterator[list[tuple[t.Any, ...]]]:
+    """Runs a query and yields the results in batches of plain tuples
+
+    Rows are fetched `batch_size` at a time, so only one batch is held in memory.
+    The row factory of the connection is ignored, which avoids creating
+    :obj:`sqlite3.Row` objects. The batches can be yielded as they are from an
+    artifact's `process()`::
+
+        yield from db.iter_query(
+            fp(),
+            "SELECT ZDATE, ZBUNDLEID FROM ZOBJECT",
+            converters={"ZDATE": db.map_values(convert_ts)},
         )
 
-        params = {"table_name": table_name}
+    Args:
+        db: :obj:`sqlite3.Connection` object of the database
+        query: SQL query to run
+        params: parameters of the query. Defaults to ().
+        batch_size: number of rows in each batch. Defaults to 5000.
+        converters: functions converting the values of a column in each batch, by
+            column index or name. Defaults to None.
 
-        cursor = db.execute(query, params)
-        for _ in cursor:
-            return True
-    except sqlite3.Error as ex:
-        logger_log.error(f"Query error, query={query} Error={str(ex)}")
-    return False
+    Raises:
+        KeyError: if a converter names a column missing from the results
+
+    Yields:
+        list: batch of rows
+    """
+    cursor = db.cursor()
+    cursor.row_factory = None
+    try:
+        cursor.execute(query, params)
+        columns: list[tuple[int, Converter]] = []
+        if converters:
+            names = [description[0].lower() for description in cursor.description]
+            for column, converter in converters.items():
+                if isinstance(column, str):
+                    if column.lower() not in names:
+                        raise KeyError(f"Query has no column {repr(column)}!")
+                    column = names.index(column.lower())
+                columns.append((column, converter))
+
+        while rows := cursor.fetchmany(batch_size):
+            if columns:
+                values = list(zip(*rows))
+                for column, converter in columns:
+                    values[column] = converter(values[column])
+                rows = list(zip(*values))
+            yield rows
+    finally:
+        cursor.close()
 
 
 def dict_from_row(row: sqlite3.Row) -> dict[str, t.Any]:
@@ -22,7 +22,9 @@ def generate_thumbnail(
         image_directory (Path): path to the image
         image_filename (str): file name of the image
         seeker (FileSeekerBase): :obj:`FileSeekerBase` to find the image
-        report_folder (Path): location to save the file
+        report_folder (Path): location to save the file. Use the
+            `data_save_folder` of the artifact, so the artifact is not restored
+            from the result cache without its thumbnails.
 
     Returns:
         str: string of the html tag for the thumbnail
@@ -0,0 +1,181 @@
+"""Measures the memory used while processing an artifact.
+
+Two sources are available:
+
+* resident set size (RSS) of the process, sampled by a background thread. This is
+  cheap and matches what the operating system (and the OOM killer) sees.
+* :mod:`tracemalloc`, which counts every Python allocation. This is exact but slows
+  processing down considerably.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import tracemalloc
+import typing as t
+
+from dataclasses import asdict, dataclass
+
+
+MEMORY_MODES = ("rss", "tracemalloc")
+DEFAULT_SAMPLE_INTERVAL = 0.05
+
+
+def current_rss() -> int | None:
+    """Returns the resident set size of the process in bytes
+
+    Returns:
+        int: bytes resident in memory or `None` if not supported on the platform
+    """
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return peak_rss()
+
+
+def peak_rss() -> int | None:
+    """Returns the highest resident set size of the process in bytes
+
+    Returns:
+        int: peak bytes resident in memory or `None` if not supported on the platform
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def format_bytes(size: int | float | None) -> str:
+    """Formats a number of bytes for people to read
+
+    Args:
+        size: number of bytes
+
+    Returns:
+        str: formatted size, for example "1.5 MiB"
+    """
+    if size is None:
+        return "N/A"
+    sign = "-" if size < 0 else ""
+    size = abs(size)
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024:
+            break
+        size /= 1024
+    else:
+        unit = "TiB"
+    return f"{sign}{size:.1f} {unit}" if unit != "B" else f"{sign}{int(size)} B"
+
+
+@dataclass
+class MemoryUsage:
+    """Memory used while processing an artifact
+
+    Attributes:
+        peak: highest memory allocated by Python (tracemalloc) in bytes
+        retained: memory still allocated by Python after processing in bytes
+        rss_start: resident set size before processing in bytes
+        rss_end: resident set size after processing in bytes
+        rss_peak: highest sampled resident set size in bytes
+    """
+
+    peak: int | None = None
+    retained: int | None = None
+    rss_start: int | None = None
+    rss_end: int | None = None
+    rss_peak: int | None = None
+
+    def __str__(self) -> str:
+        parts = []
+        if self.peak is not None:
+            parts.append(
+                f"peak {format_bytes(self.peak)}, retained {format_bytes(self.retained)}"
+            )
+        if self.rss_peak is not None:
+            parts.append(
+                f"RSS peak {format_bytes(self.rss_peak)} "
+                f"(start {format_bytes(self.rss_start)}, "
+                f"end {format_bytes(self.rss_end)})"
+            )
+        return "; ".join(parts) or "not measured"
+
+    def asdict(self) -> dict[str, t.Any]:
+        return asdict(self)
+
+
+class MemoryMonitor:
+    """Context manager measuring the memory used by a block of code
+
+    Example:
+
+        >>> with MemoryMonitor("tracemalloc") as monitor:
+        ...     data = list(range(100_000))
+        >>> monitor.usage.peak > 0
+        True
+
+    Args:
+        mode: "rss" to sample the resident set size or "tracemalloc" to also trace
+            Python allocations
+        interval: seconds between two RSS samples
+
+    Raises:
+        ValueError: if the mode is unknown
+    """
+
+    def __init__(self, mode: str = "rss", interval: float = DEFAULT_SAMPLE_INTERVAL):
+        if mode not in MEMORY_MODES:
+            raise ValueError(f"Memory mode must be one of {MEMORY_MODES}, not {mode}!")
+        self.mode = mode
+        self.interval = interval
+        self.usage = MemoryUsage()
+        self._stop = threading.Event()
+        self._sampler: threading.Thread | None = None
+        self._started_tracing = False
+        self._traced_start = 0
+
+    def __repr__(self) -> str:
+        return f"<MemoryMonitor mode={repr(self.mode)}, usage={repr(self.usage)}>"
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            rss = current_rss()
+            if rss is not None and rss > (self.usage.rss_peak or 0):
+                self.usage.rss_peak = rss
+
+    def __enter__(self) -> MemoryMonitor:
+        if self.mode == "tracemalloc":
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+            self._traced_start = tracemalloc.get_traced_memory()[0]
+
+        self.usage.rss_start = self.usage.rss_peak = current_rss()
+        if self.usage.rss_start is not None:
+            self._sampler = threading.Thread(
+                target=self._sample, name="xleapp-memory", daemon=True
+            )
+            self._sampler.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if self._sampler:
+            self._stop.set()
+            self._sampler.join()
+
+        rss = self.usage.rss_end = current_rss()
+        if rss is not None and rss > (self.usage.rss_peak or 0):
+            self.usage.rss_peak = rss
+
+        if self.mode == "tracemalloc":
+            traced, traced_peak = tracemalloc.get_traced_memory()
+            self.usage.peak = traced_peak - self._traced_start
+            self.usage.retained = traced - self._traced_start
+            if self._started_tracing:
+                tracemalloc.stop()
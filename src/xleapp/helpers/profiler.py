@@ -0,0 +1,191 @@
+"""Profiles artifacts while they are processed.
+
+Two modes are available:
+
+* "cprofile" runs each artifact's `process()` with :mod:`cProfile` and saves the
+  statistics as `<class name>.pstats`. Open them with :mod:`pstats` or tools such as
+  snakeviz.
+* "sample" starts a background thread reading the stack of every thread with
+  :func:`sys._current_frames`. The stacks of the whole run are saved in the
+  collapsed format (`run.collapsed`) used by flamegraph.pl and speedscope.
+
+Sampling adds very little overhead, so it can be used on full extractions.
+"""
+from __future__ import annotations
+
+import collections
+import cProfile
+import logging
+import pathlib
+import sys
+import threading
+import typing as t
+
+
+if t.TYPE_CHECKING:
+    from types import FrameType
+
+logger_log = logging.getLogger("xleapp.logfile")
+
+PROFILE_MODES = ("cprofile", "sample")
+PROFILE_FOLDER = "profiles"
+COLLAPSED_FILE = "run.collapsed"
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+
+def frame_label(frame: FrameType) -> str:
+    """Returns the name of a frame in a collapsed stack
+
+    Args:
+        frame: frame of the stack
+
+    Returns:
+        str: "<module>:<function>" of the frame
+    """
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{frame.f_code.co_name}".replace(";", ":")
+
+
+class SamplingProfiler:
+    """Samples the stacks of every running thread
+
+    Args:
+        interval: seconds between two samples
+
+    Attributes:
+        stacks: number of times each collapsed stack was sampled
+        label: prefix added to each stack, for example the artifact being processed
+    """
+
+    def __init__(self, interval: float = DEFAULT_SAMPLE_INTERVAL) -> None:
+        self.interval = interval
+        self.stacks: collections.Counter[str] = collections.Counter()
+        self.label: str | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __repr__(self) -> str:
+        return (
+            f"<SamplingProfiler interval={self.interval}, "
+            f"samples={sum(self.stacks.values())}>"
+        )
+
+    def sample(self) -> None:
+        """Records the current stack of every thread except the sampler"""
+        threads = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == threading.get_ident():
+                continue
+
+            stack = []
+            while frame is not None:
+                stack.append(frame_label(frame))
+                frame = frame.f_back
+            stack.append(threads.get(ident, str(ident)))
+            if self.label:
+                stack.append(self.label)
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def start(self) -> None:
+        """Starts sampling in a background thread"""
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="xleapp-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops sampling"""
+        if self._thread:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def write(self, collapsed_file: pathlib.Path) -> pathlib.Path:
+        """Saves the samples in the collapsed stack format
+
+        Args:
+            collapsed_file: file to save the samples to
+
+        Returns:
+            Path: the saved file
+        """
+        with open(collapsed_file, "w", encoding="utf-8") as output:
+            for stack, count in sorted(self.stacks.items()):
+                output.write(f"{stack} {count}\n")
+        return collapsed_file
+
+
+class Profiler:
+    """Profiles the artifacts of a run
+
+    Example:
+
+        >>> profiler = Profiler("cprofile", log_folder / "profiles")
+        >>> with profiler:
+        ...     profiler.profile("MyArtifact", artifact.process)
+
+    Args:
+        mode: "cprofile" or "sample"
+        folder: folder to save the profiles in. Created if missing.
+        interval: seconds between two samples in "sample" mode
+
+    Raises:
+        ValueError: if the mode is unknown
+    """
+
+    def __init__(
+        self,
+        mode: str,
+        folder: pathlib.Path,
+        interval: float = DEFAULT_SAMPLE_INTERVAL,
+    ) -> None:
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Profile mode must be one of {PROFILE_MODES}, not {mode}!")
+        self.mode = mode
+        self.folder = pathlib.Path(folder)
+        self.sampler = SamplingProfiler(interval) if mode == "sample" else None
+
+    def __repr__(self) -> str:
+        return f"<Profiler mode={repr(self.mode)}, folder={repr(self.folder)}>"
+
+    def __enter__(self) -> Profiler:
+        self.folder.mkdir(parents=True, exist_ok=True)
+        if self.sampler:
+            self.sampler.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if self.sampler:
+            self.sampler.stop()
+            collapsed_file = self.sampler.write(self.folder / COLLAPSED_FILE)
+            logger_log.info(f"-> Saved profile samples to {collapsed_file}")
+
+    def profile(self, name: str, func: t.Callable[[], t.Any]) -> t.Any:
+        """Calls a function while profiling it
+
+        Args:
+            name: name of the profile, usually the artifact's class name
+            func: function to call
+
+        Returns:
+            the value returned by the function
+        """
+        if self.sampler:
+            self.sampler.label = name
+            try:
+                return func()
+            finally:
+                self.sampler.label = None
+
+        profile = cProfile.Profile()
+        try:
+            return profile.runcall(func)
+        finally:
+            stats_file = self.folder / f"{name}.pstats"
+            profile.dump_stats(stats_file)
+            logger_log.info(f"-> Saved profile to {stats_file}")
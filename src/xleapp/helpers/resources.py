@@ -0,0 +1,185 @@
+"""Case wide cache of parsed files and blobs.
+
+Several artifacts often parse the same file, for example the application state and
+MobileInstallation plists or `com.apple.*` preference files. The cache returns the
+already parsed object instead::
+
+    info = g.app.resource_cache.load(fp.path, "plist")
+
+Files are keyed by path, size, modification time and parser, so a changed file is
+parsed again. Blobs (protobuf messages, archived objects, ...) are keyed by a digest
+of their contents. The least recently used entries are dropped once the size of the
+cached files or blobs goes over the budget.
+
+Parsed objects are shared between artifacts and must not be changed.
+"""
+from __future__ import annotations
+
+import collections
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import plistlib
+import threading
+import typing as t
+
+from dataclasses import asdict, dataclass
+
+
+logger_log = logging.getLogger("xleapp.logfile")
+
+DEFAULT_RESOURCE_CACHE_SIZE = 256 * 1024**2
+
+# Parse an open binary file
+Parser = t.Callable[[t.BinaryIO], t.Any]
+
+PARSERS: dict[str, Parser] = {
+    "plist": plistlib.load,
+    "json": json.load,
+}
+
+
+@dataclass
+class CacheStats:
+    """Counters of a :obj:`ResourceCache`
+
+    Attributes:
+        hits: lookups returning a cached object
+        misses: lookups parsing the resource
+        evictions: entries dropped to stay within the budget
+        size: size in bytes of the cached resources
+        entries: number of cached resources
+    """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    size: int = 0
+    entries: int = 0
+
+    def asdict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+def _parser(parser: str | Parser) -> tuple[t.Hashable, Parser]:
+    # Functions are part of the key themselves since lambdas share their names
+    if callable(parser):
+        return parser, parser
+    try:
+        return parser, PARSERS[parser]
+    except KeyError as err:
+        raise ValueError(
+            f"Parser must be a function or one of {tuple(PARSERS)}!"
+        ) from err
+
+
+class ResourceCache:
+    """Least recently used cache of parsed resources
+
+    Args:
+        max_size: size in bytes of the files and blobs the cache holds. The size of
+            the parsed objects is not measured. Defaults to 256 MiB.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_RESOURCE_CACHE_SIZE) -> None:
+        self.max_size = max_size
+        self.stats = CacheStats()
+        self._entries: collections.OrderedDict[
+            t.Hashable, tuple[t.Any, int]
+        ] = collections.OrderedDict()
+        self._lock = threading.RLock()
+
+    def __repr__(self) -> str:
+        return (
+            f"<ResourceCache max_size={self.max_size}, entries={self.stats.entries}, "
+            f"hits={self.stats.hits}, misses={self.stats.misses}>"
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _get(self, key: t.Hashable, size: int, parse: t.Callable[[], t.Any]) -> t.Any:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                return self._entries[key][0]
+            self.stats.misses += 1
+
+        value = parse()
+
+        with self._lock:
+            if size > self.max_size or key in self._entries:
+                return value
+            self._entries[key] = (value, size)
+            self.stats.size += size
+            while self.stats.size > self.max_size:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.stats.size -= evicted_size
+                self.stats.evictions += 1
+            self.stats.entries = len(self._entries)
+        return value
+
+    def load(self, path: pathlib.Path | str, parser: str | Parser = "plist") -> t.Any:
+        """Returns a parsed file
+
+        Args:
+            path: file to parse
+            parser: "plist", "json" or a function parsing an open binary file.
+                Defaults to "plist".
+
+        Raises:
+            ValueError: if the parser is unknown
+            OSError: if the file can not be read
+
+        Returns:
+            the parsed file
+        """
+        name, parse = _parser(parser)
+        path = pathlib.Path(path)
+        stat = os.stat(path)
+        key = ("file", str(path), stat.st_size, stat.st_mtime_ns, name)
+
+        def parse_file() -> t.Any:
+            with open(path, "rb") as file:
+                return parse(file)
+
+        return self._get(key, stat.st_size, parse_file)
+
+    def parse_bytes(
+        self, data: bytes, parser: str | t.Callable[[bytes], t.Any]
+    ) -> t.Any:
+        """Returns a parsed blob
+
+        Args:
+            data: contents of the blob
+            parser: "plist", "json" or a function parsing the bytes, for example
+                a protobuf decoder
+
+        Raises:
+            ValueError: if the parser is unknown
+
+        Returns:
+            the parsed blob
+        """
+        name: t.Hashable
+        if callable(parser):
+            name, parse = parser, parser
+        elif parser == "plist":
+            name, parse = parser, plistlib.loads
+        elif parser == "json":
+            name, parse = parser, json.loads
+        else:
+            raise ValueError(f"Parser must be a function or one of {tuple(PARSERS)}!")
+
+        key = ("blob", hashlib.blake2b(data, digest_size=16).digest(), len(data), name)
+        return self._get(key, len(data), lambda: parse(data))
+
+    def clear(self) -> None:
+        """Drops every entry. The hit and miss counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self.stats.size = 0
+            self.stats.entries = 0
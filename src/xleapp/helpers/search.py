@@ -16,7 +16,8 @@
 
 import magic
 
-from xleapp.helpers import descriptors, strings, utils
+from xleapp.helpers import descriptors, strings, tracing, utils
+from xleapp.helpers.db import clear_schema_cache
 
 
 logger_log = logging.getLogger("xleapp.logfile")
@@ -168,57 +169,68 @@ def add(self, regex: regex.Regex, files, file_names_only: bool = False) -> None:
         if self.logged[regex.regex] == 0:
             logger_process.info(f"\nFiles for {regex.regex} located at:")
 
-        for item in files:
-            file_handle: Handle
-            path: pathlib.Path = None
-            extended_path: pathlib.Path = None
-
-            if isinstance(item, (pathlib.Path, str)):
-                path = pathlib.Path(item).resolve()
-            elif isinstance(item, Handle):
-                path = pathlib.Path(item.path).resolve()
-
-            # If we have more then 10 files, then set only
-            # file names instead of `FileIO` or
-            # `sqlite3.connection` to save memory. Most artifacts
-            # probably have less then 5 files they will read/use.
-            if (
-                len(files) > MAX_NUMBER_OF_FILES_HANDLES_TO_OPEN
-                or file_names_only
-                or path.is_dir()
-            ):
-                file_handle = Handle(found_file=item, path=path)
-
-            if path.drive.startswith("\\\\?\\"):
-                extended_path = pathlib.Path(path)
-
-            try:
-                db = sqlite3.connect(
-                    f"file:{path}?mode=ro",
-                    uri=True,
+        with tracing.span("open", pattern=regex.regex, files=len(files)) as span:
+            for item in files:
+                file_handle: Handle
+                path: pathlib.Path = None
+                extended_path: pathlib.Path = None
+
+                if isinstance(item, (pathlib.Path, str)):
+                    path = pathlib.Path(item).resolve()
+                elif isinstance(item, Handle):
+                    path = pathlib.Path(item.path).resolve()
+
+                # If we have more then 10 files, then set only
+                # file names instead of `FileIO` or
+                # `sqlite3.connection` to save memory. Most artifacts
+                # probably have less then 5 files they will read/use.
+                if (
+                    len(files) > MAX_NUMBER_OF_FILES_HANDLES_TO_OPEN
+                    or file_names_only
+                    or path.is_dir()
+                ):
+                    file_handle = Handle(found_file=item, path=path)
+
+                if path.drive.startswith("\\\\?\\"):
+                    extended_path = pathlib.Path(path)
+
+                try:
+                    db = sqlite3.connect(
+                        f"file:{path}?mode=ro",
+                        uri=True,
+                    )
+                    cursor = db.cursor()
+                    # This will fail if not a database file
+                    cursor.execute("PRAGMA page_count").fetchone()
+                    db.row_factory = sqlite3.Row
+                    file_handle = Handle(found_file=db, path=path)
+                except sqlite3.DatabaseError:
+                    if extended_path:
+                        fp = open(extended_path, "rb")
+                    else:
+                        fp = open(path, "rb")
+                    file_handle = Handle(found_file=fp, path=path)
+                except FileNotFoundError as err:
+                    raise FileNotFoundError(f"File {repr(path)} was not found!") from err
+
+                if file_handle:
+                    logger_process.info(f"    {file_handle.path}")
+                    self[regex].add(file_handle)
+
+            if span.recording:
+                span.set(
+                    bytes=sum(
+                        handle.path.stat().st_size
+                        for handle in self[regex]
+                        if handle.path.is_file()
+                    )
                 )
-                cursor = db.cursor()
-                # This will fail if not a database file
-                cursor.execute("PRAGMA page_count").fetchone()
-                db.row_factory = sqlite3.Row
-                file_handle = Handle(found_file=db, path=path)
-            except sqlite3.DatabaseError:
-                if extended_path:
-                    fp = open(extended_path, "rb")
-                else:
-                    fp = open(path, "rb")
-                file_handle = Handle(found_file=fp, path=path)
-            except FileNotFoundError as err:
-                raise FileNotFoundError(f"File {repr(path)} was not found!") from err
-
-            if file_handle:
-                logger_process.info(f"    {file_handle.path}")
-                self[regex].add(file_handle)
 
     def clear(self) -> None:
         """Resets the tracked files."""
         self.data = {}
         self.logged = set()
+        clear_schema_cache()
 
     def __getitem__(self, regex: regex.Regex) -> set[Handle]:
         try:
@@ -361,10 +373,10 @@ def build_files_list(self, folder):
 
         for root, sub_folders, fls in os.walk(folder):
             for folder in sub_folders:
-                folders.add(f"{root}\\{folder}")
+                folders.add(os.path.join(root, folder))
 
             for found_file in fls:
-                files.add(f"{root}\\{found_file}")
+                files.add(os.path.join(root, found_file))
 
         return folders | files
 
@@ -420,14 +432,14 @@ def build_files_list(self, folder=None) -> list[tarfile.TarInfo]:
 
     @functools.cached_property
     def validate(self) -> bool:
-        mime, _ = self.input_path
+        mime, path = self.input_path
         # "inode/blockdevice" seems to be the file magic number on some iOS tar
         # extractions could manually pull the magic numbers instead of this for
         # tar file.
         return mime in [
             "application/x-gzip",
             "application/x-tar",
-        ] or self.input_file.suffix in [".gz", ".tar", ".tar.gz"]
+        ] or path.suffix in [".gz", ".tar", ".tar.gz"]
 
     @property
     def priority(self) -> int:
@@ -469,8 +481,8 @@ def cleanup(self) -> None:
 
     @functools.cached_property
     def validate(self) -> bool:
-        mime, _ = self.input_path
-        return mime == "application/zip" or self.input_path.suffix in [".zip"]
+        mime, path = self.input_path
+        return mime == "application/zip" or path.suffix in [".zip"]
 
     @property
     def priority(self) -> int:
@@ -1,3 +1,5 @@
+import mmap
+import os
 import re
 import string
 import typing as t
@@ -15,6 +17,14 @@
 
 SMALLEST_STRING_TO_RETURN = 4
 
+# Maps every byte to itself if printable or to a period
+_RAW_TABLE = bytes(
+    byte if BYTE_SPACE <= byte < BYTE_DEL else ord(ASCII_PERIOD) for byte in range(256)
+)
+_PRINTABLE = re.escape(string.printable)
+_PRINTABLE_BYTES = re.escape(string.printable.encode("ascii"))
+STRING_ENCODINGS = ("ascii", "utf-16le")
+
 
 def raw(data: t.ByteString) -> str:
     """Returns string of printable characters. Replacing non-printable characters
@@ -26,9 +36,9 @@ def raw(data: t.ByteString) -> str:
     Returns:
         a filtered string
     """
-    return "".join(
-        [chr(byte) if BYTE_SPACE <= byte < BYTE_DEL else ASCII_PERIOD for byte in data],
-    )
+    if not isinstance(data, (bytes, bytearray)):
+        data = bytes(data)
+    return data.translate(_RAW_TABLE).decode("ascii")
 
 
 def print_str(data: t.ByteString) -> filter:
@@ -57,50 +67,96 @@ def wrap_text(
     separator_chars: str,
     width: int = 70,
     keep_separators: bool = True,
-):
-    current_length = 0
-    latest_separator = -1
-    current_chunk_start = 0
-    output = ""
-    char_index = 0
-    while char_index < len(source_text):
-        if source_text[char_index] in separator_chars:
-            latest_separator = char_index
-        output += source_text[char_index]
-        current_length += 1
-        if current_length == width:
-            if latest_separator >= current_chunk_start:
-                # Valid earlier separator, cut there
-                cutting_length = char_index - latest_separator
-                if not keep_separators:
-                    cutting_length += 1
-                if cutting_length:
-                    output = output[:-cutting_length]
-                output += "\n"
-                current_chunk_start = latest_separator + 1
-                char_index = current_chunk_start
-            else:
-                # No separator found, hard cut
-                output += "\n"
-                current_chunk_start = char_index + 1
-                latest_separator = current_chunk_start - 1
-                char_index += 1
-            current_length = 0
+) -> str:
+    """Wraps text into lines of at most `width` characters
+
+    Lines are cut after the last separator character in the line or, if the line
+    has no separator, after `width` characters.
+
+    Args:
+        source_text: text to wrap
+        separator_chars: characters the text can be cut at
+        width: maximum length of a line. Defaults to 70.
+        keep_separators: keep the separator at the end of the line. Defaults to True.
+
+    Returns:
+        the wrapped text
+    """
+    separators = {char for char in separator_chars if len(char) == 1}
+    lines = []
+    start = 0
+    while 0 < width <= len(source_text) - start:
+        end = start + width
+        latest_separator = max(
+            (source_text.rfind(char, start, end) for char in separators),
+            default=-1,
+        )
+        if latest_separator >= start:
+            # Valid earlier separator, cut there
+            lines.append(
+                source_text[
+                    start : latest_separator + 1 if keep_separators else latest_separator
+                ]
+            )
+            start = latest_separator + 1
         else:
-            char_index += 1
-    return output
+            # No separator found, hard cut
+            lines.append(source_text[start:end])
+            start = end
+        lines.append("\n")
+    lines.append(source_text[start:])
+    return "".join(lines)
+
+
+def filter_strings_in_file(filename: Path, min_chars=4) -> t.Iterator[str]:
+    """Yields runs of printable characters in a text file
 
+    Args:
+        filename: file to read
+        min_chars: shortest run to return. Defaults to 4.
 
-def filter_strings_in_file(filename: Path, min_chars=4):
+    Yields:
+        runs of at least `min_chars` printable characters
+    """
+    pattern = re.compile(f"[{_PRINTABLE}]{{{max(min_chars, 1)},}}")
     with open(filename, errors="ignore") as file:
-        result = ""
-        printable = set(string.printable)
-        for char in file.read():
-            if char in printable:
-                result += char
-                continue
-            if len(result) >= min_chars:
-                yield result
-            result = ""
-        if len(result) >= min_chars:  # catch reslt at EOF
-            yield result
+        for match in pattern.finditer(file.read()):
+            yield match.group()
+
+
+def strings_in_file(
+    filename: Path,
+    min_chars: int = SMALLEST_STRING_TO_RETURN,
+    encoding: str = "ascii",
+) -> t.Iterator[str]:
+    """Yields strings found in a binary file. Works similar to the Linux
+       `strings` function.
+
+    The file is memory mapped and scanned with a compiled regular expression, so
+    large files are never loaded in memory.
+
+    Args:
+        filename: file to scan
+        min_chars: shortest string to return. Defaults to 4.
+        encoding: "ascii" for single byte strings or "utf-16le" for the wide strings
+            used by Windows and many Apple formats. Defaults to "ascii".
+
+    Raises:
+        ValueError: if the encoding is not supported
+
+    Yields:
+        strings of at least `min_chars` printable characters
+    """
+    if encoding == "ascii":
+        pattern = re.compile(b"[%s]{%d,}" % (_PRINTABLE_BYTES, min_chars))
+    elif encoding == "utf-16le":
+        pattern = re.compile(b"(?:[%s]\x00){%d,}" % (_PRINTABLE_BYTES, min_chars))
+    else:
+        raise ValueError(f"Encoding must be one of {STRING_ENCODINGS}!")
+
+    with open(filename, "rb") as file:
+        if not os.fstat(file.fileno()).st_size:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for match in pattern.finditer(data):
+                yield match.group().decode(encoding)
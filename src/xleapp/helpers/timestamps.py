@@ -0,0 +1,274 @@
+"""Converts batches of timestamps to readable dates.
+
+Databases store times as numbers counted from different epochs. The converters in
+this module take a whole column of values and return strings formatted like
+``2022-01-31 13:45:10``::
+
+    >>> timestamps.convert([600000000, None], "mac")
+    ['2020-01-06 10:40:00', None]
+
+Instead of creating a :obj:`datetime.datetime` for every value, the date part of each
+day is formatted once and reused, repeated values are formatted once per batch and
+timezone offsets are looked up once per 15 minutes of time. Fractions of a second
+are dropped.
+
+Supported epochs:
+
+* unix, unix_ms, unix_us, unix_ns: seconds (or milli-, micro-, nanoseconds) since
+  1970-01-01
+* mac: seconds since 2001-01-01 (Mac absolute time, Core Data, Cocoa)
+* webkit, chrome: microseconds since 1601-01-01
+* gps: seconds since 1980-01-06, without leap seconds
+"""
+from __future__ import annotations
+
+import bisect
+import calendar
+import datetime
+import functools
+import typing as t
+import zoneinfo
+
+
+if t.TYPE_CHECKING:
+    from xleapp.artifact.table import ResultTable
+
+# Seconds to add to the value (after dividing by the factor) to get Unix time and
+# the number of units in one second
+EPOCHS: dict[str, tuple[int, int]] = {
+    "unix": (0, 1),
+    "unix_ms": (0, 1_000),
+    "unix_us": (0, 1_000_000),
+    "unix_ns": (0, 1_000_000_000),
+    "mac": (978_307_200, 1),
+    "webkit": (-11_644_473_600, 1_000_000),
+    "chrome": (-11_644_473_600, 1_000_000),
+    "gps": (315_964_800, 1),
+}
+
+# UTC dates a leap second was added since the GPS epoch
+LEAP_SECONDS = (
+    (1981, 7, 1),
+    (1982, 7, 1),
+    (1983, 7, 1),
+    (1985, 7, 1),
+    (1988, 1, 1),
+    (1990, 1, 1),
+    (1991, 1, 1),
+    (1992, 7, 1),
+    (1993, 7, 1),
+    (1994, 7, 1),
+    (1996, 1, 1),
+    (1997, 7, 1),
+    (1999, 1, 1),
+    (2006, 1, 1),
+    (2009, 1, 1),
+    (2012, 7, 1),
+    (2015, 7, 1),
+    (2017, 1, 1),
+)
+# Unix time of each leap second as counted by a clock ignoring leap seconds
+_LEAP_THRESHOLDS = [
+    calendar.timegm((*date, 0, 0, 0)) + count
+    for count, date in enumerate(LEAP_SECONDS, start=1)
+]
+
+SECONDS_PER_DAY = 86_400
+# Every timezone change since 1970 happens on a quarter hour
+OFFSET_BUCKET = 900
+_UNIX_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+Timezone = t.Union[datetime.tzinfo, str, None]
+
+
+def _unix_seconds(value: t.Any, offset: int, factor: int, gps: bool) -> int | None:
+    try:
+        seconds = int(value // factor) + offset
+    except (TypeError, ValueError, OverflowError):
+        return None
+    if gps:
+        seconds -= bisect.bisect_right(_LEAP_THRESHOLDS, seconds)
+    return seconds
+
+
+def to_unix(values: t.Iterable[t.Any], epoch: str = "unix") -> list[int | None]:
+    """Converts timestamps to whole seconds of Unix time
+
+    Args:
+        values: timestamps counted from `epoch`. `array.array` and
+            :obj:`~xleapp.artifact.table.Column` objects work as well as lists.
+        epoch: name of the epoch. See :data:`EPOCHS`. Defaults to "unix".
+
+    Raises:
+        ValueError: if the epoch is unknown
+
+    Returns:
+        list: seconds since 1970-01-01 UTC or `None` for values which are not numbers
+    """
+    offset, factor = _epoch(epoch)
+    gps = epoch == "gps"
+    return [_unix_seconds(value, offset, factor, gps) for value in values]
+
+
+def _epoch(epoch: str) -> tuple[int, int]:
+    try:
+        return EPOCHS[epoch]
+    except KeyError as err:
+        raise ValueError(f"Epoch must be one of {tuple(EPOCHS)}!") from err
+
+
+def _day_prefix(day: int) -> str:
+    return f"{datetime.date.fromordinal(_UNIX_EPOCH_ORDINAL + day).isoformat()} "
+
+
+@functools.cache
+def _times_of_day() -> list[str]:
+    return [
+        f"{hour:02}:{minute:02}:{second:02}"
+        for hour in range(24)
+        for minute in range(60)
+        for second in range(60)
+    ]
+
+
+@functools.lru_cache(maxsize=32)
+def _timezone(tz: str) -> datetime.tzinfo:
+    return zoneinfo.ZoneInfo(tz)
+
+
+class _Offsets:
+    """Caches the UTC offset of a timezone for each quarter hour"""
+
+    def __init__(self, tz: datetime.tzinfo) -> None:
+        self.tz = tz
+        self._buckets: dict[int, int | None] = {}
+
+    def _offset(self, seconds: int) -> int:
+        utc_offset = datetime.datetime.fromtimestamp(seconds, self.tz).utcoffset()
+        return int(utc_offset.total_seconds()) if utc_offset else 0
+
+    def __call__(self, seconds: int) -> int:
+        bucket = seconds // OFFSET_BUCKET
+        try:
+            offset = self._buckets[bucket]
+        except KeyError:
+            start = bucket * OFFSET_BUCKET
+            offset = self._offset(start)
+            if offset != self._offset(start + OFFSET_BUCKET - 1):
+                # The offset changes inside this quarter hour
+                offset = None
+            self._buckets[bucket] = offset
+        if offset is None:
+            return self._offset(seconds)
+        return offset
+
+
+def convert(
+    values: t.Iterable[t.Any],
+    epoch: str = "unix",
+    tz: Timezone = None,
+) -> list[str | None]:
+    """Converts timestamps to readable dates
+
+    Args:
+        values: timestamps counted from `epoch`. `array.array` and
+            :obj:`~xleapp.artifact.table.Column` objects work as well as lists.
+        epoch: name of the epoch. See :data:`EPOCHS`. Defaults to "unix".
+        tz: timezone (or its name, for example "America/New_York") of the returned
+            dates. Defaults to UTC.
+
+    Raises:
+        ValueError: if the epoch is unknown
+
+    Returns:
+        list: dates formatted as "YYYY-MM-DD HH:MM:SS" or `None` for values which
+        are not numbers or out of range
+    """
+    offset, factor = _epoch(epoch)
+    gps = epoch == "gps"
+    if isinstance(tz, str):
+        tz = _timezone(tz)
+    offsets = _Offsets(tz) if tz is not None else None
+
+    times = _times_of_day()
+    days: dict[int, str] = {}
+    formatted: dict[t.Any, str | None] = {}
+    cached = formatted.get
+    missing = object()
+    results: list[str | None] = []
+    for value in values:
+        try:
+            result = cached(value, missing)
+        except TypeError:
+            # Values which can not be hashed are not numbers
+            results.append(None)
+            continue
+
+        if result is missing:
+            try:
+                seconds = int(value // factor) + offset
+                if gps:
+                    seconds -= bisect.bisect_right(_LEAP_THRESHOLDS, seconds)
+                if offsets is not None:
+                    seconds += offsets(seconds)
+                day, second = divmod(seconds, SECONDS_PER_DAY)
+                prefix = days.get(day)
+                if prefix is None:
+                    prefix = days[day] = _day_prefix(day)
+                result = prefix + times[second]
+            except (TypeError, ValueError, OverflowError, OSError):
+                result = None
+            formatted[value] = result
+        results.append(result)
+    return results
+
+
+def convert_value(value: t.Any, epoch: str = "unix", tz: Timezone = None) -> str | None:
+    """Converts a single timestamp to a readable date
+
+    Use :func:`convert` for many values.
+
+    Args:
+        value: timestamp counted from `epoch`
+        epoch: name of the epoch. See :data:`EPOCHS`. Defaults to "unix".
+        tz: timezone of the returned date. Defaults to UTC.
+
+    Returns:
+        str: date formatted as "YYYY-MM-DD HH:MM:SS" or `None`
+    """
+    return convert((value,), epoch, tz)[0]
+
+
+def converter(
+    epoch: str = "unix", tz: Timezone = None
+) -> t.Callable[[t.Iterable[t.Any]], list[str | None]]:
+    """Creates a column converter for :func:`xleapp.helpers.db.iter_query`
+
+    Args:
+        epoch: name of the epoch. See :data:`EPOCHS`. Defaults to "unix".
+        tz: timezone of the returned dates. Defaults to UTC.
+
+    Raises:
+        ValueError: if the epoch is unknown
+
+    Returns:
+        function converting the values of a column
+    """
+    _epoch(epoch)
+    return functools.partial(convert, epoch=epoch, tz=tz)
+
+
+def convert_column(
+    table: ResultTable, key: int | str, epoch: str = "unix", tz: Timezone = None
+) -> None:
+    """Replaces a column of timestamps in a table with readable dates
+
+    The values are read straight from the column's typed array.
+
+    Args:
+        table: table holding the column
+        key: index or header of the column
+        epoch: name of the epoch. See :data:`EPOCHS`. Defaults to "unix".
+        tz: timezone of the returned dates. Defaults to UTC.
+    """
+    table.replace_column(key, convert(table.get_column(key), epoch, tz))
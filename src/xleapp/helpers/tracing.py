@@ -0,0 +1,262 @@
+"""Lightweight tracing of where the time of a run goes.
+
+Code is wrapped in nested spans with attributes::
+
+    pattern = "**/Accounts3.sqlite"
+    with tracing.span("search", artifact="Accounts", pattern=pattern) as span:
+        results = set(seeker.search(pattern))
+        span.set(files=len(results))
+
+Spans do nothing until tracing is enabled with :func:`enable`. Each finished span is
+then written as one JSON line to the trace file. :func:`to_chrome_trace` converts the
+trace file for `chrome://tracing`, Perfetto or speedscope.
+"""
+from __future__ import annotations
+
+import contextlib
+import itertools
+import json
+import logging
+import os
+import pathlib
+import threading
+import time
+import typing as t
+
+
+logger_log = logging.getLogger("xleapp.logfile")
+
+TRACE_FILE = "trace.jsonl"
+
+
+class Span:
+    """Timed section of code
+
+    Attributes:
+        name: name of the span, for example "search" or "export"
+        attributes: extra information about the span (artifact, pattern, rows, ...)
+        span_id: unique ID of the span in the trace
+        parent_id: ID of the span this span is nested in
+        recording: False for the placeholder returned when tracing is disabled
+    """
+
+    __slots__ = ("name", "attributes", "span_id", "parent_id")
+    recording = True
+
+    def __init__(
+        self,
+        name: str,
+        attributes: dict[str, t.Any],
+        span_id: int,
+        parent_id: int | None,
+    ) -> None:
+        self.name = name
+        self.attributes = attributes
+        self.span_id = span_id
+        self.parent_id = parent_id
+
+    def __repr__(self) -> str:
+        return f"<Span name={repr(self.name)}, attributes={repr(self.attributes)}>"
+
+    def set(self, **attributes: t.Any) -> None:
+        """Adds attributes to the span
+
+        Args:
+            **attributes: attributes to add
+        """
+        self.attributes.update(attributes)
+
+
+class _DisabledSpan:
+    """Placeholder span used while tracing is disabled"""
+
+    recording = False
+
+    def __enter__(self) -> _DisabledSpan:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        pass
+
+    def set(self, **attributes: t.Any) -> None:
+        pass
+
+
+class Tracer:
+    """Writes spans to a JSON lines file
+
+    Args:
+        trace_file: file to write the spans to
+    """
+
+    def __init__(self, trace_file: pathlib.Path) -> None:
+        self.trace_file = pathlib.Path(trace_file)
+        self._output = open(self.trace_file, "w", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._ids = itertools.count(1)
+        self._origin = time.perf_counter_ns()
+        self._pid = os.getpid()
+
+    def __repr__(self) -> str:
+        return f"<Tracer trace_file={repr(self.trace_file)}>"
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attributes: t.Any) -> t.Iterator[Span]:
+        """Times a section of code
+
+        Args:
+            name: name of the span
+            **attributes: attributes of the span
+
+        Yields:
+            Span: the span being timed
+        """
+        stack: list[Span] = self._local.__dict__.setdefault("stack", [])
+        current = Span(
+            name,
+            attributes,
+            next(self._ids),
+            stack[-1].span_id if stack else None,
+        )
+        stack.append(current)
+        start = time.perf_counter_ns()
+        try:
+            yield current
+        except BaseException as err:
+            current.attributes["error"] = repr(err)
+            raise
+        finally:
+            end = time.perf_counter_ns()
+            stack.pop()
+            self._write(current, start, end)
+
+    def _write(self, span: Span, start: int, end: int) -> None:
+        thread = threading.current_thread()
+        record = {
+            "name": span.name,
+            "id": span.span_id,
+            "parent": span.parent_id,
+            "ts": (start - self._origin) // 1000,
+            "dur": (end - start) // 1000,
+            "pid": self._pid,
+            "tid": thread.ident,
+            "thread": thread.name,
+            "attributes": span.attributes,
+        }
+        line = json.dumps(record, default=str)
+        with self._lock:
+            if not self._output.closed:
+                self._output.write(line + "\n")
+
+    def close(self) -> None:
+        """Flushes and closes the trace file"""
+        with self._lock:
+            self._output.close()
+
+
+_tracer: Tracer | None = None
+_disabled_span = _DisabledSpan()
+
+
+def enable(trace_file: pathlib.Path) -> Tracer:
+    """Starts writing spans to a trace file
+
+    Args:
+        trace_file: file to write the spans to
+
+    Returns:
+        Tracer: the enabled tracer
+    """
+    global _tracer
+    disable()
+    _tracer = Tracer(trace_file)
+    return _tracer
+
+
+def disable() -> pathlib.Path | None:
+    """Stops tracing and closes the trace file
+
+    Returns:
+        Path: the closed trace file or `None` if tracing was not enabled
+    """
+    global _tracer
+    if _tracer is None:
+        return None
+    tracer, _tracer = _tracer, None
+    tracer.close()
+    return tracer.trace_file
+
+
+def enabled() -> bool:
+    """Returns True if spans are being recorded"""
+    return _tracer is not None
+
+
+def span(name: str, **attributes: t.Any) -> t.ContextManager[Span | _DisabledSpan]:
+    """Times a section of code if tracing is enabled
+
+    Args:
+        name: name of the span
+        **attributes: attributes of the span
+
+    Returns:
+        context manager yielding the span
+    """
+    if _tracer is None:
+        return _disabled_span
+    return _tracer.span(name, **attributes)
+
+
+def to_chrome_trace(
+    trace_file: pathlib.Path, output_file: pathlib.Path | None = None
+) -> pathlib.Path:
+    """Converts a trace file to the Chrome trace event format
+
+    Args:
+        trace_file: JSON lines trace file written by :class:`Tracer`
+        output_file: file to save the converted trace. Defaults to the trace file
+            with a `.json` suffix.
+
+    Returns:
+        Path: the converted trace
+    """
+    trace_file = pathlib.Path(trace_file)
+    output_file = pathlib.Path(output_file or trace_file.with_suffix(".json"))
+
+    events: list[dict[str, t.Any]] = []
+    threads: dict[tuple[int, int], str] = {}
+    with open(trace_file, encoding="utf-8") as trace:
+        for line in trace:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            threads[(record["pid"], record["tid"])] = record["thread"]
+            events.append(
+                {
+                    "name": record["name"],
+                    "cat": "xleapp",
+                    "ph": "X",
+                    "ts": record["ts"],
+                    "dur": record["dur"],
+                    "pid": record["pid"],
+                    "tid": record["tid"],
+                    "args": record["attributes"],
+                }
+            )
+
+    events.extend(
+        {
+            "name": "thread_name",
+            "ph": "M",
+            "pid": pid,
+            "tid": tid,
+            "args": {"name": name},
+        }
+        for (pid, tid), name in threads.items()
+    )
+    output_file.write_text(
+        json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}),
+        encoding="utf-8",
+    )
+    return output_file
@@ -27,6 +27,22 @@ def is_platform_windows() -> bool:
     return os.name == "nt"
 
 
+def user_cache_dir() -> Path:
+    """Returns the per-user cache folder for xLEAPP
+
+    Uses ``%LOCALAPPDATA%`` on Windows and ``$XDG_CACHE_HOME`` (or ``~/.cache``)
+    everywhere else. The folder is not created.
+
+    Returns:
+        Path to the cache folder
+    """
+    if is_platform_windows():
+        base = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+        return Path(base) / "xleapp" / "Cache"
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "xleapp"
+
+
 def sanitize_file_path(filepath: str, replacement_char: str = "_") -> str:
     """
     Removes illegal characters (for windows) from the string passed.
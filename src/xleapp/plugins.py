@@ -1,26 +1,126 @@
 from __future__ import annotations
 
 import abc
+import contextlib
 import importlib
+import json
+import logging
+import pathlib
 import typing as t
 
+from ._version import __version__
+from .artifact.lazy import LazyArtifact
 from .helpers.search import FileSeekerBase, search_providers
 
 
 if t.TYPE_CHECKING:
     from .artifact import Artifact, Artifacts
 
+logger_log = logging.getLogger("xleapp.logfile")
+
+MANIFEST_FILE = "manifest.json"
+
 
 class Plugin(abc.ABC):
+    """Base class for xLEAPP plugins
+
+    Artifacts are registered from the plugin's manifest when it is up to date. The
+    artifact modules are then only imported once an artifact is selected for
+    processing. Without a usable manifest every module in :attr:`folder` is imported
+    and a new manifest is written.
+    """
+
     _plugins: list[Artifact]
 
     def __init__(self) -> None:
         self._plugins: list = []
 
-        for it in self.folder.glob("*.py"):
-            if it.suffix == ".py" and it.stem not in ["__init__"]:
-                module_name = f'{".".join(self.folder.parts[-3:])}.{it.stem}'
-                importlib.import_module(module_name)
+        if not self.register_from_manifest():
+            self.import_modules()
+            with contextlib.suppress(OSError):
+                self.write_manifest()
+
+    @property
+    def manifest_file(self) -> pathlib.Path:
+        return self.folder / MANIFEST_FILE
+
+    def modules(self) -> dict[str, pathlib.Path]:
+        """Returns the artifact modules of this plugin
+
+        Returns:
+            dict: module names mapped to their source file
+        """
+        return {
+            f'{".".join(self.folder.parts[-3:])}.{it.stem}': it
+            for it in sorted(self.folder.glob("*.py"))
+            if it.stem not in ["__init__"]
+        }
+
+    def import_modules(self) -> None:
+        """Imports every artifact module of this plugin"""
+        for module_name in self.modules():
+            importlib.import_module(module_name)
+
+    def _module_stamps(self) -> dict[str, list[int]]:
+        stamps = {}
+        for module_name, source in self.modules().items():
+            stat = source.stat()
+            stamps[module_name] = [stat.st_size, stat.st_mtime_ns]
+        return stamps
+
+    def write_manifest(self) -> pathlib.Path:
+        """Writes the manifest listing every artifact of this plugin
+
+        Every artifact module is imported to create the manifest.
+
+        Returns:
+            Path: location of the manifest
+        """
+        from xleapp import app
+
+        self.import_modules()
+        modules = self.modules()
+        entries = [
+            LazyArtifact.manifest_entry(artifact) for artifact in app.__ARTIFACT_PLUGINS__
+        ]
+        manifest = {
+            "version": __version__,
+            "modules": self._module_stamps(),
+            "artifacts": sorted(
+                (entry for entry in entries if entry["module"] in modules),
+                key=lambda entry: entry["cls_name"],
+            ),
+        }
+        self.manifest_file.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        logger_log.debug(f"Plugin manifest saved to {self.manifest_file}")
+        return self.manifest_file
+
+    def register_from_manifest(self) -> bool:
+        """Registers placeholders for every artifact listed in the manifest
+
+        Returns:
+            bool: False if the manifest is missing or out of date
+        """
+        from xleapp import app
+
+        try:
+            manifest = json.loads(self.manifest_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+
+        if (
+            manifest.get("version") != __version__
+            or manifest.get("modules") != self._module_stamps()
+        ):
+            return False
+
+        registered = {artifact.name for artifact in app.__ARTIFACT_PLUGINS__}
+        for entry in manifest["artifacts"]:
+            if entry["name"] not in registered:
+                app.__ARTIFACT_PLUGINS__[entry["name"]] = LazyArtifact.from_manifest(
+                    entry
+                )
+        return True
 
     @property
     def plugins(self) -> list[Artifact]:
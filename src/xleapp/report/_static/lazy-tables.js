@@ -0,0 +1,58 @@
+// Loads the rows of "table.lazy" tables from their data files in _TableData.
+// Data files are loaded one after another and call xleapp.addRows(). DataTables
+// only creates the cells of the rows being displayed (deferRender).
+var xleapp = xleapp || {};
+
+(function() {
+  var tables = {};
+
+  xleapp.addRows = function(tableId, rows) {
+    var table = tables[tableId];
+    if (table) {
+      table.api.rows.add(rows);
+      table.loaded += rows.length;
+      // Sorting and searching every chunk again would slow down large tables
+      if (table.loaded === rows.length || table.loaded >= table.rows) {
+        table.api.draw(false);
+      }
+    }
+  };
+
+  function loadChunks(tableId, chunks) {
+    var next = 0;
+    function load() {
+      if (next >= chunks.length) {
+        return;
+      }
+      var script = document.createElement("script");
+      script.src = chunks[next++];
+      script.onload = function() {
+        script.remove();
+        load();
+      };
+      script.onerror = function() {
+        script.remove();
+        $("#" + tableId).before(
+          '<p class="note note-danger">Could not load ' + script.src + "</p>"
+        );
+      };
+      document.body.appendChild(script);
+    }
+    load();
+  }
+
+  xleapp.loadTables = function() {
+    $("table.lazy").each(function() {
+      var element = $(this);
+      tables[this.id] = {
+        api: element.DataTable({
+          deferRender: true,
+          aLengthMenu: [[15, 50, 100, -1], [15, 50, 100, "All"]],
+        }),
+        rows: element.data("rows"),
+        loaded: 0,
+      };
+      loadChunks(this.id, element.data("chunks"));
+    });
+  };
+})();
@@ -3,18 +3,54 @@
 from __future__ import annotations
 
 import abc
-import codecs
+import bz2
+import calendar
+import concurrent.futures
 import contextlib
 import csv
+import datetime
+import functools
+import gzip
+import io
+import json
+import lzma
+import logging
 import pathlib
+import queue
+import re
 import sqlite3
+import threading
 import typing as t
 
 from dataclasses import dataclass
 
-import simplekml
+from xleapp.helpers import descriptors, tracing, utils
+from xleapp.helpers.db import quote_identifier
 
-from xleapp.helpers import descriptors, utils
+from .kml import KmlWriter
+from .store import COLUMN_TYPES, column_names, infer_kinds
+from .timeline import write_timeline
+
+
+if t.TYPE_CHECKING:
+    from xleapp.artifact.abstract import Artifact
+
+
+logger_log = logging.getLogger("xleapp.logfile")
+
+
+TSV_BUFFER_SIZE = 1024**2
+# Batches of rows waiting for the export writer before producers block
+DEFAULT_EXPORT_QUEUE_SIZE = 32
+# Batches saved in one transaction by the export writer
+EXPORT_GROUP_SIZE = 16
+# Suffix and default level of each TSV compression
+TSV_COMPRESSION: dict[str | None, tuple[str, int | None]] = {
+    None: (".tsv", None),
+    "gzip": (".tsv.gz", 6),
+    "bz2": (".tsv.bz2", 9),
+    "xz": (".tsv.xz", 6),
+}
 
 
 class DatabaseError(Exception):
@@ -22,6 +58,41 @@ def __init__(self, message: str) -> None:
         self.message = message
 
 
+@functools.lru_cache(maxsize=65_536)
+def _parse_time(value: str) -> int | None:
+    try:
+        parsed = datetime.datetime.fromisoformat(value.strip())
+    except ValueError:
+        return None
+    return to_timestamp(parsed)
+
+
+def to_timestamp(value: t.Any) -> int | None:
+    """Converts the time of a timeline event to seconds since 1970-01-01 UTC
+
+    Args:
+        value: ISO 8601 string (for example "2022-01-31 13:45:10"), datetime or
+            number of seconds. Times without a timezone are in UTC.
+
+    Returns:
+        int: seconds since 1970-01-01 UTC or `None` if the value is not a time
+    """
+    if isinstance(value, str):
+        return _parse_time(value)
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is None:
+            return calendar.timegm(value.timetuple())
+        return int(value.timestamp())
+    if isinstance(value, datetime.date):
+        return calendar.timegm(value.timetuple())
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        try:
+            return int(value)
+        except (ValueError, OverflowError):
+            return None
+    return None
+
+
 class Options:
     def __set_name__(self, owner, name) -> None:
         self.name = str(name)
@@ -50,8 +121,61 @@ def validator(self, value) -> pathlib.Path | None:
             return pathlib.Path(f"\\\\?\\{value.resolve()}")
 
 
+@contextlib.contextmanager
+def transaction(db: sqlite3.Connection) -> t.Iterator[sqlite3.Connection]:
+    """Runs statements in one transaction
+
+    Transactions do not nest. Inside an open transaction the statements join it and
+    the outer transaction commits them.
+
+    Args:
+        db: connection opened with `isolation_level=None`
+
+    Yields:
+        sqlite3.Connection: the connection
+    """
+    if db.in_transaction:
+        yield db
+        return
+    db.execute("BEGIN")
+    try:
+        yield db
+    except BaseException:
+        db.execute("ROLLBACK")
+        raise
+    db.execute("COMMIT")
+
+
+@contextlib.contextmanager
+def savepoint(db: sqlite3.Connection, name: str = "export_job") -> t.Iterator[None]:
+    """Runs statements in a savepoint of the current transaction
+
+    If the block raises, only the statements of the block are rolled back.
+
+    Args:
+        db: connection opened with `isolation_level=None`
+        name: name of the savepoint. Defaults to "export_job".
+    """
+    db.execute(f"SAVEPOINT {name}")
+    try:
+        yield
+    except BaseException:
+        db.execute(f"ROLLBACK TO {name}")
+        db.execute(f"RELEASE {name}")
+        raise
+    db.execute(f"RELEASE {name}")
+
+
+def _describe(func: t.Callable[..., t.Any], args: tuple, kwargs: dict) -> str:
+    """Names an export job after its function and artifact for the log"""
+    labels = [repr(arg) for arg in args if isinstance(arg, str)]
+    if isinstance(kwargs.get("name"), str):
+        labels.append(f"name={repr(kwargs['name'])}")
+    return f"{getattr(func, '__qualname__', repr(func))}({', '.join(labels)})"
+
+
 class DBManager(contextlib.AbstractContextManager):
-    connection: t.Union[sqlite3.Connection, codecs.StreamReaderWriter]
+    connection: t.Union[sqlite3.Connection, t.TextIO]
     db_file: DBFile = DBFile()
     db_folder: pathlib.Path = None
 
@@ -94,135 +218,1088 @@ def create(self) -> None:
 
 
 class KmlDBManager(DBManager):
-    def __init__(self, report_folder: pathlib.Path) -> None:
+    """Saves the points of KML artifacts to `_KML_Exports`
+
+    Points are inserted in batches into `_latlong.db` with one transaction per call
+    to :meth:`insert` or per :meth:`batch` block. :meth:`write_kml` streams the
+    points of an artifact from the database to its KML (or KMZ) file, so exports use
+    the same memory for any number of points.
+
+    Args:
+        report_folder: folder of the report
+        kmz: write compressed KMZ files instead of KML files. Defaults to False.
+    """
+
+    _latlong: t.Optional[sqlite3.Connection] = None
+
+    def __init__(self, report_folder: pathlib.Path, kmz: bool = False) -> None:
         db_folder = "_KML_Exports"
         super().__init__(db_folder=report_folder / db_folder)
         self.db_file = report_folder / db_folder / "_latlong.db"
+        self.kmz = kmz
 
     def create(self) -> None:
-        if not self.db_file.exists():
-            db = sqlite3.connect(self.db_file, isolation_level="exclusive")
-            cursor = db.cursor()
-            cursor.execute(
-                """
-                CREATE TABLE data(key TEXT, latitude TEXT, longitude TEXT, activity TEXT)
-                """,
+        self._open().execute(
+            """
+            CREATE TABLE IF NOT EXISTS data(
+                key TEXT, latitude TEXT, longitude TEXT, activity TEXT
             )
-            db.commit()
+            """,
+        )
+
+    def _open(self) -> sqlite3.Connection:
+        if self._latlong is None:
+            self._latlong = sqlite3.connect(
+                self.db_file, isolation_level=None, check_same_thread=False
+            )
+            self._latlong.execute("PRAGMA journal_mode = WAL")
+            self._latlong.execute("PRAGMA synchronous = OFF")
+        return self._latlong
 
     def save(self, data_headers, data_list, name) -> None:
-        kml = simplekml.Kml(open=1)
-
-        with self as db:
-            db.connection.execute("""PRAGMA synchronous = EXTRA""")
-            db.connection.execute("""PRAGMA journal_mode = WAL""")
-            db.connection.commit()
-
-            for row in data_list:
-                modified_dict = dict(zip(data_headers, row, strict=True))
-                times = modified_dict["Timestamp"]
-                lon = modified_dict["Longitude"]
-                lat = modified_dict["Latitude"]
-
-                if lat:
-                    pnt = kml.newpoint()
-                    pnt.name = times
-                    pnt.description = f"Timestamp: {times} - {name}"
-                    pnt.coords = [(lon, lat)]
-
-                    db.connection.execute(
-                        "INSERT INTO data VALUES(?,?,?,?)",
-                        (times, lat, lon, name),
-                    )
+        self.insert(data_headers=data_headers, data_list=data_list, name=name)
+        self.write_kml(name)
 
-            kml.save(db.db_folder / f"{name}.kml")
+    @staticmethod
+    def points(
+        data_headers: t.Sequence[str],
+        data_list: t.Iterable[t.Sequence[t.Any]],
+        name: str,
+    ) -> t.Iterator[tuple[t.Any, ...]]:
+        """Picks the points from the rows of an artifact
+
+        Args:
+            data_headers: list of columns headers
+            data_list: rows of the artifact
+            name: name of the artifact
+
+        Raises:
+            KeyError: if a "Timestamp", "Latitude" or "Longitude" column is missing
+
+        Yields:
+            tuple: timestamp, latitude, longitude and artifact of each row with a
+            latitude
+        """
+        try:
+            columns = [
+                list(data_headers).index(header)
+                for header in ("Timestamp", "Latitude", "Longitude")
+            ]
+        except ValueError as err:
+            raise KeyError(
+                f"{name} needs 'Timestamp', 'Latitude' and 'Longitude' columns for "
+                "the KML export!"
+            ) from err
+
+        timestamp, latitude, longitude = columns
+        for row in data_list:
+            if row[latitude]:
+                yield row[timestamp], row[latitude], row[longitude], name
+
+    def insert(self, data_headers, data_list, name) -> None:
+        """Saves the points of the rows to the lat/long database
+
+        Args:
+            data_headers: list of columns headers
+            data_list: list of data to save to file
+            name: name of the artifact
+        """
+        with transaction(self._open()) as db:
+            db.executemany(
+                "INSERT INTO data VALUES(?,?,?,?)",
+                self.points(data_headers, data_list, name),
+            )
+
+    def batch(self) -> t.ContextManager[sqlite3.Connection]:
+        """Groups the points saved inside the block in one transaction"""
+        return transaction(self._open())
+
+    def write_kml(self, name) -> pathlib.Path:
+        """Writes the KML file of an artifact from the lat/long database
+
+        Args:
+            name: name of the artifact
+
+        Returns:
+            Path: the KML or KMZ file
+        """
+        kml_file = self.db_folder / f"{name}.{'kmz' if self.kmz else 'kml'}"
+        cursor = self._open().execute(
+            "SELECT key, latitude, longitude FROM data WHERE activity = ?",
+            (name,),
+        )
+        with KmlWriter(kml_file) as kml:
+            kml.add_points(
+                (times, lat, lon, f"Timestamp: {times} - {name}")
+                for times, lat, lon in cursor
+            )
+        return kml_file
+
+    def finalize(self) -> None:
+        """Writes the lat/long database file to disk"""
+        if self._latlong is None:
+            return
+        db, self._latlong = self._latlong, None
+        db.execute("PRAGMA synchronous = FULL")
+        db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        db.execute("PRAGMA journal_mode = DELETE")
+        db.close()
 
 
 class TimelineDBManager(DBManager):
-    def __init__(self, report_folder: pathlib.Path) -> None:
+    """Saves the rows of timeline artifacts to `_Timeline/t1.db`
+
+    Each row is one event in the `events` table:
+
+    * timestamp: first column of the row as seconds since 1970-01-01 UTC
+    * time: first column of the row as text
+    * artifact: name of the artifact
+    * fields: JSON array of the row
+
+    The column headers of each artifact are saved once in the `artifacts` table. The
+    `timeline` view returns the fields of each event as a JSON object keyed by
+    header, and the `data` view keeps queries written for the earlier
+    `data(key, activity, datalist)` table working.
+
+    Rows are inserted in batches with one transaction per call to :meth:`save` (or
+    per :meth:`batch` block) and without waiting for the disk. :meth:`finalize`
+    creates the indexes and writes the database file once every artifact is saved.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS artifacts(name TEXT PRIMARY KEY, headers TEXT);
+        CREATE TABLE IF NOT EXISTS events(
+            id INTEGER PRIMARY KEY,
+            timestamp INTEGER,
+            time TEXT,
+            artifact TEXT NOT NULL,
+            fields TEXT
+        );
+        CREATE VIEW IF NOT EXISTS timeline(id, timestamp, time, artifact, fields) AS
+        SELECT
+            events.id,
+            events.timestamp,
+            events.time,
+            events.artifact,
+            (
+                SELECT json_group_object(
+                    headers.value,
+                    json_extract(events.fields, '$[' || headers.key || ']')
+                )
+                FROM json_each(artifacts.headers) AS headers
+            )
+        FROM events JOIN artifacts ON artifacts.name = events.artifact;
+        DROP INDEX IF EXISTS events_timestamp;
+        DROP INDEX IF EXISTS events_artifact;
+    """
+    INDEXES = """
+        CREATE INDEX IF NOT EXISTS events_timestamp ON events(timestamp);
+        CREATE INDEX IF NOT EXISTS events_artifact ON events(artifact, timestamp);
+    """
+    LEGACY_VIEW = """
+        CREATE VIEW IF NOT EXISTS data(key, activity, datalist) AS
+        SELECT time, upper(artifact), fields FROM timeline
+    """
+
+    _timeline: t.Optional[sqlite3.Connection] = None
+
+    def __init__(
+        self, report_folder: pathlib.Path, sorted_format: str | None = None
+    ) -> None:
         db_folder = "_Timeline"
 
         super().__init__(db_folder=report_folder / db_folder)
         self.db_file = report_folder / db_folder / "t1.db"
+        self.sorted_format = sorted_format
         self.create()
 
     def create(self) -> None:
-        if not self.db_file.exists():
-            db = sqlite3.connect(self.db_file, isolation_level="exclusive")
-            cursor = db.cursor()
-            cursor.execute(
-                """
-                CREATE TABLE data(key TEXT, activity TEXT, datalist TEXT)
-                """,
+        db = self._open()
+        db.executescript(self.SCHEMA)
+        # Timelines created before the `events` table keep their `data` table
+        if not db.execute("SELECT 1 FROM sqlite_master WHERE name = 'data'").fetchone():
+            db.execute(self.LEGACY_VIEW)
+
+    def _open(self) -> sqlite3.Connection:
+        if self._timeline is None:
+            self._timeline = sqlite3.connect(
+                self.db_file, isolation_level=None, check_same_thread=False
+            )
+            self._timeline.execute("PRAGMA journal_mode = WAL")
+            self._timeline.execute("PRAGMA synchronous = OFF")
+        return self._timeline
+
+    def rows(
+        self,
+        data_headers: t.Sequence[str],
+        data_list: t.Iterable[t.Sequence[t.Any]],
+        name: str,
+    ) -> t.Iterator[tuple[t.Any, ...]]:
+        """Converts rows of an artifact to events
+
+        Args:
+            data_headers: list of columns headers
+            data_list: rows of the artifact
+            name: name of the artifact
+
+        Yields:
+            tuple: timestamp, time, artifact and fields of each event
+        """
+        encode = json.JSONEncoder(
+            ensure_ascii=False, check_circular=False, separators=(",", ":"), default=str
+        ).encode
+        for row in data_list:
+            if not row:
+                continue
+            if not isinstance(row, (list, tuple)):
+                row = tuple(row)
+            time = row[0]
+            yield (
+                to_timestamp(time),
+                None if time is None else str(time),
+                name,
+                encode(row),
             )
-            db.commit()
 
     def save(self, data_headers, data_list, name) -> None:
-        with self as db:
-            db.connection.execute("""PRAGMA synchronous = EXTRA""")
-            db.connection.execute("""PRAGMA journal_mode = WAL""")
+        with transaction(self._open()) as db:
+            db.execute(
+                "INSERT OR REPLACE INTO artifacts VALUES(?, ?)",
+                (name, json.dumps(list(data_headers), ensure_ascii=False)),
+            )
+            db.executemany(
+                "INSERT INTO events(timestamp, time, artifact, fields) VALUES(?,?,?,?)",
+                self.rows(data_headers, data_list, name),
+            )
 
-            for row in data_list:
-                modified_list = list(
-                    map(lambda x, y: x.upper() + ": " + str(y), data_headers, row),
-                )
-                db.connection.executemany(
-                    "INSERT INTO data VALUES(?,?,?)",
-                    [(str(row[0]), name.upper(), str(modified_list))],
-                )
+    def batch(self) -> t.ContextManager[sqlite3.Connection]:
+        """Groups the events saved inside the block in one transaction"""
+        return transaction(self._open())
 
+    def finalize(self) -> None:
+        """Creates the indexes and writes the database file to disk
+
+        Saving again afterwards reopens the database.
+        """
+        if self._timeline is None:
+            return
+        db, self._timeline = self._timeline, None
+        db.executescript(self.INDEXES)
+        db.execute("PRAGMA optimize")
+        if self.sorted_format:
+            path = write_timeline(db, self.db_folder, self.sorted_format)
+            logger_log.info(f"-> Sorted timeline saved to {path}")
+        db.execute("PRAGMA synchronous = FULL")
+        db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        db.execute("PRAGMA journal_mode = DELETE")
+        db.close()
+
+
+class CaseDBManager(DBManager):
+    """Saves the tables of every artifact to `_Case/case.db`
+
+    Each table gets its own SQLite table named after the artifact (with `_<n>`
+    added for artifacts with more than one table). Columns are named after the
+    report headers and typed from their values. Values which are not numbers,
+    strings or bytes are saved as text. Columns whose header contains "time" or
+    "date" are indexed once the table is loaded.
+
+    The `_artifacts` table describes each table: artifact class, name, category,
+    headers, columns, row count, processing time and source files.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS _artifacts(
+            table_name TEXT PRIMARY KEY,
+            artifact TEXT,
+            name TEXT,
+            category TEXT,
+            headers TEXT,
+            columns TEXT,
+            row_count INTEGER,
+            process_time REAL,
+            sources TEXT
+        );
+    """
+    # Values of other types are saved as text
+    PLAIN_TYPES = frozenset({int, float, str, bytes, type(None)})
+    TIME_COLUMN = re.compile("time|date", re.IGNORECASE)
+
+    _case: t.Optional[sqlite3.Connection] = None
 
-class TsvManager(DBManager):
     def __init__(self, report_folder: pathlib.Path) -> None:
+        db_folder = "_Case"
+
+        super().__init__(db_folder=report_folder / db_folder)
+        self.db_file = report_folder / db_folder / "case.db"
+        self._tables: dict[str, tuple[list[str], list[str]]] = {}
+
+    def create(self) -> None:
+        self._open().executescript(self.SCHEMA)
+
+    def _open(self) -> sqlite3.Connection:
+        if self._case is None:
+            self._case = sqlite3.connect(
+                self.db_file, isolation_level=None, check_same_thread=False
+            )
+            self._case.execute("PRAGMA journal_mode = WAL")
+            self._case.execute("PRAGMA synchronous = OFF")
+        return self._case
+
+    def batch(self) -> t.ContextManager[sqlite3.Connection]:
+        """Groups the tables saved inside the block in one transaction"""
+        return transaction(self._open())
+
+    def create_table(
+        self,
+        table: str,
+        data_headers: t.Sequence[str],
+        kinds: t.Sequence[str],
+    ) -> list[str]:
+        """Creates (or replaces) the table of an artifact
+
+        Args:
+            table: name of the table
+            data_headers: list of columns headers
+            kinds: kind of each column. See :data:`xleapp.report.store.COLUMN_TYPES`.
+
+        Returns:
+            list[str]: column names of the table
+        """
+        columns = column_names(data_headers)
+        # Pickled objects of the case store are saved as text here
+        kinds = ["text" if kind == "object" else kind for kind in kinds]
+        definitions = ", ".join(
+            f"{quote_identifier(name)} {COLUMN_TYPES[kind]}".rstrip()
+            for name, kind in zip(columns, kinds)
+        )
+        with transaction(self._open()) as db:
+            db.execute(f"DROP TABLE IF EXISTS {quote_identifier(table)}")
+            db.execute(f"CREATE TABLE {quote_identifier(table)}({definitions})")
+            db.execute(
+                "INSERT OR REPLACE INTO _artifacts(table_name, headers, columns) "
+                "VALUES(?, ?, ?)",
+                (table, json.dumps(list(data_headers)), json.dumps(columns)),
+            )
+        self._tables[table] = (columns, kinds)
+        return columns
+
+    def insert(self, table: str, data_list: t.Iterable[t.Sequence[t.Any]]) -> None:
+        """Appends rows to the table of an artifact
+
+        Rows with fewer values than the table has columns are padded with NULL and
+        extra values are dropped, like the TSV export keeps them.
+
+        Args:
+            table: name of the table created by :meth:`create_table`
+            data_list: rows to append
+        """
+        columns, _ = self._tables[table]
+        plain = self.PLAIN_TYPES
+        width = len(columns)
+
+        def encode(row: t.Sequence[t.Any]) -> t.Sequence[t.Any]:
+            if len(row) != width:
+                row = (*row[:width], *(None,) * (width - len(row)))
+            for value in row:
+                if type(value) not in plain:
+                    return [v if type(v) in plain else str(v) for v in row]
+            return row
+
+        statement = "INSERT INTO {} VALUES({})".format(
+            quote_identifier(table), ", ".join("?" * len(columns))
+        )
+        with transaction(self._open()) as db:
+            db.executemany(statement, map(encode, data_list))
+
+    def index(self, table: str) -> None:
+        """Indexes the time and date columns of a loaded table
+
+        Args:
+            table: name of the table created by :meth:`create_table`
+        """
+        columns, _ = self._tables[table]
+        with transaction(self._open()) as db:
+            for num, column in enumerate(columns):
+                if self.TIME_COLUMN.search(column):
+                    db.execute(
+                        "CREATE INDEX IF NOT EXISTS {} ON {}({})".format(
+                            quote_identifier(f"{table}_{num}_idx"),
+                            quote_identifier(table),
+                            quote_identifier(column),
+                        )
+                    )
+
+    def describe(
+        self,
+        table: str,
+        artifact: str = "",
+        name: str = "",
+        category: str = "",
+        process_time: float | None = None,
+        sources: t.Iterable[str] = (),
+    ) -> None:
+        """Saves the description of a loaded table to `_artifacts`
+
+        Args:
+            table: name of the table
+            artifact: class name of the artifact
+            name: name of the artifact
+            category: category of the artifact
+            process_time: seconds spent processing the artifact
+            sources: files the artifact parsed
+        """
+        with transaction(self._open()) as db:
+            db.execute(
+                "UPDATE _artifacts SET artifact = ?, name = ?, category = ?, "
+                "process_time = ?, sources = ?, row_count = (SELECT COUNT(*) FROM {}) "
+                "WHERE table_name = ?".format(quote_identifier(table)),
+                (
+                    artifact,
+                    name,
+                    category,
+                    process_time,
+                    json.dumps(list(sources)),
+                    table,
+                ),
+            )
+
+    def save_table(
+        self,
+        table: str,
+        data_headers: t.Sequence[str],
+        data_list: t.Iterable[t.Sequence[t.Any]],
+        **metadata: t.Any,
+    ) -> None:
+        """Loads a table of an artifact
+
+        Args:
+            table: name of the table
+            data_headers: list of columns headers
+            data_list: rows of the table
+            **metadata: description of the table. See :meth:`describe`.
+        """
+        kinds = getattr(data_list, "kinds", None)
+        if kinds is None:
+            kinds = infer_kinds(data_list, len(data_headers))
+        with transaction(self._open()):
+            self.create_table(table, data_headers, kinds)
+            batches = getattr(data_list, "batches", None)
+            if batches is None:
+                self.insert(table, data_list)
+            else:
+                for batch in batches():
+                    self.insert(table, batch)
+            self.index(table)
+            self.describe(table, **metadata)
+
+    def save(self, name, data_list, data_headers) -> None:
+        self.save_table(name, data_headers, data_list, name=name)
+
+    def finalize(self) -> None:
+        """Writes the case database file to disk"""
+        if self._case is None:
+            return
+        db, self._case = self._case, None
+        db.execute("PRAGMA optimize")
+        db.execute("PRAGMA synchronous = FULL")
+        db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        db.execute("PRAGMA journal_mode = DELETE")
+        db.close()
+
+
+class TsvManager(DBManager):
+    """Writes the TSV exports of the artifacts
+
+    Files are written on a pool of threads so the export of an artifact overlaps
+    with the report of the next one. Call :meth:`finalize` to wait for them.
+
+    Args:
+        report_folder: folder of the report
+        compression: "gzip", "bz2", "xz" or `None` to write plain TSV files.
+            Defaults to None.
+        compresslevel: compression level. Defaults to the level of the format.
+        versioned: keep files of earlier runs and write to "<name> (2).tsv" instead
+            of overwriting them. Defaults to False.
+        max_workers: number of files written at the same time. Defaults to 4.
+
+    Attributes:
+        failed: names of the artifacts whose file could not be written
+    """
+
+    def __init__(
+        self,
+        report_folder: pathlib.Path,
+        compression: str | None = None,
+        compresslevel: int | None = None,
+        versioned: bool = False,
+        max_workers: int = 4,
+    ) -> None:
         db_folder: str = "_TSV Exports"
 
         super().__init__(db_folder=report_folder / db_folder)
 
-    def __call__(self, name: str):
-        self.db_file = self.db_folder / f"{name}.tsv"
-        return self
+        if compression not in TSV_COMPRESSION:
+            raise ValueError(
+                f"Compression must be one of {tuple(TSV_COMPRESSION)}, "
+                f"not {repr(compression)}!"
+            )
+        self.compression = compression
+        self.compresslevel = compresslevel
+        self.versioned = versioned
+        self.max_workers = max_workers
+        self._claimed: set[pathlib.Path] = set()
+        self._lock = threading.Lock()
+        self._pool: concurrent.futures.ThreadPoolExecutor | None = None
+        self._pending: dict[pathlib.Path, tuple[str, concurrent.futures.Future]] = {}
+        self.failed: set[str] = set()
 
     def create(self) -> None:
         pass
 
-    def __enter__(self) -> codecs.StreamReaderWriter:
-        self.connection = codecs.open(self.db_file, "a", "utf-8-sig")
-        return self.connection
+    @property
+    def suffix(self) -> str:
+        return TSV_COMPRESSION[self.compression][0]
 
-    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
-        self.connection.close()
+    def path(self, name: str) -> pathlib.Path:
+        """Returns the file for the TSV export of an artifact
+
+        Files written earlier in the run are never reused. Files of earlier runs are
+        overwritten unless the manager is versioned.
 
-    def save(self, name, data_headers, data_list) -> None:
-        with self as file:
+        Args:
+            name: name of the artifact
+
+        Returns:
+            pathlib.Path: file to write
+        """
+        with self._lock:
+            version = 1
+            while True:
+                stem = name if version == 1 else f"{name} ({version})"
+                path = self.db_folder / f"{stem}{self.suffix}"
+                if path not in self._claimed and not (
+                    self.versioned and path.exists()
+                ):
+                    self._claimed.add(path)
+                    return path
+                version += 1
+
+    def open(self, name: str) -> t.TextIO:
+        """Opens a new TSV file for an artifact
+
+        Args:
+            name: name of the artifact
+
+        Returns:
+            t.TextIO: the opened file
+        """
+        return self._open(self.path(name))
+
+    def _open(self, path: pathlib.Path) -> t.TextIO:
+        if self.compression is None:
+            return open(
+                path, "w", encoding="utf-8-sig", newline="", buffering=TSV_BUFFER_SIZE
+            )
+
+        level = self.compresslevel
+        if level is None:
+            level = TSV_COMPRESSION[self.compression][1]
+        if self.compression == "gzip":
+            file = gzip.open(path, "wb", compresslevel=level)
+        elif self.compression == "bz2":
+            file = bz2.open(path, "wb", compresslevel=level)
+        else:
+            file = lzma.open(path, "wb", preset=level)
+        return io.TextIOWrapper(
+            io.BufferedWriter(file, TSV_BUFFER_SIZE), encoding="utf-8-sig", newline=""
+        )
+
+    def write(
+        self,
+        file: t.TextIO,
+        data_headers: t.Sequence[str],
+        data_list: t.Iterable[t.Sequence[t.Any]],
+    ) -> None:
+        with file:
             tsv_writer = csv.writer(file, delimiter="\t")
             tsv_writer.writerow(data_headers)
-            for i in data_list:
-                tsv_writer.writerow(i)
+            batches = getattr(data_list, "batches", None)
+            if batches is None:
+                tsv_writer.writerows(data_list)
+            else:
+                for batch in batches():
+                    tsv_writer.writerows(batch)
+
+    def save(self, name, data_headers, data_list) -> concurrent.futures.Future:
+        """Writes the TSV export of an artifact in the background
+
+        Args:
+            name (str): name of the artifact
+            data_headers: list of columns headers
+            data_list: rows to write. Must not change until the file is written.
+
+        Returns:
+            concurrent.futures.Future: future finished once the file is written
+        """
+        path = self.path(name)
+        file = self._open(path)
+        if self._pool is None:
+            self._pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="tsv"
+            )
+        future = self._pool.submit(self.write, file, data_headers, data_list)
+        self._pending[path] = (name, future)
+        return future
+
+    def finalize(self) -> None:
+        """Waits for the files being written
+
+        Artifacts whose file could not be written are added to :attr:`failed`.
+
+        Raises:
+            Exception: the first error raised while writing a file
+        """
+        pending, self._pending = self._pending, {}
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        errors = []
+        for name, future in pending.values():
+            if future.exception() is not None:
+                self.failed.add(name)
+                errors.append(future.exception())
+        if errors:
+            raise errors[0]
+
+
+class ExportStream(contextlib.AbstractContextManager):
+    """Writes batches of rows of one artifact to the exports as they arrive
+
+    Args:
+        service: database service holding the exports
+        name: name of the artifact
+        data_headers: list of columns headers
+        kml: export rows to KML
+        timeline: export rows to the timeline
+    """
+
+    def __init__(
+        self,
+        service: DBService,
+        name: str,
+        data_headers: t.Sequence[str],
+        kml: bool = False,
+        timeline: bool = False,
+    ) -> None:
+        self.service = service
+        self.name = name
+        self.data_headers = data_headers
+        self.kml = kml
+        self.timeline = timeline
+        self._tsv_file = service._databases["tsv"].open(name)
+        self._tsv_writer = csv.writer(self._tsv_file, delimiter="\t")
+        self._tsv_writer.writerow(data_headers)
+        self._case: CaseDBManager | None = service._databases.get("case")
+        self._case_created = False
+
+    def __repr__(self) -> str:
+        return (
+            f"<ExportStream name={repr(self.name)}, kml={repr(self.kml)}, "
+            f"timeline={repr(self.timeline)}>"
+        )
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def write(self, data_list: t.Sequence[t.Sequence[t.Any]]) -> None:
+        """Writes a batch of rows
+
+        Args:
+            data_list: rows to write
+        """
+        self._tsv_writer.writerows(data_list)
+
+        if self.kml:
+            self.service.submit_for(
+                self.name,
+                self.service._databases["kml"].insert,
+                data_headers=self.data_headers,
+                data_list=data_list,
+                name=self.name,
+            )
+
+        if self.timeline:
+            self.service.save(
+                db_type="timeline",
+                name=self.name,
+                data_list=data_list,
+                data_headers=self.data_headers,
+            )
+
+        if self._case is not None:
+            if not self._case_created:
+                # Later batches keep the column types of the first one
+                kinds = infer_kinds(data_list, len(self.data_headers))
+                self.service.submit_for(
+                    self.name,
+                    self._case.create_table,
+                    self.name,
+                    self.data_headers,
+                    kinds,
+                )
+                self._case_created = True
+            self.service.submit_for(self.name, self._case.insert, self.name, data_list)
+
+    def close(self) -> None:
+        """Closes the TSV file and writes the KML file"""
+        if self._tsv_file.closed:
+            return
+
+        self._tsv_file.close()
+        if self.kml:
+            self.service.submit_for(
+                self.name, self.service._databases["kml"].write_kml, self.name
+            )
+        if self._case is not None and self._case_created:
+            self.service.submit_for(self.name, self._case.index, self.name)
+
+
+class ExportWriter:
+    """Runs export jobs in order on a background thread
+
+    Producers hand jobs to :meth:`submit` and carry on. Once `max_pending` jobs are
+    waiting, :meth:`submit` blocks until the writer catches up, which bounds the
+    rows held in memory. Jobs waiting together are run in one transaction of each
+    database in `batched` and each job in its own savepoint. A failed job is logged
+    and rolled back alone, the other jobs are kept and :meth:`flush` raises the
+    error.
+
+    Args:
+        batched: databases whose writes are grouped in one transaction
+        max_pending: number of jobs waiting before producers block. Defaults to 32.
+        group_size: number of jobs run in one transaction. Defaults to 16.
+
+    Attributes:
+        failed: names of the artifacts with a failed job, see :meth:`submit_for`
+    """
+
+    def __init__(
+        self,
+        batched: t.Iterable[KmlDBManager | TimelineDBManager | CaseDBManager] = (),
+        max_pending: int = DEFAULT_EXPORT_QUEUE_SIZE,
+        group_size: int = EXPORT_GROUP_SIZE,
+    ) -> None:
+        self.batched = list(batched)
+        self.group_size = group_size
+        self.errors: list[BaseException] = []
+        self.failed: set[str] = set()
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return (
+            f"<ExportWriter pending={self._queue.qsize()}, "
+            f"running={self._thread is not None}>"
+        )
+
+    def submit(self, func: t.Callable[..., t.Any], *args, **kwargs) -> None:
+        """Queues a job
+
+        Args:
+            func: function to run on the writer thread
+            *args: positional arguments of the function
+            **kwargs: keyword arguments of the function
+        """
+        self.submit_for(None, func, *args, **kwargs)
+
+    def submit_for(
+        self, artifact: str | None, func: t.Callable[..., t.Any], /, *args, **kwargs
+    ) -> None:
+        """Queues a job exporting an artifact
+
+        The artifact is added to :attr:`failed` if the job fails.
+
+        Args:
+            artifact: name of the artifact exported by the job
+            func: function to run on the writer thread
+            *args: positional arguments of the function
+            **kwargs: keyword arguments of the function
+        """
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="export-writer", daemon=True
+                )
+                self._thread.start()
+        self._queue.put((artifact, func, args, kwargs))
+
+    def _run(self) -> None:
+        while True:
+            group = [self._queue.get()]
+            while len(group) < self.group_size:
+                try:
+                    group.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = None in group
+            jobs = [job for job in group if job is not None]
+            try:
+                if jobs:
+                    with contextlib.ExitStack() as stack:
+                        connections = [
+                            stack.enter_context(db.batch()) for db in self.batched
+                        ]
+                        for job in jobs:
+                            self._run_job(connections, *job)
+            except BaseException as err:
+                # The transaction itself failed, the jobs of the group are lost
+                logger_log.exception("Export failed!")
+                self.errors.append(err)
+                self.failed.update(job[0] for job in jobs if job[0] is not None)
+            finally:
+                for _ in group:
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _run_job(
+        self,
+        connections: list[sqlite3.Connection],
+        artifact: str | None,
+        func: t.Callable[..., t.Any],
+        args: tuple,
+        kwargs: dict,
+    ) -> None:
+        try:
+            with contextlib.ExitStack() as stack:
+                for db in connections:
+                    stack.enter_context(savepoint(db))
+                func(*args, **kwargs)
+        except Exception as err:
+            logger_log.exception(f"Export {_describe(func, args, kwargs)} failed!")
+            self.errors.append(err)
+            if artifact is not None:
+                self.failed.add(artifact)
+
+    def flush(self) -> None:
+        """Waits for the queued jobs
+
+        Raises:
+            DatabaseError: if jobs failed since the last flush
+        """
+        if self._thread is not None:
+            self._queue.join()
+        if self.errors:
+            errors, self.errors = self.errors, []
+            raise DatabaseError(
+                f"{len(errors)} export(s) failed, first error: {errors[0]}"
+            ) from errors[0]
+
+    def close(self) -> None:
+        """Runs the queued jobs and stops the writer thread
+
+        Raises:
+            DatabaseError: if a job failed
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+        self.flush()
 
 
 @dataclass
 class DBService:
-    __slots__ = ["_report_folder", "_databases"]
+    """Saves the TSV, KML and timeline exports of the artifacts
 
-    def __init__(self, report_folder: pathlib.Path) -> None:
+    KML, timeline and case database rows are written by a background
+    :obj:`ExportWriter`, so :meth:`save` returns once the rows are queued.
+    :meth:`flush` waits for them.
+
+    Args:
+        report_folder: folder of the report
+        kmz: write compressed KMZ files. Defaults to False.
+        tsv_compression: compression of the TSV files. Defaults to None.
+        tsv_versioned: keep TSV files of earlier runs. Defaults to False.
+        case_db: save the tables of every artifact to one SQLite database.
+            Defaults to False.
+        sorted_timeline: format of the combined timeline in time order. Defaults
+            to None.
+        max_pending: number of batches queued before :meth:`save` blocks.
+            Defaults to 32.
+    """
+
+    __slots__ = ["_report_folder", "_databases", "_writer"]
+
+    def __init__(
+        self,
+        report_folder: pathlib.Path,
+        kmz: bool = False,
+        tsv_compression: str | None = None,
+        tsv_versioned: bool = False,
+        case_db: bool = False,
+        sorted_timeline: str | None = None,
+        max_pending: int = DEFAULT_EXPORT_QUEUE_SIZE,
+    ) -> None:
         self._report_folder = report_folder
         self._databases = {}
-        self._databases["kml"] = KmlDBManager(report_folder)
-        self._databases["timeline"] = TimelineDBManager(report_folder)
-        self._databases["tsv"] = TsvManager(report_folder)
+        self._databases["kml"] = KmlDBManager(report_folder, kmz=kmz)
+        self._databases["timeline"] = TimelineDBManager(
+            report_folder, sorted_format=sorted_timeline
+        )
+        self._databases["tsv"] = TsvManager(
+            report_folder, compression=tsv_compression, versioned=tsv_versioned
+        )
 
         self._databases["kml"].create()
         self._databases["timeline"].create()
         self._databases["tsv"].create()
+        if case_db:
+            self._databases["case"] = CaseDBManager(report_folder)
+            self._databases["case"].create()
+
+        self._writer = ExportWriter(
+            batched=[
+                db
+                for db_type, db in self._databases.items()
+                if db_type in ("kml", "timeline", "case")
+            ],
+            max_pending=max_pending,
+        )
+
+    def submit(self, func: t.Callable[..., t.Any], *args, **kwargs) -> None:
+        """Runs an export job on the writer thread after the jobs queued before it"""
+        self._writer.submit(func, *args, **kwargs)
+
+    def submit_for(
+        self, artifact: str, func: t.Callable[..., t.Any], /, *args, **kwargs
+    ) -> None:
+        """Runs an export job of an artifact, see :meth:`ExportWriter.submit_for`"""
+        self._writer.submit_for(artifact, func, *args, **kwargs)
+
+    @property
+    def failed(self) -> set[str]:
+        """Names of the artifacts with an export that failed"""
+        return self._writer.failed | self._databases["tsv"].failed
+
+    def flush(self) -> None:
+        """Waits for the queued KML and timeline rows
+
+        Raises:
+            DatabaseError: if an export failed
+        """
+        self._writer.flush()
+
+    def finalize(self) -> None:
+        """Finishes the exports once every artifact is saved"""
+        with tracing.span("export", db_type="finalize"):
+            try:
+                try:
+                    self._writer.close()
+                finally:
+                    self._databases["tsv"].finalize()
+            finally:
+                self._databases["kml"].finalize()
+                self._databases["timeline"].finalize()
+                if "case" in self._databases:
+                    self._databases["case"].finalize()
 
     def save(self, db_type: str, name: str, data_list: list[t.Any], data_headers):
-        try:
-            db = self._databases[db_type]
-            if db_type == "tsv":
-                db(name).save(name=name, data_list=data_list, data_headers=data_headers)
-            else:
-                db.save(name=name, data_list=data_list, data_headers=data_headers)
-        except KeyError as err:
-            raise DatabaseError(
-                f"Database type {repr(db_type)} does not exists!"
-            ) from err
+        """Saves the rows of an artifact to an export
+
+        TSV files are written by a pool of threads and KML and timeline rows by the
+        writer thread. The rows must not change until the export is finished.
+
+        Args:
+            db_type: "tsv", "kml" or "timeline"
+            name: name of the artifact
+            data_list: rows of the artifact
+            data_headers: list of columns headers
+
+        Raises:
+            DatabaseError: if the export type does not exist
+        """
+        if db_type not in self._databases:
+            raise DatabaseError(f"Database type {repr(db_type)} does not exists!")
+
+        if db_type == "tsv":
+            self._save(db_type, name, data_list, data_headers)
+        else:
+            self._writer.submit_for(
+                name, self._save, db_type, name, data_list, data_headers
+            )
+
+    def save_artifact(self, artifact: Artifact) -> None:
+        """Saves the tables of an artifact to the case database
+
+        Does nothing unless the case database is enabled. Rows of streamed artifacts
+        were saved while they were processed, so only their description is saved.
+
+        Args:
+            artifact: processed artifact
+        """
+        case: CaseDBManager | None = self._databases.get("case")
+        if case is None:
+            return
+
+        metadata = {
+            "artifact": artifact.cls_name,
+            "name": artifact.name,
+            "category": artifact.category,
+            "process_time": artifact.process_time,
+            "sources": sorted(
+                str(getattr(item, "path", item)) for item in artifact.found
+            ),
+        }
+        headers, data = artifact.report_headers, artifact.data
+        if artifact.streamed:
+            self._writer.submit_for(
+                artifact.name, case.describe, artifact.name, **metadata
+            )
+        elif isinstance(headers, list):
+            for num, (table_headers, table) in enumerate(zip(headers, data)):
+                self._writer.submit_for(
+                    artifact.name,
+                    case.save_table,
+                    f"{artifact.name}_{num}",
+                    table_headers,
+                    table,
+                    **metadata,
+                )
+        else:
+            self._writer.submit_for(
+                artifact.name, case.save_table, artifact.name, headers, data, **metadata
+            )
+
+    def _save(self, db_type: str, name: str, data_list, data_headers) -> None:
+        db = self._databases[db_type]
+        with tracing.span("export", db_type=db_type, artifact=name) as span:
+            db.save(name=name, data_list=data_list, data_headers=data_headers)
+            if isinstance(data_list, t.Sized):
+                span.set(rows=len(data_list))
+
+    def open_stream(
+        self,
+        name: str,
+        data_headers: t.Sequence[str],
+        kml: bool = False,
+        timeline: bool = False,
+    ) -> ExportStream:
+        """Opens the exports of an artifact to write batches of rows
+
+        Args:
+            name: name of the artifact
+            data_headers: list of columns headers
+            kml: export rows to KML. Defaults to False.
+            timeline: export rows to the timeline. Defaults to False.
+
+        Returns:
+            ExportStream: stream to write the rows to
+        """
+        return ExportStream(
+            self, name=name, data_headers=data_headers, kml=kml, timeline=timeline
+        )
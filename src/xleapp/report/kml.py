@@ -0,0 +1,119 @@
+"""Streaming KML and KMZ writer.
+
+Placemarks are written to the file as they are added, so a KML export holds only
+one point in memory at a time::
+
+    with KmlWriter(folder / "Locations.kmz") as kml:
+        for timestamp, latitude, longitude in points:
+            kml.add_point(timestamp, latitude, longitude, f"Timestamp: {timestamp}")
+
+Files ending with `.kmz` are compressed while they are written.
+"""
+from __future__ import annotations
+
+import contextlib
+import io
+import pathlib
+import typing as t
+import zipfile
+
+from xml.sax.saxutils import escape
+
+
+KML_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<kml xmlns="http://www.opengis.net/kml/2.2" '
+    'xmlns:gx="http://www.google.com/kml/ext/2.2">\n'
+    "    <Document>\n"
+    "        <open>1</open>\n"
+)
+KML_FOOTER = "    </Document>\n</kml>\n"
+PLACEMARK = (
+    "        <Placemark>\n"
+    "            <name>{name}</name>\n"
+    "            <description>{description}</description>\n"
+    "            <Point>\n"
+    "                <coordinates>{longitude},{latitude},0.0</coordinates>\n"
+    "            </Point>\n"
+    "        </Placemark>\n"
+)
+# Name of the KML document inside a KMZ archive
+KMZ_DOCUMENT = "doc.kml"
+
+
+class KmlWriter(contextlib.AbstractContextManager):
+    """Writes placemarks to a KML or KMZ file
+
+    Args:
+        path: file to write. Files with a `.kmz` suffix are compressed.
+
+    Attributes:
+        count: number of placemarks written
+    """
+
+    def __init__(self, path: pathlib.Path) -> None:
+        self.path = pathlib.Path(path)
+        self.count = 0
+        self._archive: zipfile.ZipFile | None = None
+        if self.kmz:
+            self._archive = zipfile.ZipFile(self.path, "w", zipfile.ZIP_DEFLATED)
+            self._output = io.TextIOWrapper(
+                self._archive.open(KMZ_DOCUMENT, "w", force_zip64=True),
+                encoding="utf-8",
+            )
+        else:
+            self._output = open(self.path, "w", encoding="utf-8")
+        self._output.write(KML_HEADER)
+
+    def __repr__(self) -> str:
+        return f"<KmlWriter path={repr(self.path)}, count={self.count}>"
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    @property
+    def kmz(self) -> bool:
+        return self.path.suffix.lower() == ".kmz"
+
+    def add_point(
+        self,
+        name: t.Any,
+        latitude: t.Any,
+        longitude: t.Any,
+        description: t.Any = "",
+    ) -> None:
+        """Writes a placemark
+
+        Args:
+            name: name of the placemark, usually the timestamp
+            latitude: latitude of the point
+            longitude: longitude of the point
+            description: description of the placemark. Defaults to "".
+        """
+        self._output.write(
+            PLACEMARK.format(
+                name=escape(str(name)),
+                description=escape(str(description)),
+                longitude=escape(str(longitude)),
+                latitude=escape(str(latitude)),
+            )
+        )
+        self.count += 1
+
+    def add_points(self, points: t.Iterable[t.Sequence[t.Any]]) -> None:
+        """Writes placemarks
+
+        Args:
+            points: name, latitude, longitude and description of each placemark
+        """
+        for point in points:
+            self.add_point(*point)
+
+    def close(self) -> None:
+        """Writes the end of the document and closes the file"""
+        if self._output.closed:
+            return
+        self._output.write(KML_FOOTER)
+        self._output.close()
+        if self._archive is not None:
+            self._archive.close()
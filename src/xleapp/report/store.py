@@ -0,0 +1,416 @@
+"""Per-run SQLite store for artifact results.
+
+Once an artifact finishes, its rows are written to the case store and `data` is
+replaced with a :obj:`StoredData` sequence reading the rows back in batches. Only
+the rows of the table currently being reported are held in memory, so memory use
+no longer grows with the number of artifacts processed.
+"""
+from __future__ import annotations
+
+import collections.abc
+import json
+import logging
+import pathlib
+import pickle
+import sqlite3
+import threading
+import typing as t
+
+from xleapp.helpers.db import quote_identifier
+
+
+if t.TYPE_CHECKING:
+    from xleapp.artifact.abstract import Artifact
+
+logger_log = logging.getLogger("xleapp.logfile")
+
+STORE_FILE = "_CaseStore.db"
+DEFAULT_BATCH_SIZE = 5000
+
+# Column kinds and the SQLite type declared for them. Mixed numbers and strings are
+# declared without a type so SQLite keeps each value as it was inserted. Any other
+# value (bool, datetime, Path, ...) is pickled so it is read back unchanged.
+COLUMN_TYPES = {
+    "integer": "INTEGER",
+    "real": "REAL",
+    "text": "TEXT",
+    "blob": "BLOB",
+    "mixed": "",
+    "object": "BLOB",
+}
+_KINDS = {int: "integer", float: "real", str: "text", bytes: "blob"}
+
+
+def column_names(headers: t.Sequence[str]) -> list[str]:
+    """Creates unique column names from report headers
+
+    Args:
+        headers: report headers of a table
+
+    Returns:
+        list[str]: a column name for each header
+    """
+    names: list[str] = []
+    for header in headers:
+        name = str(header) or "column"
+        candidate, count = name, 1
+        while candidate.lower() in (existing.lower() for existing in names):
+            count += 1
+            candidate = f"{name}_{count}"
+        names.append(candidate)
+    return names
+
+
+def infer_kinds(rows: t.Iterable[t.Sequence[t.Any]], num_columns: int) -> list[str]:
+    """Infers the kind of each column from its values
+
+    Args:
+        rows: rows of the table
+        num_columns: number of columns in the table
+
+    Returns:
+        list[str]: kind of each column. See :data:`COLUMN_TYPES`.
+    """
+    seen: list[set[type]] = [set() for _ in range(num_columns)]
+    for row in rows:
+        for types, value in zip(seen, row):
+            if value is not None:
+                types.add(type(value))
+
+    kinds = []
+    for types in seen:
+        if not types:
+            kinds.append("mixed")
+        elif not types.issubset(_KINDS):
+            kinds.append("object")
+        elif len(types) == 1:
+            kinds.append(_KINDS[types.pop()])
+        else:
+            kinds.append("mixed")
+    return kinds
+
+
+class StoredData(collections.abc.Sequence):
+    """Rows of an artifact table read back from the case store
+
+    Args:
+        store: case store holding the rows
+        table: name of the table in the store
+    """
+
+    def __init__(self, store: CaseStore, table: str) -> None:
+        self.store = store
+        self.table = table
+        info = store.table_info(table)
+        self.headers: tuple[str, ...] = tuple(info["headers"])
+        self.kinds: list[str] = info["kinds"]
+        self._length: int = info["row_count"]
+        self._select = "SELECT {} FROM {}".format(
+            ", ".join(quote_identifier(name) for name in info["columns"]),
+            quote_identifier(table),
+        )
+        self._objects = [i for i, kind in enumerate(self.kinds) if kind == "object"]
+
+    def __repr__(self) -> str:
+        return f"<StoredData table={repr(self.table)}, rows={self._length}>"
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __reduce__(self) -> tuple[t.Any, ...]:
+        return (type(self), (self.store, self.table))
+
+    def _decode(self, rows: list[tuple[t.Any, ...]]) -> list[tuple[t.Any, ...]]:
+        if not self._objects:
+            return rows
+        decoded = []
+        for row in rows:
+            row = list(row)
+            for i in self._objects:
+                if row[i] is not None:
+                    row[i] = pickle.loads(row[i])
+            decoded.append(tuple(row))
+        return decoded
+
+    def batches(
+        self, batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> t.Iterator[list[tuple[t.Any, ...]]]:
+        """Reads the rows in batches
+
+        Args:
+            batch_size: number of rows per batch
+
+        Yields:
+            list: batch of rows
+        """
+        cursor = self.store.cursor()
+        cursor.execute(f"{self._select} ORDER BY rowid")
+        try:
+            while rows := cursor.fetchmany(batch_size):
+                yield self._decode(rows)
+        finally:
+            cursor.close()
+
+    def __iter__(self) -> t.Iterator[tuple[t.Any, ...]]:
+        for batch in self.batches():
+            yield from batch
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
+            if step != 1:
+                return self[start:stop][::step]
+            cursor = self.store.cursor()
+            cursor.execute(
+                f"{self._select} ORDER BY rowid LIMIT ? OFFSET ?",
+                (max(stop - start, 0), start),
+            )
+            return self._decode(cursor.fetchall())
+
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("stored data index out of range")
+        # Tables are created for each artifact so row IDs follow the insert order
+        cursor = self.store.cursor()
+        cursor.execute(f"{self._select} WHERE rowid = ?", (index + 1,))
+        return self._decode([cursor.fetchone()])[0]
+
+
+class CaseStore:
+    """SQLite database holding the results of every artifact of a run
+
+    Args:
+        db_file: location of the database. Created if missing.
+        batch_size: number of rows written or read at a time
+
+    Attributes:
+        db_file: location of the database
+        batch_size: number of rows written or read at a time
+    """
+
+    def __init__(
+        self, db_file: pathlib.Path, batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> None:
+        self.db_file = pathlib.Path(db_file)
+        self.batch_size = batch_size
+        self._lock = threading.RLock()
+        self.connection = sqlite3.connect(self.db_file, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = OFF")
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS _tables(
+                name TEXT PRIMARY KEY,
+                artifact TEXT,
+                headers TEXT,
+                columns TEXT,
+                kinds TEXT,
+                row_count INTEGER
+            )
+            """
+        )
+        self.connection.commit()
+
+    def __repr__(self) -> str:
+        return f"<CaseStore db_file={repr(self.db_file)}>"
+
+    def __str__(self) -> str:
+        return f"Case store at {self.db_file} with {len(self.tables())} tables"
+
+    def __reduce__(self) -> tuple[t.Any, ...]:
+        return (type(self), (self.db_file, self.batch_size))
+
+    def cursor(self) -> sqlite3.Cursor:
+        """Returns a new cursor of the store's connection"""
+        return self.connection.cursor()
+
+    def tables(self) -> list[str]:
+        """Returns the name of every table in the store"""
+        return [
+            name for (name,) in self.connection.execute("SELECT name FROM _tables")
+        ]
+
+    def table_info(self, table: str) -> dict[str, t.Any]:
+        """Returns the headers, columns, kinds and row count of a table
+
+        Args:
+            table: name of the table
+
+        Raises:
+            KeyError: if the table is not in the store
+
+        Returns:
+            dict: information about the table
+        """
+        row = self.connection.execute(
+            "SELECT headers, columns, kinds, row_count FROM _tables WHERE name = ?",
+            (table,),
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"Table {repr(table)} not in case store!")
+        headers, columns, kinds, row_count = row
+        return {
+            "headers": json.loads(headers),
+            "columns": json.loads(columns),
+            "kinds": json.loads(kinds),
+            "row_count": row_count,
+        }
+
+    def create_table(
+        self,
+        table: str,
+        headers: t.Sequence[str],
+        kinds: t.Sequence[str],
+        artifact: str = "",
+        columns: t.Optional[t.Sequence[str]] = None,
+    ) -> list[str]:
+        """Creates (or replaces) a table in the store
+
+        Args:
+            table: name of the table
+            headers: report headers of the table
+            kinds: kind of each column
+            artifact: class name of the artifact owning the table
+            columns: column names. Defaults to names created from the headers.
+
+        Returns:
+            list[str]: column names of the table
+        """
+        columns = list(columns or column_names(headers))
+        definitions = ", ".join(
+            f"{quote_identifier(name)} {COLUMN_TYPES[kind]}".rstrip()
+            for name, kind in zip(columns, kinds)
+        )
+        with self._lock, self.connection:
+            self.connection.execute(f"DROP TABLE IF EXISTS {quote_identifier(table)}")
+            self.connection.execute(
+                f"CREATE TABLE {quote_identifier(table)}({definitions})"
+            )
+            self.connection.execute(
+                "INSERT OR REPLACE INTO _tables VALUES(?, ?, ?, ?, ?, 0)",
+                (
+                    table,
+                    artifact,
+                    json.dumps(list(headers)),
+                    json.dumps(columns),
+                    json.dumps(list(kinds)),
+                ),
+            )
+        return columns
+
+    def insert(
+        self,
+        table: str,
+        rows: t.Iterable[t.Sequence[t.Any]],
+        kinds: t.Sequence[str],
+    ) -> int:
+        """Appends rows to a table in batches
+
+        Args:
+            table: name of the table
+            rows: rows to append
+            kinds: kind of each column
+
+        Returns:
+            int: number of rows appended
+        """
+        objects = [i for i, kind in enumerate(kinds) if kind == "object"]
+        statement = "INSERT INTO {} VALUES({})".format(
+            quote_identifier(table), ", ".join("?" * len(kinds))
+        )
+
+        def encode(row: t.Sequence[t.Any]) -> t.Sequence[t.Any]:
+            if not objects:
+                return row
+            row = list(row)
+            for i in objects:
+                if row[i] is not None:
+                    row[i] = pickle.dumps(row[i], protocol=pickle.HIGHEST_PROTOCOL)
+            return row
+
+        count = 0
+        batch: list[t.Sequence[t.Any]] = []
+        with self._lock, self.connection:
+            for row in rows:
+                batch.append(encode(row))
+                if len(batch) >= self.batch_size:
+                    self.connection.executemany(statement, batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                self.connection.executemany(statement, batch)
+                count += len(batch)
+            self.connection.execute(
+                "UPDATE _tables SET row_count = row_count + ? WHERE name = ?",
+                (count, table),
+            )
+        return count
+
+    def add_table(
+        self,
+        table: str,
+        headers: t.Sequence[str],
+        rows: t.Sequence[t.Sequence[t.Any]],
+        artifact: str = "",
+    ) -> StoredData:
+        """Saves a table of rows to the store
+
+        Args:
+            table: name of the table
+            headers: report headers of the table
+            rows: rows of the table
+            artifact: class name of the artifact owning the table
+
+        Returns:
+            StoredData: the saved rows
+        """
+        kinds = infer_kinds(rows, len(headers))
+        self.create_table(table, headers, kinds, artifact=artifact)
+        self.insert(table, rows, kinds)
+        return StoredData(self, table)
+
+    def spill(self, artifact: Artifact) -> bool:
+        """Moves the data of a processed artifact to the store
+
+        `artifact.data` is replaced by :obj:`StoredData` (a list of them for
+        artifacts with more than one table).
+
+        Args:
+            artifact: processed artifact
+
+        Returns:
+            bool: True if the data was moved to the store
+        """
+        data, headers = artifact.data, artifact.report_headers
+        if not artifact.processed or not headers or isinstance(data, StoredData):
+            return False
+
+        try:
+            if isinstance(headers, list):
+                if len(data) != len(headers):
+                    return False
+                artifact.data = [
+                    self.add_table(
+                        f"{artifact.cls_name}_{num}",
+                        table_headers,
+                        table,
+                        artifact=artifact.cls_name,
+                    )
+                    for num, (table, table_headers) in enumerate(zip(data, headers))
+                ]
+            else:
+                artifact.data = self.add_table(
+                    artifact.cls_name, headers, data, artifact=artifact.cls_name
+                )
+        except (sqlite3.Error, TypeError, pickle.PicklingError) as err:
+            logger_log.warning(f"-> Case store failed for {artifact.cls_name}: {err}")
+            artifact.data = data
+            return False
+        return True
+
+    def close(self) -> None:
+        """Commits and closes the store"""
+        with self._lock:
+            self.connection.commit()
+            self.connection.close()
@@ -0,0 +1,210 @@
+"""Combined timeline of every artifact in time order.
+
+The `events` table of the timeline database is indexed by artifact and timestamp,
+so the events of each artifact can be read back as a sorted run. The runs are
+merged with a k-way merge (:func:`heapq.merge`), which holds one event per
+artifact in memory whatever the number of events::
+
+    with sqlite3.connect(report_folder / "_Timeline" / "t1.db") as db:
+        write_timeline(db, report_folder / "_Timeline", "jsonl")
+
+Events without a timestamp are written after the sorted events.
+"""
+from __future__ import annotations
+
+import csv
+import heapq
+import json
+import pathlib
+import sqlite3
+import time
+import typing as t
+
+
+TIMELINE_FILE = "timeline"
+# Formats of the combined timeline and the suffix of their file
+TIMELINE_FORMATS = {"jsonl": ".jsonl", "tsv": ".tsv", "sqlite": ".db"}
+
+# timestamp, time, artifact and fields keyed by header
+Event = t.Tuple[t.Optional[int], t.Optional[str], str, t.Dict[str, t.Any]]
+
+_EVENTS = "SELECT timestamp, id, time, artifact, fields FROM events WHERE artifact = ?"
+
+
+def sorted_events(db: sqlite3.Connection) -> t.Iterator[Event]:
+    """Reads the events of every artifact in time order
+
+    Events with the same timestamp are returned in the order they were saved.
+
+    Args:
+        db: timeline database with the `events` and `artifacts` tables
+
+    Yields:
+        Event: timestamp, time, artifact and fields of each event
+    """
+    headers = {
+        name: json.loads(artifact_headers)
+        for name, artifact_headers in db.execute("SELECT name, headers FROM artifacts")
+    }
+    runs = [
+        db.execute(
+            f"{_EVENTS} AND timestamp IS NOT NULL ORDER BY timestamp, id", (name,)
+        )
+        for name in sorted(headers)
+    ]
+    undated = (
+        db.execute(f"{_EVENTS} AND timestamp IS NULL ORDER BY id", (name,))
+        for name in sorted(headers)
+    )
+
+    loads = json.loads
+    for run in (heapq.merge(*runs), *undated):
+        for timestamp, _, event_time, artifact, fields in run:
+            yield (
+                timestamp,
+                event_time,
+                artifact,
+                dict(zip(headers[artifact], loads(fields))),
+            )
+
+
+def _utc(timestamp: int | None) -> str:
+    if timestamp is None:
+        return ""
+    try:
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(timestamp))
+    except (OverflowError, OSError, ValueError):
+        return ""
+
+
+def _dumps() -> t.Callable[[t.Any], str]:
+    return json.JSONEncoder(
+        ensure_ascii=False, check_circular=False, separators=(",", ":"), default=str
+    ).encode
+
+
+def write_jsonl(events: t.Iterable[Event], path: pathlib.Path) -> int:
+    """Writes events as one JSON object per line
+
+    Args:
+        events: events to write
+        path: file to write
+
+    Returns:
+        int: number of events written
+    """
+    dumps = _dumps()
+    count = 0
+    with open(path, "w", encoding="utf-8", buffering=1024**2) as file:
+        for timestamp, event_time, artifact, fields in events:
+            file.write(
+                dumps(
+                    {
+                        "timestamp": timestamp,
+                        "time": event_time,
+                        "artifact": artifact,
+                        "fields": fields,
+                    }
+                )
+            )
+            file.write("\n")
+            count += 1
+    return count
+
+
+def write_tsv(events: t.Iterable[Event], path: pathlib.Path) -> int:
+    """Writes events as tab separated values
+
+    The "UTC" column is the timestamp of the event in UTC and "Fields" holds the
+    fields of the event as a JSON object.
+
+    Args:
+        events: events to write
+        path: file to write
+
+    Returns:
+        int: number of events written
+    """
+    dumps = _dumps()
+    count = 0
+    with open(
+        path, "w", encoding="utf-8-sig", newline="", buffering=1024**2
+    ) as file:
+        tsv_writer = csv.writer(file, delimiter="\t")
+        tsv_writer.writerow(("UTC", "Time", "Artifact", "Fields"))
+        for timestamp, event_time, artifact, fields in events:
+            tsv_writer.writerow((_utc(timestamp), event_time, artifact, dumps(fields)))
+            count += 1
+    return count
+
+
+def write_sqlite(events: t.Iterable[Event], path: pathlib.Path) -> int:
+    """Writes events to the `timeline` table of a SQLite database
+
+    Rows are inserted in time order, so `ORDER BY rowid` returns the timeline.
+
+    Args:
+        events: events to write
+        path: database to write. Replaced if it exists.
+
+    Returns:
+        int: number of events written
+    """
+    dumps = _dumps()
+    path.unlink(missing_ok=True)
+    db = sqlite3.connect(path, isolation_level=None)
+    try:
+        db.execute("PRAGMA journal_mode = OFF")
+        db.execute("PRAGMA synchronous = OFF")
+        db.execute(
+            "CREATE TABLE timeline("
+            "timestamp INTEGER, utc TEXT, time TEXT, artifact TEXT, fields TEXT)"
+        )
+        db.execute("BEGIN")
+        cursor = db.executemany(
+            "INSERT INTO timeline VALUES(?,?,?,?,?)",
+            (
+                (timestamp, _utc(timestamp) or None, event_time, artifact, dumps(fields))
+                for timestamp, event_time, artifact, fields in events
+            ),
+        )
+        db.execute("COMMIT")
+        return cursor.rowcount
+    finally:
+        db.close()
+
+
+WRITERS: dict[str, t.Callable[[t.Iterable[Event], pathlib.Path], int]] = {
+    "jsonl": write_jsonl,
+    "tsv": write_tsv,
+    "sqlite": write_sqlite,
+}
+
+
+def write_timeline(
+    db: sqlite3.Connection, folder: pathlib.Path, timeline_format: str = "jsonl"
+) -> pathlib.Path:
+    """Writes the events of every artifact in time order to one file
+
+    Args:
+        db: timeline database with the `events` and `artifacts` tables
+        folder: folder of the file
+        timeline_format: "jsonl", "tsv" or "sqlite". Defaults to "jsonl".
+
+    Raises:
+        ValueError: if the format is unknown
+
+    Returns:
+        pathlib.Path: the written file
+    """
+    try:
+        writer = WRITERS[timeline_format]
+    except KeyError as err:
+        raise ValueError(
+            f"Timeline format must be one of {tuple(WRITERS)}, "
+            f"not {repr(timeline_format)}!"
+        ) from err
+
+    path = pathlib.Path(folder) / f"{TIMELINE_FILE}{TIMELINE_FORMATS[timeline_format]}"
+    writer(sorted_events(db), path)
+    return path
@@ -2,6 +2,8 @@
 import pathlib
 import typing as t
 
+from xleapp.helpers.memory import format_bytes
+
 from ._partials.index import Index
 from .ext import IncludeLogFileExtension as IncludeLogFileExtension
 from .html import ArtifactHtmlReport as ArtifactHtmlReport
@@ -9,6 +11,9 @@
 from .html import HtmlPage as HtmlPage
 from .html import NavigationItem
 from .html import Template as Template
+from .render import RenderPool as RenderPool
+from .render import create_environment as create_environment
+from .render import create_template_cache as create_template_cache
 
 
 if t.TYPE_CHECKING:
@@ -25,12 +30,49 @@ def generate_index(app: "Application") -> None:
         extraction_type=app.extraction_type,
         processing_time=app.processing_time,
         navigation=nav,
+        performance=generate_performance(app.run_summary()),
     )
 
     index_file = app.report_folder / "index.html"
     index_file.write_text(index_page.html())
 
 
+def generate_performance(summary: dict[str, t.Any]) -> list[list[t.Any]]:
+    """Creates the rows of the "Performance" tab from a run summary
+
+    Artifacts using the most memory (or time when memory was not tracked) are
+    listed first.
+
+    Args:
+        summary (dict): summary created by :meth:`Application.run_summary`
+
+    Returns:
+        list: rows for the performance table
+    """
+    def sort_key(item: dict[str, t.Any]) -> tuple[int, float]:
+        usage = item["memory"] or {}
+        return (
+            usage.get("peak") or usage.get("rss_peak") or 0,
+            item["process_time"] or 0,
+        )
+
+    rows = []
+    for item in sorted(summary["artifacts"], key=sort_key, reverse=True):
+        usage = item["memory"] or {}
+        rows.append(
+            [
+                item["name"],
+                item["category"],
+                f"{item['process_time'] or 0:.2f}s",
+                item["rows"],
+                format_bytes(usage.get("peak")),
+                format_bytes(usage.get("retained")),
+                format_bytes(usage.get("rss_peak")),
+            ]
+        )
+    return rows
+
+
 def get_contributors(contributors: list[list[str]]) -> list[Contributor]:
     """Returns a list of Contributors from `xleapp.__contributors__`
 
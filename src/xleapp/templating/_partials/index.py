@@ -12,10 +12,12 @@ class Index(html.HtmlPage):
     Attributes:
         authors (list): list of authors
         contributors (list): list of contributors
+        performance (list): time, rows and memory used by each artifact
     """
 
     authors: list[html.Contributor] = field(init=False)
     contributors: list[html.Contributor] = field(init=False)
+    performance: list[list] = field(default_factory=list)
 
     def __post_init__(self) -> None:
         self.authors = templating.get_contributors(__authors__)
@@ -33,4 +35,5 @@ def html(self) -> str:
             navigation=self.navigation,
             authors=self.authors,
             contributors=self.contributors,
+            performance=self.performance,
         )
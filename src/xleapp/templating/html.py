@@ -9,8 +9,11 @@
 
 import xleapp.globals as g
 
+from xleapp.helpers import tracing
 from xleapp.helpers.types import DecoratedFunc
 
+from .tables import TABLE_CHUNK_ROWS, write_tables
+
 
 if t.TYPE_CHECKING:
     import pathlib
@@ -160,7 +163,15 @@ def __eq__(self, other: object) -> bool:
 
 @dataclass
 class ArtifactHtmlReport(HtmlPage):
-    """Base Artifact HTML Report"""
+    """Base Artifact HTML Report
+
+    Attributes:
+        lazy_tables (bool): write the rows to data files loaded by the page
+        chunk_rows (int): rows per data file
+    """
+
+    lazy_tables: bool = field(default=False, init=True)
+    chunk_rows: int = field(default=TABLE_CHUNK_ROWS, init=True)
 
     @Template("report_base")
     def html(self) -> str:
@@ -173,16 +184,24 @@ def html(self) -> str:
         Returns:
             str: HTML str of artifact report
         """
-        return self.template.render(artifact=self.artifact, navigation=self.navigation)
+        tables = None
+        if self.lazy_tables and self.artifact.data:
+            tables = write_tables(self.report_folder, self.artifact, self.chunk_rows)
+        return self.template.render(
+            artifact=self.artifact, navigation=self.navigation, tables=tables
+        )
 
     @property
     def report(self) -> bool:
         """Generates report information (html, tsv, kml, and timeline)"""
-        html = self.html()
-        output_file = (
-            self.report_folder / f"{self.artifact.category} - {self.artifact.name}.html"
-        )
-        output_file.write_text(html, encoding="UTF-8")
+        with tracing.span("render", artifact=self.artifact.cls_name) as span:
+            html = self.html()
+            output_file = (
+                self.report_folder
+                / f"{self.artifact.category} - {self.artifact.name}.html"
+            )
+            output_file.write_text(html, encoding="UTF-8")
+            span.set(bytes=len(html))
 
         return True
 
@@ -0,0 +1,328 @@
+"""Renders the HTML pages of the artifacts on a pool of workers.
+
+Jinja renders pages in Python, so a process pool renders several pages at the same
+time. Each worker process builds its own Jinja environment and receives an
+:obj:`ArtifactSnapshot` of each artifact: the attributes the templates read, with
+the rows of the artifact and the paths of its source files. Rows read back from the
+case store are pickled as a reference to the store, so threads are used instead
+when the case store is enabled.
+
+Pages are returned in the order they were submitted, so the log and the report
+stay the same whatever the number of workers::
+
+    with RenderPool(app, workers=4) as pool:
+        futures = [pool.submit(artifact, navigation) for artifact in artifacts]
+        for future in futures:
+            future.result()
+"""
+from __future__ import annotations
+
+import concurrent.futures
+import logging
+import multiprocessing
+import os
+import pathlib
+import pickle
+import typing as t
+
+from dataclasses import dataclass, field
+from functools import cached_property
+
+import jinja2
+import jinja2.ext
+
+from xleapp.helpers.utils import is_list, user_cache_dir
+
+from .ext import IncludeLogFileExtension
+from .html import ArtifactHtmlReport
+from .tables import TABLE_CHUNK_ROWS
+
+
+if t.TYPE_CHECKING:
+    from xleapp.app import Application
+    from xleapp.artifact.abstract import Artifact
+
+    from .html import NavigationItem
+
+logger_log = logging.getLogger("xleapp.logfile")
+
+RENDER_POOLS = ("process", "thread")
+DEFAULT_RENDER_WORKERS = min(os.cpu_count() or 1, 8)
+# Folder of the compiled templates in the user cache folder
+TEMPLATE_CACHE_FOLDER = "jinja"
+
+
+def create_template_cache(
+    version: str, folder: pathlib.Path | None = None
+) -> jinja2.FileSystemBytecodeCache | None:
+    """Creates the cache of compiled templates
+
+    Templates are compiled by the first run and loaded from the cache by the next
+    runs and by the render workers. Jinja compares the source of each template with
+    the cached one, so changed templates are compiled again.
+
+    Args:
+        version: version of xLEAPP. Each version has its own folder.
+        folder: cache folder. Defaults to `jinja` in the user cache folder.
+
+    Returns:
+        jinja2.FileSystemBytecodeCache: the cache, or None if the folder can not
+            be created
+    """
+    cache_folder = pathlib.Path(folder or user_cache_dir() / TEMPLATE_CACHE_FOLDER)
+    cache_folder = cache_folder / version
+    try:
+        cache_folder.mkdir(parents=True, exist_ok=True)
+    except OSError as err:
+        logger_log.debug(f"-> Templates are not cached: {err}")
+        return None
+    return jinja2.FileSystemBytecodeCache(str(cache_folder))
+
+
+def create_environment(
+    log_folder: pathlib.Path,
+    app: t.Any,
+    environment: type[jinja2.Environment] = jinja2.Environment,
+    bytecode_cache: jinja2.BytecodeCache | None = None,
+) -> jinja2.Environment:
+    """Creates the Jinja environment of the HTML report
+
+    Args:
+        log_folder: folder of the log files included in the report
+        app: object available as `g` in the templates
+        environment: class of the environment. Defaults to jinja2.Environment.
+        bytecode_cache: cache of compiled templates. Defaults to None.
+
+    Returns:
+        jinja2.Environment: the environment
+    """
+    template_loader = jinja2.PackageLoader("xleapp.templating", "templates")
+    log_file_loader = jinja2.FileSystemLoader(log_folder)
+
+    rv = environment(
+        loader=jinja2.ChoiceLoader([template_loader, log_file_loader]),
+        autoescape=jinja2.select_autoescape(["html", "xml"]),
+        extensions=[jinja2.ext.do, IncludeLogFileExtension],
+        trim_blocks=True,
+        lstrip_blocks=True,
+        bytecode_cache=bytecode_cache,
+    )
+    rv.filters.update({"is_list": is_list})
+    rv.globals.update(g=app)
+    return rv
+
+
+@dataclass
+class ReportGlobals:
+    """Attributes of the application read by the artifact templates
+
+    Worker processes use it as `xleapp.globals.app`.
+    """
+
+    project: str
+    version: str
+    report_folder: pathlib.Path
+    log_folder: pathlib.Path
+    extraction_type: str = "fs"
+    lazy_tables: bool = False
+    chunk_rows: int = TABLE_CHUNK_ROWS
+    template_cache: bool = True
+
+    @classmethod
+    def from_app(cls, app: Application) -> ReportGlobals:
+        configs = getattr(app, "default_configs", {})
+        return cls(
+            project=app.project,
+            version=app.version,
+            report_folder=app.report_folder,
+            log_folder=app.log_folder,
+            extraction_type=getattr(app, "extraction_type", "fs"),
+            lazy_tables=configs.get("lazy_tables", False),
+            chunk_rows=configs.get("table_chunk_rows", TABLE_CHUNK_ROWS),
+            template_cache=configs.get("template_cache", True),
+        )
+
+    @cached_property
+    def jinja_env(self) -> jinja2.Environment:
+        bytecode_cache = None
+        if self.template_cache:
+            bytecode_cache = create_template_cache(self.version)
+        return create_environment(self.log_folder, self, bytecode_cache=bytecode_cache)
+
+
+@dataclass(frozen=True)
+class SourceFile:
+    """Path of a file found for an artifact"""
+
+    path: pathlib.Path
+
+
+@dataclass
+class ArtifactSnapshot:
+    """Attributes of an artifact read by the artifact templates"""
+
+    cls_name: str
+    name: str
+    category: str
+    description: str
+    report_title: str
+    report_headers: t.Any
+    data: t.Any
+    found: list[SourceFile] = field(default_factory=list)
+    streamed: bool = False
+    row_count: int = 0
+
+    @classmethod
+    def from_artifact(cls, artifact: Artifact) -> ArtifactSnapshot:
+        return cls(
+            cls_name=artifact.cls_name,
+            name=artifact.name,
+            category=artifact.category,
+            description=getattr(artifact, "description", ""),
+            report_title=artifact.report_title,
+            report_headers=artifact.report_headers,
+            data=artifact.data,
+            found=[
+                SourceFile(pathlib.Path(getattr(item, "path", item)))
+                for item in artifact.found
+            ],
+            streamed=artifact.streamed,
+            row_count=artifact.row_count,
+        )
+
+
+def _init_worker(report_globals: ReportGlobals) -> None:
+    import xleapp.globals as g
+
+    g.app = report_globals
+
+
+def _render_snapshot(
+    report_globals: ReportGlobals,
+    snapshot: bytes,
+    navigation: dict[str, set[NavigationItem]],
+) -> bool:
+    return _render(report_globals, pickle.loads(snapshot), navigation)
+
+
+def _render(
+    report_globals: ReportGlobals,
+    artifact: ArtifactSnapshot | Artifact,
+    navigation: dict[str, set[NavigationItem]],
+) -> bool:
+    html_report = ArtifactHtmlReport(
+        report_folder=report_globals.report_folder,
+        log_folder=report_globals.log_folder,
+        extraction_type=report_globals.extraction_type,
+        navigation=navigation,
+        lazy_tables=report_globals.lazy_tables,
+        chunk_rows=report_globals.chunk_rows,
+    )
+    return html_report(artifact).report
+
+
+class RenderPool:
+    """Renders artifact pages on a pool of processes or threads
+
+    Args:
+        app: application generating the report
+        workers: number of pages rendered at the same time. With one worker the
+            pages are rendered by :meth:`submit` itself. Defaults to the number of
+            CPUs (at most 8).
+        pool: "process" or "thread". Defaults to threads when the case store is
+            enabled and processes otherwise.
+
+    Raises:
+        ValueError: if the pool is unknown
+    """
+
+    def __init__(
+        self,
+        app: Application,
+        workers: int = DEFAULT_RENDER_WORKERS,
+        pool: str | None = None,
+    ) -> None:
+        if pool is None:
+            pool = "thread" if app.case_store else "process"
+        if pool not in RENDER_POOLS:
+            raise ValueError(f"Render pool must be one of {RENDER_POOLS}, not {pool}!")
+        self.app = app
+        self.workers = workers
+        self.pool = pool
+        self._globals = ReportGlobals.from_app(app)
+        self._executor: concurrent.futures.Executor | None = None
+
+    def __repr__(self) -> str:
+        return f"<RenderPool pool={repr(self.pool)}, workers={self.workers}>"
+
+    def __enter__(self) -> RenderPool:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def _start(self) -> concurrent.futures.Executor | None:
+        if self._executor is None and self.workers > 1:
+            if self.pool == "thread":
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="render"
+                )
+            else:
+                try:
+                    # Export threads are running, so workers are not forked
+                    self._executor = concurrent.futures.ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_init_worker,
+                        initargs=(self._globals,),
+                    )
+                except (OSError, NotImplementedError) as err:
+                    logger_log.warning(f"-> Rendering in one process: {err}")
+                    self.workers = 1
+        return self._executor
+
+    def _render_here(
+        self, artifact: Artifact, navigation: dict[str, set[NavigationItem]]
+    ) -> concurrent.futures.Future:
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        try:
+            future.set_result(_render(self._globals, artifact, navigation))
+        except Exception as err:
+            future.set_exception(err)
+        return future
+
+    def submit(
+        self, artifact: Artifact, navigation: dict[str, set[NavigationItem]]
+    ) -> concurrent.futures.Future:
+        """Renders the page of an artifact
+
+        Args:
+            artifact: processed artifact. Its rows must not change until the page
+                is rendered.
+            navigation: navigation of the report
+
+        Returns:
+            concurrent.futures.Future: future returning True once the page is saved
+        """
+        executor = self._start()
+        if executor is None:
+            return self._render_here(artifact, navigation)
+        if self.pool == "thread":
+            return executor.submit(_render, self._globals, artifact, navigation)
+
+        try:
+            # Pickled here so artifacts with rows which can not be pickled are
+            # rendered by this process instead
+            snapshot = pickle.dumps(
+                ArtifactSnapshot.from_artifact(artifact), protocol=pickle.HIGHEST_PROTOCOL
+            )
+        except Exception as err:
+            logger_log.debug(f"-> Rendering {artifact.cls_name} here: {err}")
+            return self._render_here(artifact, navigation)
+        return executor.submit(_render_snapshot, self._globals, snapshot, navigation)
+
+    def close(self) -> None:
+        """Waits for the pages being rendered and stops the workers"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -0,0 +1,126 @@
+"""Tables of artifact rows loaded by the page instead of written in it.
+
+Each table's rows are written to numbered data files in `_TableData`, in chunks
+of :data:`TABLE_CHUNK_ROWS` rows. The page only has the table headers. It loads
+the data files one after another with `_static/lazy-tables.js` and DataTables
+creates the cells of the rows being displayed (`deferRender`), so the size of the
+page does not depend on the number of rows.
+
+The data files are scripts instead of JSON because browsers do not let pages
+opened from disk read files with `fetch()`::
+
+    xleapp.addRows("Artifact-1", [["2022-01-31 13:45:10", "news"], ...]);
+"""
+from __future__ import annotations
+
+import itertools
+import json
+import pathlib
+import shutil
+import typing as t
+
+from dataclasses import dataclass, field
+
+from jinja2.utils import markupsafe
+
+from xleapp.helpers.utils import is_list
+
+
+TABLE_DATA_FOLDER = "_TableData"
+TABLE_CHUNK_ROWS = 5_000
+
+
+@dataclass
+class LazyTable:
+    """Table whose rows are loaded from data files
+
+    Attributes:
+        id (str): id of the table element
+        headers (tuple): column headers
+        chunks (list): data files relative to the report folder
+        row_count (int): number of rows
+    """
+
+    id: str
+    headers: t.Sequence[str]
+    chunks: list[str] = field(default_factory=list)
+    row_count: int = 0
+
+
+def _cell(value: t.Any) -> str:
+    # DataTables adds the cells to the page as HTML
+    return str(markupsafe.escape(value))
+
+
+def write_table(
+    folder: pathlib.Path,
+    table_id: str,
+    headers: t.Sequence[str],
+    rows: t.Iterable[t.Sequence[t.Any]],
+    chunk_rows: int = TABLE_CHUNK_ROWS,
+) -> LazyTable:
+    """Writes the rows of a table to data files
+
+    Values are HTML escaped, except :class:`markupsafe.Markup` values which are
+    written as is.
+
+    Args:
+        folder: folder of the data files, in the `_TableData` folder of the report
+        table_id: id of the table element
+        headers: column headers
+        rows: rows of the table
+        chunk_rows: rows per data file. Defaults to TABLE_CHUNK_ROWS.
+
+    Returns:
+        LazyTable: the table
+    """
+    table = LazyTable(id=table_id, headers=headers)
+    encode = json.JSONEncoder(
+        ensure_ascii=False, check_circular=False, separators=(",", ":")
+    ).encode
+    prefix = f"xleapp.addRows({encode(table_id)},"
+    iterator = iter(rows)
+    for num in itertools.count(1):
+        chunk = [
+            [_cell(value) for value in row]
+            for row in itertools.islice(iterator, chunk_rows)
+        ]
+        if not chunk:
+            break
+        data_file = folder / f"{table_id}-{num:04}.js"
+        data_file.write_text(f"{prefix}{encode(chunk)});\n", encoding="utf-8")
+        table.chunks.append(f"{TABLE_DATA_FOLDER}/{folder.name}/{data_file.name}")
+        table.row_count += len(chunk)
+    return table
+
+
+def write_tables(
+    report_folder: pathlib.Path,
+    artifact: t.Any,
+    chunk_rows: int = TABLE_CHUNK_ROWS,
+) -> list[LazyTable]:
+    """Writes the tables of an artifact to data files
+
+    Data files written for the artifact by an earlier run are removed first.
+
+    Args:
+        report_folder: report folder
+        artifact: artifact whose rows are written
+        chunk_rows: rows per data file. Defaults to TABLE_CHUNK_ROWS.
+
+    Returns:
+        list[LazyTable]: one table for each table of the artifact page
+    """
+    folder = report_folder / TABLE_DATA_FOLDER / artifact.cls_name
+    shutil.rmtree(folder, ignore_errors=True)
+    folder.mkdir(parents=True)
+
+    tables: t.Iterable[tuple[t.Any, t.Any]]
+    if is_list(artifact.report_headers):
+        tables = zip(artifact.report_headers, artifact.data)
+    else:
+        tables = iter([(artifact.report_headers, artifact.data)])
+    return [
+        write_table(folder, f"{artifact.cls_name}-{num}", headers, rows, chunk_rows)
+        for num, (headers, rows) in enumerate(tables, start=1)
+    ]
@@ -0,0 +1,152 @@
+import sqlite3
+
+import pytest
+
+from xleapp.helpers import db
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(
+        """
+        CREATE TABLE ZSFAVORITE(Z_PK INTEGER PRIMARY KEY, ZTITLE TEXT, ZURL TEXT);
+        CREATE INDEX ZSFAVORITE_ZURL ON ZSFAVORITE(ZURL);
+        CREATE VIEW favorites AS SELECT ZTITLE FROM ZSFAVORITE;
+        """
+    )
+    conn.row_factory = sqlite3.Row
+    yield conn
+    db.clear_schema_cache(conn)
+    conn.close()
+
+
+def test_schema(conn):
+    schema = db.schema(conn)
+    table = schema.table("zsfavorite")
+
+    assert schema is db.schema(conn)
+    assert table.columns == ("Z_PK", "ZTITLE", "ZURL")
+    assert table.indexes == ("ZSFAVORITE_ZURL",)
+    assert schema.table("favorites").type == "view"
+    assert schema.table("missing") is None
+    assert conn.row_factory is sqlite3.Row
+
+
+def test_schema_refresh(conn):
+    db.schema(conn)
+    conn.execute("CREATE TABLE ZNOTE(ZBODY TEXT)")
+
+    assert not db.schema(conn).has_table("ZNOTE")
+    assert db.schema(conn, refresh=True).has_table("ZNOTE")
+
+
+def test_does_exist(conn):
+    assert db.does_table_exist(conn, "ZSFAVORITE")
+    assert not db.does_table_exist(conn, "favorites")
+    assert not db.does_table_exist(conn, "ZNOTE")
+    assert db.does_column_exist_in_db(conn, "ZSFAVORITE", "ztitle")
+    assert not db.does_column_exist_in_db(conn, "ZSFAVORITE", "ZDATE")
+    assert not db.does_column_exist_in_db(conn, "ZNOTE", "ZBODY")
+
+
+def test_bulk_checks(conn):
+    schema = db.schema(conn)
+    columns = ["ZTITLE", "ZDATE", "zurl"]
+
+    assert schema.existing_columns("ZSFAVORITE", columns) == ["ZTITLE", "zurl"]
+    assert schema.missing_columns("ZSFAVORITE", columns) == ["ZDATE"]
+    assert schema.missing_columns("ZNOTE", columns) == columns
+
+
+def test_select_list(conn):
+    schema = db.schema(conn)
+
+    assert (
+        schema.select_list("ZSFAVORITE", ["ztitle", "ZDATE"])
+        == '"ZTITLE", NULL AS "ZDATE"'
+    )
+    columns = schema.select_list(
+        "ZSFAVORITE", {"ZURL": "''", "ZDATE": "0"}, prefix="fav"
+    )
+    assert columns == 'fav."ZURL", 0 AS "ZDATE"'
+
+    conn.execute("INSERT INTO ZSFAVORITE VALUES(1, 'Tardis', 'https://tardis')")
+    row = conn.execute(f"SELECT {columns} FROM ZSFAVORITE AS fav").fetchone()
+    assert tuple(row) == ("https://tardis", 0)
+
+
+def test_schema_broken_view(conn):
+    conn.executescript(
+        """
+        CREATE TABLE ZNOTE(ZBODY TEXT);
+        CREATE VIEW notes AS SELECT ZBODY FROM ZNOTE;
+        DROP TABLE ZNOTE;
+        """
+    )
+    schema = db.schema(conn)
+
+    assert schema.table("notes").columns == ()
+    assert db.does_table_exist(conn, "ZSFAVORITE")
+    assert db.does_column_exist_in_db(conn, "ZSFAVORITE", "ZURL")
+
+
+def test_schema_error():
+    conn = sqlite3.connect(":memory:")
+    conn.close()
+
+    assert not db.does_table_exist(conn, "ZSFAVORITE")
+    with pytest.raises(sqlite3.Error):
+        db.schema(conn)
+
+
+@pytest.fixture
+def favorites(conn):
+    conn.executemany(
+        "INSERT INTO ZSFAVORITE VALUES(?, ?, ?)",
+        [
+            (num, f"Title {num}", None if num % 2 else f"https://{num}")
+            for num in range(7)
+        ],
+    )
+    return conn
+
+
+def test_iter_query(favorites):
+    batches = list(
+        db.iter_query(favorites, "SELECT Z_PK, ZTITLE FROM ZSFAVORITE", batch_size=3)
+    )
+
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+    assert batches[0][0] == (0, "Title 0")
+    assert type(batches[0][0]) is tuple
+    assert favorites.row_factory is sqlite3.Row
+
+
+def test_iter_query_converters(favorites):
+    rows = [
+        row
+        for batch in db.iter_query(
+            favorites,
+            "SELECT Z_PK, ZTITLE, ZURL FROM ZSFAVORITE WHERE Z_PK < ?",
+            (3,),
+            converters={
+                0: lambda values: [value * 10 for value in values],
+                "zurl": db.map_values(str.upper),
+            },
+        )
+        for row in batch
+    ]
+
+    assert rows == [
+        (0, "Title 0", "HTTPS://0"),
+        (10, "Title 1", None),
+        (20, "Title 2", "HTTPS://2"),
+    ]
+
+    with pytest.raises(KeyError):
+        next(
+            db.iter_query(
+                favorites, "SELECT Z_PK FROM ZSFAVORITE", converters={"ZDATE": str}
+            )
+        )
@@ -0,0 +1,46 @@
+import sys
+import tracemalloc
+
+import pytest
+
+from xleapp.helpers.memory import MemoryMonitor, current_rss, format_bytes
+
+
+@pytest.mark.parametrize(
+    "size,expected",
+    [
+        (None, "N/A"),
+        (512, "512 B"),
+        (1536, "1.5 KiB"),
+        (-3 * 1024**2, "-3.0 MiB"),
+    ],
+)
+def test_format_bytes(size, expected):
+    assert format_bytes(size) == expected
+
+
+def test_tracemalloc_usage():
+    with MemoryMonitor("tracemalloc", interval=0.01) as monitor:
+        kept = [bytes(1024) for _ in range(1024)]
+        dropped = [bytes(1024) for _ in range(2048)]
+        del dropped
+
+    assert monitor.usage.peak >= 3 * 1024**2
+    assert 1024**2 <= monitor.usage.retained < monitor.usage.peak
+    assert not tracemalloc.is_tracing()
+    assert kept
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="RSS is not sampled on Windows")
+def test_rss_usage():
+    with MemoryMonitor("rss", interval=0.01) as monitor:
+        pass
+
+    assert current_rss() > 0
+    assert monitor.usage.rss_peak >= monitor.usage.rss_start
+    assert monitor.usage.peak is None
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        MemoryMonitor("psutil")
@@ -0,0 +1,37 @@
+import pstats
+import time
+
+import pytest
+
+from xleapp.helpers.profiler import COLLAPSED_FILE, Profiler
+
+
+def busy_artifact():
+    end = time.perf_counter() + 0.1
+    while time.perf_counter() < end:
+        sum(range(1000))
+    return "done"
+
+
+def test_cprofile(tmp_path):
+    with Profiler("cprofile", tmp_path) as profiler:
+        assert profiler.profile("BusyArtifact", busy_artifact) == "done"
+
+    stats = pstats.Stats(str(tmp_path / "BusyArtifact.pstats"))
+    assert any(func[2] == "busy_artifact" for func in stats.stats)
+
+
+def test_sampling(tmp_path):
+    with Profiler("sample", tmp_path, interval=0.001) as profiler:
+        profiler.profile("BusyArtifact", busy_artifact)
+
+    lines = (tmp_path / COLLAPSED_FILE).read_text().splitlines()
+    assert any(
+        line.startswith("BusyArtifact;") and "busy_artifact" in line for line in lines
+    )
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+def test_unknown_mode(tmp_path):
+    with pytest.raises(ValueError):
+        Profiler("perf", tmp_path)
@@ -0,0 +1,84 @@
+import json
+import os
+import plistlib
+
+import pytest
+
+from xleapp.helpers.resources import ResourceCache
+
+
+@pytest.fixture
+def plist_file(tmp_path):
+    plist_file = tmp_path / "com.apple.mobile.installation.plist"
+    plist_file.write_bytes(
+        plistlib.dumps({"User": {"com.apple.Maps": {}}}, fmt=plistlib.FMT_BINARY)
+    )
+    return plist_file
+
+
+def test_load(plist_file):
+    cache = ResourceCache()
+    first = cache.load(plist_file)
+
+    assert first == {"User": {"com.apple.Maps": {}}}
+    assert cache.load(str(plist_file), "plist") is first
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+    assert cache.stats.size == plist_file.stat().st_size
+
+
+def test_load_changed_file(plist_file):
+    cache = ResourceCache()
+    cache.load(plist_file)
+    plist_file.write_bytes(plistlib.dumps({"User": {}, "System": {}}))
+    stat = plist_file.stat()
+    os.utime(plist_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert cache.load(plist_file) == {"User": {}, "System": {}}
+    assert cache.stats.misses == 2
+
+
+def test_parsers(tmp_path):
+    cache = ResourceCache()
+    json_file = tmp_path / "state.json"
+    json_file.write_text(json.dumps([1, 2]))
+
+    assert cache.load(json_file, "json") == [1, 2]
+    assert cache.load(json_file, lambda file: file.read()) == b"[1, 2]"
+    assert cache.stats.misses == 2
+    with pytest.raises(ValueError):
+        cache.load(json_file, "yaml")
+
+
+def test_parse_bytes():
+    cache = ResourceCache()
+    blob = plistlib.dumps({"name": "Tardis"}, fmt=plistlib.FMT_BINARY)
+
+    assert cache.parse_bytes(blob, "plist") == {"name": "Tardis"}
+    assert cache.parse_bytes(bytes(blob), "plist") is cache.parse_bytes(blob, "plist")
+    assert cache.parse_bytes(b"\x08\x96\x01", lambda data: data[1:]) == b"\x96\x01"
+    assert (cache.stats.hits, cache.stats.misses) == (2, 2)
+
+
+def test_budget():
+    cache = ResourceCache(max_size=10)
+    for num in range(3):
+        cache.parse_bytes(b"%5d" % num, "json")
+    cache.parse_bytes(b"\"" + b"x" * 20 + b"\"", "json")
+
+    assert len(cache) == 2
+    assert cache.stats.evictions == 1
+    assert cache.stats.size == 10
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.stats.misses == 4
+
+
+def test_parse_bytes_lambdas():
+    cache = ResourceCache()
+    parsers = [lambda data: data.upper(), lambda data: data.lower()]
+
+    assert [cache.parse_bytes(b"Tardis", parse) for parse in parsers] == [
+        b"TARDIS",
+        b"tardis",
+    ]
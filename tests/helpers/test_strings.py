@@ -1,6 +1,20 @@
+import random
+
 import pytest
 
-from xleapp.helpers.strings import print_str, raw, split_camel_case
+from xleapp.bench.strings import (
+    reference_filter_strings_in_file,
+    reference_raw,
+    reference_wrap_text,
+)
+from xleapp.helpers.strings import (
+    filter_strings_in_file,
+    print_str,
+    raw,
+    split_camel_case,
+    strings_in_file,
+    wrap_text,
+)
 
 
 @pytest.mark.parametrize(
@@ -49,3 +63,65 @@ def test_split_camel_case():
         split_camel_case(bad_camel_case_string)
 
     assert split_camel_case(camel_case_string) == ["The", "Doctor", "Is", "Here"]
+
+
+def test_raw_matches_reference():
+    data = bytes(range(256)) * 4
+    assert raw(data) == reference_raw(data)
+    assert raw(memoryview(data)) == reference_raw(data)
+    assert raw([0x41, 0x00, 0x42]) == "A.B"
+
+
+@pytest.mark.parametrize("keep_separators", [True, False])
+@pytest.mark.parametrize("width", [1, 2, 5, 70])
+def test_wrap_text_matches_reference(width, keep_separators):
+    rng = random.Random(width)
+    for _ in range(200):
+        text = "".join(rng.choices("ab/\\ ", k=rng.randint(0, 200)))
+        assert wrap_text(text, "/\\", width, keep_separators) == reference_wrap_text(
+            text, "/\\", width, keep_separators
+        )
+
+
+def test_wrap_text():
+    path = "C:\\Users\\doctor\\reports\\xLEAPP_Reports"
+    assert wrap_text(path, "\\", width=15) == (
+        "C:\\Users\\\ndoctor\\reports\\\nxLEAPP_Reports"
+    )
+    assert wrap_text(path, "", width=0) == path
+
+
+@pytest.fixture
+def binary_file(tmp_path):
+    binary_file = tmp_path / "data.bin"
+    binary_file.write_bytes(
+        b"\x00\x01Tardis\x02abc\xffblue box\n\x01"
+        + "Gallifrey".encode("utf-16le")
+        + b"\x00\x00"
+    )
+    return binary_file
+
+
+def test_filter_strings_in_file(binary_file):
+    assert list(filter_strings_in_file(binary_file)) == list(
+        reference_filter_strings_in_file(binary_file)
+    )
+
+
+def test_strings_in_file(binary_file):
+    assert list(strings_in_file(binary_file)) == ["Tardis", "blue box\n"]
+    assert list(strings_in_file(binary_file, min_chars=3)) == [
+        "Tardis",
+        "abc",
+        "blue box\n",
+    ]
+    assert list(strings_in_file(binary_file, encoding="utf-16le")) == ["Gallifrey"]
+
+
+def test_strings_in_file_empty(tmp_path):
+    empty_file = tmp_path / "empty.bin"
+    empty_file.touch()
+    assert list(strings_in_file(empty_file)) == []
+
+    with pytest.raises(ValueError):
+        list(strings_in_file(empty_file, encoding="utf-32"))
@@ -0,0 +1,77 @@
+import array
+import datetime
+
+import pytest
+
+from xleapp.artifact.table import ResultTable
+from xleapp.helpers import timestamps
+
+
+@pytest.mark.parametrize(
+    ["value", "epoch", "expected"],
+    [
+        (1_578_307_200, "unix", "2020-01-06 10:40:00"),
+        (1_578_307_200_999, "unix_ms", "2020-01-06 10:40:00"),
+        (1_578_307_200_000_000, "unix_us", "2020-01-06 10:40:00"),
+        (1_578_307_200_000_000_000, "unix_ns", "2020-01-06 10:40:00"),
+        (600_000_000, "mac", "2020-01-06 10:40:00"),
+        (600_000_000.75, "mac", "2020-01-06 10:40:00"),
+        (13_222_780_800_000_000, "webkit", "2020-01-06 10:40:00"),
+        (13_222_780_800_000_000, "chrome", "2020-01-06 10:40:00"),
+        (1_262_342_418, "gps", "2020-01-06 10:40:00"),
+        (0, "gps", "1980-01-06 00:00:00"),
+        (-1, "unix", "1969-12-31 23:59:59"),
+    ],
+)
+def test_convert(value, epoch, expected):
+    assert timestamps.convert_value(value, epoch) == expected
+
+
+def test_convert_matches_datetime():
+    values = list(range(-86_400 * 400, 86_400 * 20_000, 999_983))
+    expected = [
+        datetime.datetime.fromtimestamp(
+            value + 978_307_200, datetime.timezone.utc
+        ).strftime("%Y-%m-%d %H:%M:%S")
+        for value in values
+    ]
+    assert timestamps.convert(values, "mac") == expected
+
+
+def test_convert_invalid():
+    assert timestamps.convert([None, "abc", 10**30, float("nan"), [1]]) == [
+        None,
+        None,
+        None,
+        None,
+        None,
+    ]
+    with pytest.raises(ValueError):
+        timestamps.convert([1], "cocoa")
+    with pytest.raises(ValueError):
+        timestamps.converter("cocoa")
+
+
+def test_convert_timezone():
+    # Daylight saving time started at 2022-03-13 07:00:00 UTC in New York
+    values = [1_647_154_799, 1_647_154_800, 1_647_154_799]
+    assert timestamps.convert(values, tz="America/New_York") == [
+        "2022-03-13 01:59:59",
+        "2022-03-13 03:00:00",
+        "2022-03-13 01:59:59",
+    ]
+    offset = datetime.timezone(datetime.timedelta(hours=5, minutes=30))
+    assert timestamps.convert_value(0, tz=offset) == "1970-01-01 05:30:00"
+
+
+def test_convert_arrays():
+    values = array.array("q", [600_000_000, 600_000_060])
+    assert timestamps.converter("mac")(values) == [
+        "2020-01-06 10:40:00",
+        "2020-01-06 10:41:00",
+    ]
+
+    table = ResultTable(("Timestamp", "Value"), [(600_000_000, 1), (None, 2)])
+    timestamps.convert_column(table, "Timestamp", "mac")
+    assert list(table) == [("2020-01-06 10:40:00", 1), (None, 2)]
+    assert table.get_column("Timestamp").kind == "str"
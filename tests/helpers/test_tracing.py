@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from xleapp.helpers import tracing
+
+
+@pytest.fixture
+def trace_file(tmp_path):
+    trace_file = tmp_path / tracing.TRACE_FILE
+    tracing.enable(trace_file)
+    yield trace_file
+    tracing.disable()
+
+
+def read_spans(trace_file):
+    return [json.loads(line) for line in trace_file.read_text().splitlines()]
+
+
+def test_disabled_span():
+    with tracing.span("search", pattern="**/*.db") as span:
+        span.set(files=1)
+
+    assert not span.recording
+    assert not tracing.enabled()
+
+
+def test_nested_spans(trace_file):
+    with tracing.span("process", artifact="Accounts") as outer:
+        with tracing.span("search", pattern="**/Accounts3.sqlite") as inner:
+            inner.set(files=2)
+        outer.set(rows=10)
+    assert tracing.disable() == trace_file
+
+    search, process = read_spans(trace_file)
+    assert search["parent"] == process["id"]
+    assert process["parent"] is None
+    assert search["attributes"] == {"pattern": "**/Accounts3.sqlite", "files": 2}
+    assert process["attributes"] == {"artifact": "Accounts", "rows": 10}
+    assert process["dur"] >= search["dur"]
+
+
+def test_span_error(trace_file):
+    with pytest.raises(KeyError):
+        with tracing.span("export", db_type="kml"):
+            raise KeyError("kml")
+    tracing.disable()
+
+    assert "KeyError" in read_spans(trace_file)[0]["attributes"]["error"]
+
+
+def test_chrome_trace(trace_file):
+    with tracing.span("render", artifact="Accounts"):
+        pass
+    tracing.disable()
+
+    chrome_trace = json.loads(tracing.to_chrome_trace(trace_file).read_text())
+    phases = [event["ph"] for event in chrome_trace["traceEvents"]]
+    assert phases == ["X", "M"]
+    assert chrome_trace["traceEvents"][0]["args"] == {"artifact": "Accounts"}
@@ -0,0 +1,67 @@
+import sqlite3
+import tarfile
+import zipfile
+
+import pytest
+
+from xleapp.bench.generator import ExtractionSpec, generate
+from xleapp.bench.suite import compare
+
+
+@pytest.fixture
+def spec():
+    return ExtractionSpec(files=20, depth=3, databases=2, rows=50)
+
+
+def file_contents(folder):
+    return {
+        path.relative_to(folder).as_posix(): path.read_bytes()
+        for path in folder.rglob("*")
+        if path.is_file()
+    }
+
+
+def test_generate_is_deterministic(tmp_path, spec):
+    first = generate(tmp_path / "first", spec)
+    second = generate(tmp_path / "second", spec)
+
+    assert file_contents(first) == file_contents(second)
+    assert len(list(first.rglob("file*.dat"))) == 20
+
+
+def test_generated_databases(tmp_path, spec):
+    databases = sorted(
+        generate(tmp_path, spec).rglob("Bench*.sqlite"), key=lambda db: db.name
+    )
+
+    assert [db.name for db in databases] == ["Bench0.sqlite", "Bench1.sqlite"]
+    with sqlite3.connect(databases[0]) as db:
+        assert db.execute("SELECT COUNT(*) FROM events").fetchone() == (50,)
+
+
+def test_archives_match_folder(tmp_path, spec):
+    names = set(file_contents(generate(tmp_path, spec)))
+
+    with zipfile.ZipFile(generate(tmp_path, spec, "zip")) as archive:
+        assert set(archive.namelist()) == names
+    with tarfile.open(generate(tmp_path, spec, "tar")) as archive:
+        assert set(archive.getnames()) == names
+
+
+def test_unknown_kind(tmp_path, spec):
+    with pytest.raises(ValueError):
+        generate(tmp_path, spec, "7z")
+
+
+def test_compare():
+    def results(seconds):
+        return {
+            "results": [
+                {"scale": "small", "kind": "dir", "phases": {"search": seconds}},
+                {"scale": "small", "kind": "dir", "phases": {"search": seconds * 2}},
+            ]
+        }
+
+    assert compare(results(2.0), results(1.0)) == [
+        ["small", "dir", "search", "2.000", "+100.0%"]
+    ]
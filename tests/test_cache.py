@@ -0,0 +1,105 @@
+from dataclasses import dataclass, field
+
+import pytest
+
+from xleapp.artifact.cache import ArtifactResult, ResultCache
+
+
+@dataclass
+class FoundFile:
+    path: object
+
+    def __hash__(self) -> int:
+        return hash(str(self.path))
+
+
+@dataclass
+class CachedArtifact:
+    found: set
+    regex: set = field(default_factory=lambda: {"**/cached.db"})
+    data: list = field(default_factory=list)
+    report_headers: tuple = ("Timestamp", "Value")
+    report_title: str = "Cached"
+    description: str = ""
+    processed: bool = True
+    process_time: float = 0.5
+    streamed: bool = False
+    row_count: int = 0
+    cls_name: str = "CachedArtifact"
+
+
+@pytest.fixture
+def found_file(tmp_path):
+    found = tmp_path / "cached.db"
+    found.write_bytes(b"0" * 16)
+    return found
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(folder=tmp_path / "cache", max_size=1024**2)
+
+
+def test_result_round_trip():
+    result = ArtifactResult(data=[("2022-01-01", 1)], report_headers=("a", "b"))
+    assert ArtifactResult.loads(result.dumps()) == result
+
+
+def test_result_restores_streamed_preview():
+    artifact = CachedArtifact(found=set(), data=[("2022", 1)], streamed=True)
+    artifact.row_count = 50_000
+    restored = CachedArtifact(found=set())
+
+    ArtifactResult.from_artifact(artifact).apply(restored)
+    assert (restored.streamed, restored.row_count) == (True, 50_000)
+
+
+def test_cache_hit(cache, found_file):
+    artifact = CachedArtifact(found={FoundFile(found_file)}, data=[("2022", 42)])
+    assert not cache.load(artifact)
+    cache.save(artifact)
+
+    restored = CachedArtifact(found={FoundFile(found_file)})
+    assert cache.load(restored)
+    assert restored.data == [("2022", 42)]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_miss_when_file_changes(cache, found_file):
+    cache.save(CachedArtifact(found={FoundFile(found_file)}, data=[("2022", 42)]))
+    found_file.write_bytes(b"1" * 32)
+
+    assert not cache.load(CachedArtifact(found={FoundFile(found_file)}))
+
+
+def test_cache_eviction(cache, found_file):
+    cache.save(CachedArtifact(found={FoundFile(found_file)}, data=[("2022", 42)]))
+    cache.max_size = 0
+    cache.evict()
+
+    assert not list(cache.folder.rglob("*.xlc"))
+
+
+def test_cache_evicts_once_over_budget(cache, found_file, tmp_path, monkeypatch):
+    evictions = []
+    monkeypatch.setattr(cache, "evict", lambda: evictions.append(1))
+    for num in range(3):
+        other = tmp_path / f"other{num}.db"
+        other.write_bytes(b"0")
+        cache.save(CachedArtifact(found={FoundFile(other)}, data=[("2022", num)]))
+    assert evictions == []
+
+    cache.max_size = 0
+    cache.save(CachedArtifact(found={FoundFile(found_file)}, data=[("2022", 42)]))
+    assert evictions == [1]
+
+
+def test_cache_skips_exported_files(cache, found_file, tmp_path):
+    export_folder = tmp_path / "export" / "CachedArtifact"
+    export_folder.mkdir(parents=True)
+    (export_folder / "photo.jpg").write_bytes(b"jpg")
+    artifact = CachedArtifact(found={FoundFile(found_file)}, data=[("2022", 42)])
+    artifact.data_save_folder = export_folder
+
+    cache.save(artifact)
+    assert not cache.load(CachedArtifact(found={FoundFile(found_file)}))
@@ -1,6 +1,7 @@
 import click
 import xleapp._version as version
 
+from xleapp.cli import device
 from xleapp.helpers.utils import generate_program_header
 
 
@@ -22,3 +23,14 @@ def test_generate_program_header(app, capsys):
     assert "C:\\4n6_output\\report" in out
     # TODO: Fix test. Failing when pushing to Github but passes locally.
     assert "Artifacts to parse: 1 in 1 categories" in out
+
+
+def test_track_memory_keeps_artifacts():
+    ctx = device.make_context("device", ["ios", "--track-memory", "Accounts"])
+    assert ctx.params["track_memory"] is True
+    assert ctx.params["memory_mode"] == "rss"
+    assert ctx.params["artifacts"] == ("Accounts",)
+
+    ctx = device.make_context("device", ["ios", "--memory-mode", "tracemalloc"])
+    assert ctx.params["track_memory"] is False
+    assert ctx.params["memory_mode"] == "tracemalloc"
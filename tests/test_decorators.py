@@ -1,7 +1,13 @@
 import pytest
 
 from xleapp.artifact.abstract import Artifact
-from xleapp.artifact.decorators import core_artifact, long_running_process
+from xleapp.artifact.decorators import (
+    Search,
+    core_artifact,
+    long_running_process,
+    search_patterns,
+)
+from xleapp.artifact.regex import Regex
 
 
 class DummyArtifactClass(Artifact, category="Dummy", label="Dummy Artifact"):
@@ -33,3 +39,19 @@ def test_decorate_set_attribute(decorator, attribute_name):
 def test_decorate_set_attribute_wrong_class(decorator, attribute_name):
     with pytest.raises(AttributeError):
         decorator(DummyClass)
+
+
+def test_search_patterns_recorded_without_processing():
+    class SearchArtifactClass(Artifact, category="Dummy", label="Search Artifact"):
+        @Search("**/first.sqlite")
+        @Search("**/second.plist", file_names_only=True, return_on_first_hit=False)
+        def process(self):
+            raise AssertionError("process() should not run")
+
+    patterns = search_patterns(SearchArtifactClass)
+
+    assert patterns == {Regex("**/first.sqlite"), Regex("**/second.plist")}
+    assert {
+        (str(regex), regex.file_names_only, regex.return_on_first_hit)
+        for regex in patterns
+    } == {("**/first.sqlite", False, True), ("**/second.plist", True, False)}
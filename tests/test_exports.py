@@ -0,0 +1,441 @@
+import bz2
+import csv
+import datetime
+import gzip
+import json
+import lzma
+import sqlite3
+import types
+import xml.etree.ElementTree as ET
+import zipfile
+
+import pytest
+
+from xleapp.report import db
+from xleapp.report.kml import KMZ_DOCUMENT, KmlWriter
+
+
+HEADERS = ("Timestamp", "Bundle ID", "Count")
+
+
+@pytest.fixture
+def timeline(tmp_path):
+    timeline = db.TimelineDBManager(tmp_path)
+    yield timeline
+    timeline.finalize()
+
+
+@pytest.mark.parametrize(
+    ["value", "expected"],
+    [
+        ("2022-01-31 13:45:10", 1_643_636_710),
+        ("2022-01-31T13:45:10+01:00", 1_643_633_110),
+        (datetime.datetime(2022, 1, 31, 13, 45, 10), 1_643_636_710),
+        (datetime.date(2022, 1, 31), 1_643_587_200),
+        (1_643_636_710.5, 1_643_636_710),
+        ("", None),
+        ("yesterday", None),
+        (None, None),
+        (True, None),
+    ],
+)
+def test_to_timestamp(value, expected):
+    assert db.to_timestamp(value) == expected
+
+
+def test_timeline_save(timeline):
+    timeline.save(
+        data_headers=HEADERS,
+        data_list=[("2022-01-31 13:45:10", "com.apple.Maps", 3), ("", "é", None)],
+        name="App Usage",
+    )
+    timeline.save(data_headers=HEADERS, data_list=[], name="Empty")
+    timeline.finalize()
+
+    conn = sqlite3.connect(timeline.db_file)
+    events = conn.execute(
+        "SELECT timestamp, time, artifact, fields FROM timeline ORDER BY id"
+    ).fetchall()
+    assert [event[:3] for event in events] == [
+        (1_643_636_710, "2022-01-31 13:45:10", "App Usage"),
+        (None, "", "App Usage"),
+    ]
+    assert json.loads(events[1][3]) == {"Timestamp": "", "Bundle ID": "é", "Count": None}
+    assert conn.execute("SELECT fields FROM events").fetchone() == (
+        '["2022-01-31 13:45:10","com.apple.Maps",3]',
+    )
+    assert conn.execute("SELECT activity FROM data").fetchone() == ("APP USAGE",)
+
+    indexes = {
+        row[0]
+        for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL"
+        )
+    }
+    assert indexes == {"events_timestamp", "events_artifact"}
+    assert conn.execute("PRAGMA journal_mode").fetchone() == ("delete",)
+    conn.close()
+
+
+def test_timeline_resume(tmp_path):
+    timeline = db.TimelineDBManager(tmp_path)
+    timeline.save(data_headers=HEADERS, data_list=[("2022-01-31", "a", 1)], name="A")
+    timeline.finalize()
+
+    timeline = db.TimelineDBManager(tmp_path)
+    timeline.save(data_headers=HEADERS, data_list=[("2022-02-01", "b", 2)], name="B")
+    timeline.finalize()
+
+    conn = sqlite3.connect(timeline.db_file)
+    assert conn.execute("SELECT artifact FROM events ORDER BY id").fetchall() == [
+        ("A",),
+        ("B",),
+    ]
+    conn.close()
+
+
+KML = "{http://www.opengis.net/kml/2.2}"
+LOCATION_HEADERS = ("Timestamp", "Latitude", "Longitude", "Source")
+LOCATIONS = [
+    ("2022-01-31 13:45:10", 51.5, -0.12, "gps"),
+    ("2022-01-31 13:46:10", None, None, "wifi"),
+    ("2022-01-31 13:47:10 <", 48.85, 2.35, "gps"),
+]
+
+
+def read_placemarks(kml_text):
+    document = ET.fromstring(kml_text)
+    return [
+        (
+            placemark.find(f"{KML}name").text,
+            placemark.find(f"{KML}Point/{KML}coordinates").text,
+        )
+        for placemark in document.iter(f"{KML}Placemark")
+    ]
+
+
+@pytest.mark.parametrize("suffix", ["kml", "kmz"])
+def test_kml_writer(tmp_path, suffix):
+    path = tmp_path / f"Locations.{suffix}"
+    with KmlWriter(path) as kml:
+        kml.add_point("Tardis & <Co>", 51.5, -0.12, "Timestamp: x")
+        kml.add_points([("2", 1, 2, "")])
+    assert kml.count == 2
+
+    if suffix == "kmz":
+        with zipfile.ZipFile(path) as archive:
+            assert archive.namelist() == [KMZ_DOCUMENT]
+            kml_text = archive.read(KMZ_DOCUMENT)
+    else:
+        kml_text = path.read_bytes()
+    assert read_placemarks(kml_text) == [
+        ("Tardis & <Co>", "-0.12,51.5,0.0"),
+        ("2", "2,1,0.0"),
+    ]
+
+
+@pytest.mark.parametrize("kmz", [False, True])
+def test_kml_save(tmp_path, kmz):
+    kml = db.KmlDBManager(tmp_path, kmz=kmz)
+    kml.create()
+    kml.save(data_headers=LOCATION_HEADERS, data_list=LOCATIONS, name="Locations")
+    kml.finalize()
+
+    conn = sqlite3.connect(kml.db_file)
+    assert conn.execute("SELECT COUNT(*) FROM data").fetchone() == (2,)
+    conn.close()
+
+    kml_file = tmp_path / "_KML_Exports" / f"Locations.{'kmz' if kmz else 'kml'}"
+    if kmz:
+        with zipfile.ZipFile(kml_file) as archive:
+            kml_text = archive.read(KMZ_DOCUMENT)
+    else:
+        kml_text = kml_file.read_bytes()
+    assert read_placemarks(kml_text) == [
+        ("2022-01-31 13:45:10", "-0.12,51.5,0.0"),
+        ("2022-01-31 13:47:10 <", "2.35,48.85,0.0"),
+    ]
+
+
+def test_kml_missing_columns(tmp_path):
+    kml = db.KmlDBManager(tmp_path)
+    kml.create()
+
+    with pytest.raises(KeyError):
+        kml.insert(data_headers=HEADERS, data_list=[("a", "b", 1)], name="Apps")
+    kml.finalize()
+
+
+TSV_ROWS = [("2022-01-31 13:45:10", "com.apple.tsv\tapp", 1), ("", "é", 2)]
+TSV_OPENERS = {None: open, "gzip": gzip.open, "bz2": bz2.open, "xz": lzma.open}
+
+
+def read_tsv(path, compression=None):
+    with TSV_OPENERS[compression](path, "rt", encoding="utf-8-sig", newline="") as file:
+        return list(csv.reader(file, delimiter="\t"))
+
+
+@pytest.mark.parametrize("compression", [None, "gzip", "bz2", "xz"])
+def test_tsv_save(tmp_path, compression):
+    tsv = db.TsvManager(tmp_path, compression=compression)
+    tsv.save(name="Apps", data_headers=HEADERS, data_list=TSV_ROWS)
+    tsv.finalize()
+
+    path = tmp_path / "_TSV Exports" / f"Apps{db.TSV_COMPRESSION[compression][0]}"
+    assert read_tsv(path, compression) == [
+        list(HEADERS),
+        ["2022-01-31 13:45:10", "com.apple.tsv\tapp", "1"],
+        ["", "é", "2"],
+    ]
+
+
+def test_tsv_overwrites_earlier_runs(tmp_path):
+    for _ in range(2):
+        tsv = db.TsvManager(tmp_path)
+        tsv.save(name="Apps", data_headers=HEADERS, data_list=TSV_ROWS)
+        tsv.finalize()
+
+    assert [path.name for path in (tmp_path / "_TSV Exports").iterdir()] == [
+        "Apps.tsv"
+    ]
+    assert len(read_tsv(tmp_path / "_TSV Exports" / "Apps.tsv")) == 3
+
+
+def test_tsv_versioned(tmp_path):
+    tsv = db.TsvManager(tmp_path)
+    tsv.save(name="Apps", data_headers=HEADERS, data_list=TSV_ROWS)
+    # The same name twice in one run never overwrites the first file
+    tsv.save(name="Apps", data_headers=HEADERS, data_list=TSV_ROWS[:1])
+    tsv.finalize()
+
+    tsv = db.TsvManager(tmp_path, versioned=True)
+    tsv.save(name="Apps", data_headers=HEADERS, data_list=[])
+    tsv.finalize()
+
+    folder = tmp_path / "_TSV Exports"
+    assert len(read_tsv(folder / "Apps.tsv")) == 3
+    assert len(read_tsv(folder / "Apps (2).tsv")) == 2
+    assert read_tsv(folder / "Apps (3).tsv") == [list(HEADERS)]
+
+
+def test_tsv_finalize_raises(tmp_path):
+    tsv = db.TsvManager(tmp_path)
+    tsv.save(name="Apps", data_headers=HEADERS, data_list=[1])
+
+    with pytest.raises(csv.Error):
+        tsv.finalize()
+    assert tsv.failed == {"Apps"}
+
+
+def test_tsv_unknown_compression(tmp_path):
+    with pytest.raises(ValueError):
+        db.TsvManager(tmp_path, compression="zip")
+
+
+def test_export_writer_runs_jobs_in_order(tmp_path, timeline):
+    writer = db.ExportWriter(batched=[timeline], max_pending=2, group_size=4)
+    done = []
+    for i in range(10):
+        writer.submit(done.append, i)
+        writer.submit(
+            timeline.save, data_headers=HEADERS, data_list=[(None, "", i)], name="Apps"
+        )
+    writer.close()
+
+    assert done == list(range(10))
+    assert timeline._open().execute("SELECT COUNT(*) FROM events").fetchone() == (10,)
+
+
+def test_export_writer_raises_on_flush():
+    writer = db.ExportWriter()
+    done = []
+    writer.submit(lambda: 1 / 0)
+    writer.submit(done.append, 1)
+
+    with pytest.raises(db.DatabaseError):
+        writer.flush()
+    assert done == [1]
+
+    writer.submit(done.append, 2)
+    writer.close()
+    assert done == [1, 2]
+
+
+def test_export_writer_rolls_back_failed_job(tmp_path, timeline):
+    kml = db.KmlDBManager(tmp_path)
+    kml.create()
+    writer = db.ExportWriter(batched=[kml, timeline], group_size=16)
+    for name in ("Good", "Bad", "Later"):
+        writer.submit(
+            timeline.save, data_headers=HEADERS, data_list=[(None, "", 1)], name=name
+        )
+        if name == "Bad":
+            # No Latitude column
+            writer.submit(
+                kml.insert, data_headers=HEADERS, data_list=[(None, "", 1)], name=name
+            )
+            writer.submit(lambda: 1 / 0)
+
+    with pytest.raises(db.DatabaseError, match="2 export"):
+        writer.close()
+    assert timeline._open().execute(
+        "SELECT artifact FROM events ORDER BY artifact"
+    ).fetchall() == [("Bad",), ("Good",), ("Later",)]
+    kml.finalize()
+
+
+def test_export_writer_records_failed_artifacts():
+    writer = db.ExportWriter()
+    writer.submit_for("Good", lambda: None)
+    writer.submit_for("Bad", lambda: 1 / 0)
+    writer.submit(lambda: 1 / 0)
+
+    with pytest.raises(db.DatabaseError, match="2 export"):
+        writer.close()
+    assert writer.failed == {"Bad"}
+
+
+def test_dbservice_failed_case_export(tmp_path):
+    service = db.DBService(tmp_path, case_db=True)
+    artifact = types.SimpleNamespace(
+        cls_name="InstalledApps",
+        name="Apps",
+        category="Installed Apps",
+        process_time=0.1,
+        found=[],
+        report_headers=HEADERS,
+        data=[(None, "com.apple.news", 1)],
+        streamed=False,
+    )
+    service.save_artifact(artifact)
+    # Rows of a table that was never created
+    service.submit_for("Missing", service._databases["case"].insert, "Missing", [])
+
+    with pytest.raises(db.DatabaseError):
+        service.finalize()
+    assert service.failed == {"Missing"}
+    assert service.failed == {"Missing"}
+
+
+def test_dbservice_exports(tmp_path):
+    service = db.DBService(tmp_path)
+    rows = [("2022-01-31 13:45:10", 51.5, -0.12, "gps")]
+    for db_type in ("tsv", "kml", "timeline"):
+        service.save(db_type, "Locations", rows, LOCATION_HEADERS)
+    stream = service.open_stream("Stream", LOCATION_HEADERS, kml=True, timeline=True)
+    with stream as export:
+        export.write(rows)
+        export.write(rows)
+    service.flush()
+
+    assert (tmp_path / "_KML_Exports" / "Locations.kml").exists()
+    assert (tmp_path / "_KML_Exports" / "Stream.kml").exists()
+    timeline = sqlite3.connect(tmp_path / "_Timeline" / "t1.db")
+    assert timeline.execute(
+        "SELECT artifact, COUNT(*) FROM events GROUP BY artifact"
+    ).fetchall() == [("Locations", 1), ("Stream", 2)]
+    timeline.close()
+
+    service.finalize()
+    assert len(read_tsv(tmp_path / "_TSV Exports" / "Stream.tsv")) == 3
+
+    with pytest.raises(db.DatabaseError):
+        service.save("html", "Locations", rows, LOCATION_HEADERS)
+
+
+def test_case_db_save_table(tmp_path):
+    case = db.CaseDBManager(tmp_path)
+    case.create()
+    rows = [
+        (datetime.datetime(2022, 1, 31, 13, 45, 10), "com.apple.news", 1),
+        (None, "com.apple.maps", 2),
+    ]
+    case.save_table(
+        "Installed Apps",
+        HEADERS,
+        rows,
+        artifact="InstalledApps",
+        category="Installed Apps",
+        process_time=1.5,
+        sources=["/private/var/db/apps.db"],
+    )
+    conn = case._open()
+
+    assert conn.execute('SELECT * FROM "Installed Apps"').fetchall() == [
+        ("2022-01-31 13:45:10", "com.apple.news", 1),
+        (None, "com.apple.maps", 2),
+    ]
+    assert conn.execute(
+        "SELECT name, type FROM pragma_table_info('Installed Apps')"
+    ).fetchall() == [("Timestamp", "TEXT"), ("Bundle ID", "TEXT"), ("Count", "INTEGER")]
+    assert conn.execute(
+        "SELECT name FROM pragma_index_list('Installed Apps')"
+    ).fetchall() == [("Installed Apps_0_idx",)]
+    assert conn.execute(
+        "SELECT artifact, category, columns, row_count, process_time, sources "
+        "FROM _artifacts"
+    ).fetchall() == [
+        (
+            "InstalledApps",
+            "Installed Apps",
+            json.dumps(list(HEADERS)),
+            2,
+            1.5,
+            '["/private/var/db/apps.db"]',
+        )
+    ]
+    case.finalize()
+
+
+def test_case_db_ragged_rows(tmp_path):
+    case = db.CaseDBManager(tmp_path)
+    case.create()
+    rows = [("2022-01-31 13:45:10", "com.apple.news"), (None, "com.apple.maps", 2, "x")]
+    case.save_table("Installed Apps", HEADERS, rows, artifact="InstalledApps")
+
+    assert case._open().execute('SELECT * FROM "Installed Apps"').fetchall() == [
+        ("2022-01-31 13:45:10", "com.apple.news", None),
+        (None, "com.apple.maps", 2),
+    ]
+    case.finalize()
+
+
+def test_case_db_save_artifact(tmp_path):
+    class Found:
+        path = "/private/var/mobile/Library/locations.db"
+
+    artifact = type(
+        "Artifact",
+        (),
+        {
+            "cls_name": "Locations",
+            "name": "Locations",
+            "category": "Location",
+            "process_time": 0.5,
+            "found": {Found()},
+            "report_headers": LOCATION_HEADERS,
+            "data": LOCATIONS[:1],
+            "streamed": True,
+        },
+    )()
+    service = db.DBService(tmp_path, case_db=True)
+    with service.open_stream(artifact.name, LOCATION_HEADERS) as export:
+        export.write(LOCATIONS)
+        export.write(LOCATIONS[:1])
+    service.save_artifact(artifact)
+
+    artifact.name, artifact.streamed = "Tables", False
+    artifact.report_headers = [HEADERS, ("Key", "Value")]
+    artifact.data = [[("", "com.apple.news", 1)], [("a", "b"), ("c", "d")]]
+    service.save_artifact(artifact)
+    service.finalize()
+
+    conn = sqlite3.connect(tmp_path / "_Case" / "case.db")
+    assert conn.execute(
+        "SELECT table_name, name, row_count, sources FROM _artifacts ORDER BY 1"
+    ).fetchall() == [
+        ("Locations", "Locations", 4, f'["{Found.path}"]'),
+        ("Tables_0", "Tables", 1, f'["{Found.path}"]'),
+        ("Tables_1", "Tables", 2, f'["{Found.path}"]'),
+    ]
+    conn.close()
@@ -0,0 +1,42 @@
+import pytest
+
+from xleapp.artifact.lazy import LazyArtifact
+from xleapp.artifact.regex import Regex
+from xleapp.artifact.service import Artifacts
+
+
+@pytest.fixture
+def manifest_entry():
+    return {
+        "name": "Lazy Artifact",
+        "category": "Lazy",
+        "device_type": "test",
+        "cls_name": "LazyTestArtifact",
+        "module": "xleapp.test.artifacts.lazy",
+        "regex": [["**/lazy.sqlite", False, True]],
+        "core": False,
+        "long_running_process": False,
+    }
+
+
+def test_manifest_round_trip(manifest_entry):
+    lazy_artifact = LazyArtifact.from_manifest(manifest_entry)
+
+    assert lazy_artifact.regex == {Regex("**/lazy.sqlite")}
+    assert LazyArtifact.manifest_entry(lazy_artifact) == manifest_entry
+
+
+def test_placeholder_replaced_on_import(manifest_entry, test_artifact):
+    artifacts = Artifacts()
+    lazy_artifact = LazyArtifact.from_manifest(manifest_entry)
+    artifacts[lazy_artifact.name] = lazy_artifact
+    lazy_artifact.select = True
+
+    assert lazy_artifact.name not in artifacts
+
+    real_artifact = test_artifact()
+    real_artifact.name = lazy_artifact.name
+    artifacts[real_artifact.name] = real_artifact
+
+    assert list(artifacts) == [real_artifact]
+    assert real_artifact.select
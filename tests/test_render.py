@@ -0,0 +1,180 @@
+import pathlib
+import pickle
+
+from types import SimpleNamespace
+
+import pytest
+import xleapp.globals as g
+
+from markupsafe import Markup
+from xleapp.templating.render import (
+    ArtifactSnapshot,
+    RenderPool,
+    ReportGlobals,
+    SourceFile,
+    _render_snapshot,
+    create_environment,
+    create_template_cache,
+)
+from xleapp.templating.tables import TABLE_DATA_FOLDER, write_table
+
+
+class FakeHandle:
+    def __init__(self, path):
+        self.path = pathlib.Path(path)
+
+
+@pytest.fixture
+def report_app(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setenv("LOCALAPPDATA", str(tmp_path / "cache"))
+    (tmp_path / "Script Logs").mkdir()
+    app = SimpleNamespace(
+        project="xLEAPP",
+        version="1.0",
+        report_folder=tmp_path,
+        log_folder=tmp_path / "Script Logs",
+        extraction_type="fs",
+        case_store=None,
+    )
+    monkeypatch.setattr(g, "app", ReportGlobals.from_app(app))
+    return app
+
+
+def make_artifact(num):
+    return SimpleNamespace(
+        cls_name=f"Artifact{num}",
+        name=f"Artifact {num}",
+        category="Tests",
+        description="",
+        report_title="",
+        report_headers=("Key", "Value"),
+        data=[("<key>", num)],
+        found={FakeHandle("/private/var/mobile/test.db")},
+        streamed=False,
+        row_count=1,
+    )
+
+
+def test_snapshot_pickles():
+    snapshot = ArtifactSnapshot.from_artifact(make_artifact(1))
+
+    assert snapshot.found == [SourceFile(pathlib.Path("/private/var/mobile/test.db"))]
+    assert pickle.loads(pickle.dumps(snapshot)) == snapshot
+
+
+def test_render_snapshot_matches_artifact(report_app):
+    artifact = make_artifact(1)
+    with RenderPool(report_app, workers=1) as pool:
+        assert pool.submit(artifact, {}).result()
+    page = report_app.report_folder / "Tests - Artifact 1.html"
+    expected = page.read_text("UTF-8")
+    page.unlink()
+
+    snapshot = pickle.dumps(ArtifactSnapshot.from_artifact(artifact))
+    assert _render_snapshot(g.app, snapshot, {})
+    assert page.read_text("UTF-8") == expected
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_render_pool_threads(report_app, workers):
+    with RenderPool(report_app, workers=workers, pool="thread") as pool:
+        futures = [pool.submit(make_artifact(num), {}) for num in range(6)]
+        assert [future.result() for future in futures] == [True] * 6
+
+    assert sorted(page.name for page in report_app.report_folder.glob("*.html")) == [
+        f"Tests - Artifact {num}.html" for num in range(6)
+    ]
+
+
+def test_render_pool_processes(report_app):
+    with RenderPool(report_app, workers=1) as pool:
+        assert pool.submit(make_artifact(0), {}).result()
+    page = report_app.report_folder / "Tests - Artifact 0.html"
+    expected = page.read_text("UTF-8")
+
+    with RenderPool(report_app, workers=2, pool="process") as pool:
+        futures = [pool.submit(make_artifact(num), {}) for num in range(4)]
+        assert [future.result() for future in futures] == [True] * 4
+
+    assert page.read_text("UTF-8") == expected
+    assert sorted(page.name for page in report_app.report_folder.glob("*.html")) == [
+        f"Tests - Artifact {num}.html" for num in range(4)
+    ]
+
+
+def test_render_pool_defaults_to_threads_with_case_store(report_app):
+    report_app.case_store = object()
+
+    assert RenderPool(report_app).pool == "thread"
+    with pytest.raises(ValueError):
+        RenderPool(report_app, pool="fork")
+
+
+def test_write_table_chunks(tmp_path):
+    folder = tmp_path / TABLE_DATA_FOLDER / "Artifact1"
+    folder.mkdir(parents=True)
+    rows = [("<b>key</b>", num, None) for num in range(5)]
+
+    table = write_table(folder, "Artifact1-1", ("Key", "Value", "Note"), rows, 2)
+
+    assert table.row_count == 5
+    assert table.chunks == [
+        f"_TableData/Artifact1/Artifact1-1-000{num}.js" for num in (1, 2, 3)
+    ]
+    script = (tmp_path / table.chunks[-1]).read_text("utf-8")
+    assert script == (
+        'xleapp.addRows("Artifact1-1",[["&lt;b&gt;key&lt;/b&gt;","4","None"]]);\n'
+    )
+
+
+def test_write_table_escapes_cells(tmp_path):
+    folder = tmp_path / TABLE_DATA_FOLDER / "Artifact1"
+    folder.mkdir(parents=True)
+    rows = [("<script>alert(1)</script>", "a & b", Markup("<b>bold</b>"))]
+
+    table = write_table(folder, "Artifact1-1", ("Key", "Value", "Note"), rows)
+
+    script = (tmp_path / table.chunks[0]).read_text("utf-8")
+    assert "<script>" not in script
+    assert "&lt;script&gt;alert(1)&lt;/script&gt;" in script
+    assert '"a &amp; b"' in script
+    assert '"<b>bold</b>"' in script
+
+
+def test_render_lazy_tables(report_app):
+    report_app.default_configs = {"lazy_tables": True, "table_chunk_rows": 1}
+    artifact = make_artifact(1)
+    artifact.data = [("<key>", 1), ("<key>", 2)]
+
+    with RenderPool(report_app, workers=1) as pool:
+        assert pool.submit(artifact, {}).result()
+
+    html = (report_app.report_folder / "Tests - Artifact 1.html").read_text("UTF-8")
+    assert "<td><key></td>" not in html
+    assert 'id="Artifact1-1"' in html
+    assert "_TableData/Artifact1/Artifact1-1-0002.js" in html
+    data_files = sorted((report_app.report_folder / "_TableData").rglob("*.js"))
+    assert [path.name for path in data_files] == [
+        "Artifact1-1-0001.js",
+        "Artifact1-1-0002.js",
+    ]
+
+
+def test_template_cache(tmp_path):
+    create_environment(
+        tmp_path, None, bytecode_cache=create_template_cache("1.0", tmp_path / "jinja")
+    ).get_template("report_base.jinja")
+    assert list((tmp_path / "jinja" / "1.0").glob("*.cache"))
+
+    env = create_environment(
+        tmp_path, None, bytecode_cache=create_template_cache("1.0", tmp_path / "jinja")
+    )
+    env.compile = None  # compiled templates are loaded from the cache
+    assert env.get_template("report_base.jinja")
+
+
+def test_template_cache_folder_not_created(tmp_path):
+    (tmp_path / "jinja").touch()
+
+    assert create_template_cache("1.0", tmp_path / "jinja") is None
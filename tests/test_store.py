@@ -0,0 +1,84 @@
+import datetime
+import pickle
+
+from dataclasses import dataclass, field
+
+import pytest
+
+from xleapp.report.store import CaseStore, StoredData, column_names, infer_kinds
+
+
+@dataclass
+class SpilledArtifact:
+    data: list
+    report_headers: tuple | list = ("Timestamp", "Name", "Count")
+    processed: bool = True
+    cls_name: str = "SpilledArtifact"
+    found: set = field(default_factory=set)
+
+
+@pytest.fixture
+def store(tmp_path):
+    case_store = CaseStore(tmp_path / "case.db", batch_size=2)
+    yield case_store
+    case_store.close()
+
+
+@pytest.fixture
+def rows():
+    return [
+        (datetime.datetime(2022, 1, 1, 10), "Safari", 3),
+        (datetime.datetime(2022, 1, 1, 11), None, 4),
+        (None, "Maps", None),
+        (datetime.datetime(2022, 1, 1, 12), "Safari", 5),
+        (datetime.datetime(2022, 1, 1, 13), "Notes", 6),
+    ]
+
+
+def test_infer_kinds(rows):
+    assert infer_kinds(rows, 3) == ["object", "text", "integer"]
+    assert infer_kinds([(1, None), (1.5, None)], 2) == ["mixed", "mixed"]
+
+
+def test_column_names():
+    assert column_names(["Time", "time", "Time"]) == ["Time", "time_2", "Time_3"]
+
+
+def test_spill_round_trip(store, rows):
+    artifact = SpilledArtifact(data=list(rows))
+    assert store.spill(artifact)
+
+    assert isinstance(artifact.data, StoredData)
+    assert len(artifact.data) == len(rows)
+    assert list(artifact.data) == rows
+    assert artifact.data[-1] == rows[-1]
+    assert artifact.data[1:4] == rows[1:4]
+    assert [len(batch) for batch in artifact.data.batches(2)] == [2, 2, 1]
+
+
+def test_spill_multiple_tables(store, rows):
+    artifact = SpilledArtifact(
+        data=[rows, [("a",), ("b",)]],
+        report_headers=[("Timestamp", "Name", "Count"), ("Value",)],
+    )
+    assert store.spill(artifact)
+
+    assert [list(table) for table in artifact.data] == [rows, [("a",), ("b",)]]
+    assert sorted(store.tables()) == ["SpilledArtifact_0", "SpilledArtifact_1"]
+
+
+def test_spill_skips_unprocessed(store, rows):
+    artifact = SpilledArtifact(data=list(rows), processed=False)
+
+    assert not store.spill(artifact)
+    assert artifact.data == rows
+
+
+def test_pickled_stored_data(store, rows):
+    artifact = SpilledArtifact(data=list(rows))
+    store.spill(artifact)
+    store.connection.commit()
+
+    restored = pickle.loads(pickle.dumps(artifact.data))
+    assert list(restored) == rows
+    restored.store.close()
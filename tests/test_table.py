@@ -0,0 +1,92 @@
+import pickle
+
+import pytest
+
+from xleapp.artifact import table as table_module
+from xleapp.artifact.table import ResultTable
+
+
+@pytest.fixture
+def rows():
+    return [
+        ("2022-01-01 10:00:00", "com.apple.mobilesafari", 3, 1.5),
+        ("2022-01-01 10:05:00", "com.apple.mobilesafari", None, None),
+        ("2022-01-01 10:10:00", None, 7, 2.25),
+        (None, "com.apple.Maps", 2**40, 0.0),
+    ]
+
+
+@pytest.fixture
+def result_table(rows):
+    return ResultTable(("Timestamp", "Bundle ID", "Count", "Duration"), rows)
+
+
+def test_rows_round_trip(result_table, rows):
+    assert len(result_table) == len(rows)
+    assert list(result_table) == rows
+    assert result_table[-1] == rows[-1]
+    assert result_table[1:3] == rows[1:3]
+    assert result_table == rows
+
+
+def test_column_kinds(result_table):
+    assert result_table.get_column("Bundle ID").dictionary == [
+        None,
+        "com.apple.mobilesafari",
+        "com.apple.Maps",
+    ]
+    assert result_table.get_column("Count").kind == "int"
+    assert result_table.get_column("Duration").kind == "float"
+    assert result_table.column(2) == [3, None, 7, 2**40]
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        [1, "a", None],
+        [True, False, 1],
+        [1, 2**70],
+        [None, None, b"blob"],
+        [1.5, 2],
+    ],
+)
+def test_mixed_columns_keep_values(values):
+    result_table = ResultTable(("Value",), [(value,) for value in values])
+    column = result_table.column("Value")
+
+    assert column == values
+    assert [type(value) for value in column] == [type(value) for value in values]
+
+
+def test_high_cardinality_strings(monkeypatch):
+    monkeypatch.setattr(table_module, "MIN_ROWS_FOR_RATIO", 4)
+    result_table = ResultTable(("Value",), [(str(i),) for i in range(10)])
+
+    assert result_table.get_column(0).kind == "object"
+    assert result_table.column(0) == [str(i) for i in range(10)]
+
+
+def test_row_length_mismatch(result_table):
+    with pytest.raises(ValueError):
+        result_table.append(("only one",))
+
+
+def test_pickle(result_table):
+    assert pickle.loads(pickle.dumps(result_table)) == result_table
+
+
+def test_from_data_multiple_tables(rows):
+    headers = [("Timestamp", "Bundle ID", "Count", "Duration"), ("Value",)]
+    tables = ResultTable.from_data([rows, [("a",)]], headers)
+
+    assert [type(table) for table in tables] == [ResultTable, ResultTable]
+    assert ResultTable.from_data([rows], headers) == [rows]
+
+
+def test_replace_column():
+    table = ResultTable(("Timestamp", "Count"), [(1, 2), (3, 4)])
+    table.replace_column("Timestamp", ["a", "b"])
+
+    assert list(table) == [("a", 2), ("b", 4)]
+    with pytest.raises(ValueError):
+        table.replace_column(1, [1])
@@ -0,0 +1,98 @@
+import csv
+import json
+import sqlite3
+
+import pytest
+
+from xleapp.report import db
+from xleapp.report.timeline import sorted_events, write_timeline
+
+
+@pytest.fixture
+def timeline_db(tmp_path):
+    timeline = db.TimelineDBManager(tmp_path)
+    timeline.save(
+        data_headers=("Timestamp", "App"),
+        data_list=[
+            ("2022-01-31 13:45:12", "news"),
+            ("", "maps"),
+            ("2022-01-31 13:45:10", "mail"),
+        ],
+        name="Apps",
+    )
+    timeline.save(
+        data_headers=("Time", "Network"),
+        data_list=[("2022-01-31 13:45:11", "wifi"), ("2022-01-31 13:45:12", "lte")],
+        name="Networks",
+    )
+    timeline.finalize()
+    conn = sqlite3.connect(timeline.db_file)
+    yield conn
+    conn.close()
+
+
+def test_sorted_events(timeline_db):
+    events = [
+        (timestamp, artifact, fields)
+        for timestamp, _, artifact, fields in sorted_events(timeline_db)
+    ]
+    assert events == [
+        (1_643_636_710, "Apps", {"Timestamp": "2022-01-31 13:45:10", "App": "mail"}),
+        (1_643_636_711, "Networks", {"Time": "2022-01-31 13:45:11", "Network": "wifi"}),
+        (1_643_636_712, "Apps", {"Timestamp": "2022-01-31 13:45:12", "App": "news"}),
+        (1_643_636_712, "Networks", {"Time": "2022-01-31 13:45:12", "Network": "lte"}),
+        (None, "Apps", {"Timestamp": "", "App": "maps"}),
+    ]
+
+
+def test_write_timeline_jsonl(tmp_path, timeline_db):
+    path = write_timeline(timeline_db, tmp_path, "jsonl")
+
+    events = [json.loads(line) for line in path.read_text("utf-8").splitlines()]
+    assert [event["fields"] for event in events][:2] == [
+        {"Timestamp": "2022-01-31 13:45:10", "App": "mail"},
+        {"Time": "2022-01-31 13:45:11", "Network": "wifi"},
+    ]
+    assert events[-1]["timestamp"] is None
+
+
+def test_write_timeline_tsv(tmp_path, timeline_db):
+    path = write_timeline(timeline_db, tmp_path, "tsv")
+
+    with open(path, encoding="utf-8-sig", newline="") as file:
+        rows = list(csv.reader(file, delimiter="\t"))
+    assert rows[0] == ["UTC", "Time", "Artifact", "Fields"]
+    assert rows[1][:3] == ["2022-01-31 13:45:10", "2022-01-31 13:45:10", "Apps"]
+    assert rows[-1][:3] == ["", "", "Apps"]
+    assert len(rows) == 6
+
+
+def test_write_timeline_sqlite(tmp_path, timeline_db):
+    path = write_timeline(timeline_db, tmp_path, "sqlite")
+
+    conn = sqlite3.connect(path)
+    rows = conn.execute("SELECT utc, artifact FROM timeline ORDER BY rowid").fetchall()
+    assert rows[:3] == [
+        ("2022-01-31 13:45:10", "Apps"),
+        ("2022-01-31 13:45:11", "Networks"),
+        ("2022-01-31 13:45:12", "Apps"),
+    ]
+    conn.close()
+
+
+def test_write_timeline_unknown_format(tmp_path, timeline_db):
+    with pytest.raises(ValueError):
+        write_timeline(timeline_db, tmp_path, "xml")
+
+
+def test_timeline_manager_sorted_format(tmp_path):
+    timeline = db.TimelineDBManager(tmp_path, sorted_format="jsonl")
+    timeline.save(
+        data_headers=("Timestamp", "App"),
+        data_list=[("2022-01-31 13:45:10", "news")],
+        name="Apps",
+    )
+    timeline.finalize()
+
+    lines = (tmp_path / "_Timeline" / "timeline.jsonl").read_text("utf-8")
+    assert lines.count("\n") == 1